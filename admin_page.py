@@ -1,126 +1,455 @@
-__import__("pysqlite3")
-import sys
-
-sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
-
 import streamlit as st
-import json
-import os
+import math
+import pandas as pd
 from dotenv import load_dotenv
-from datetime import datetime
-from faq_manager import load_faq_candidates, save_faq_candidates, clear_all_candidates
-from langchain_upstage import UpstageEmbeddings
-from langchain_chroma import Chroma
-from langchain_core.documents import Document
+from datetime import datetime, timedelta
+from api_client import HelpdeskClient, ApiError
 
 load_dotenv()
 
-# streamlit secrets 사용 시 활성화
-# os.environ["UPSTAGE_API_KEY"] = st.secrets["UPSTAGE_API_KEY"]
-
-APPROVED_FAQS_FILE = "approved_faqs.json"
-
-
-def load_approved_faqs():
-    """승인된 FAQ 로드"""
-    try:
-        if os.path.exists(APPROVED_FAQS_FILE):
-            with open(APPROVED_FAQS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return []
-    except Exception as e:
-        st.error(f"승인된 FAQ 로드 실패: {e}")
-        return []
-
-
-def save_approved_faqs(faqs):
-    """승인된 FAQ 저장"""
+# FAQ 저장소/벡터 DB/추적 로그는 API 서버(api_server.py)를 통해서만 다룸
+
+PAGE_SIZE = 20
+# 묶음 기준 유사도 기본값 (faq_dedupe.CLUSTER_SIMILARITY_THRESHOLD와 같게)
+CLUSTER_SIMILARITY_THRESHOLD = 0.85
+# 성능 탭에서 읽을 최근 추적 구간 수
+TRACE_SPAN_LIMITS = [1000, 5000, 20000]
+
+# 추적 구간 이름 -> 화면 표시 이름
+SPAN_LABELS = {
+    "turn": "턴 전체",
+    "classification": "분류 (LLM)",
+    "query_rewrite": "질문 재구성",
+    "embedding": "임베딩",
+    "vector_search": "벡터 검색",
+    "generation": "답변 생성",
+    "faq_persistence": "FAQ 후보 저장",
+}
+
+STATUS_LABELS = {
+    "pending_review": "⏳ 검토 대기",
+    "approved": "✅ 승인됨",
+    "rejected": "❌ 거절됨",
+    None: "전체",
+}
+
+
+@st.cache_resource
+def get_client():
+    """앱 전체에서 연결을 재사용하는 API 클라이언트"""
+    return HelpdeskClient()
+
+
+def approve_faqs(approvals):
+    """FAQ 묶음 승인 처리
+
+    approvals: [(후보 ID 목록, 확정 질문, 확정 답변)]. 저장소 갱신은 한
+    트랜잭션, ChromaDB 추가는 한 번의 upsert로 서버가 처리한다.
+    """
     try:
-        with open(APPROVED_FAQS_FILE, "w", encoding="utf-8") as f:
-            json.dump(faqs, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        st.error(f"승인된 FAQ 저장 실패: {e}")
+        result = get_client().approve_candidates(approvals)
+    except ApiError as e:
+        st.error(f"FAQ 승인 실패: {e}")
         return False
 
-
-def approve_faq(candidate_index, edited_question, edited_answer):
-    """FAQ 승인 처리"""
-    try:
-        # 1. FAQ 후보에서 승인 상태로 변경
-        candidates = load_faq_candidates()
-        if 0 <= candidate_index < len(candidates):
-            candidates[candidate_index]["status"] = "approved"
-            candidates[candidate_index]["edited_question"] = edited_question
-            candidates[candidate_index]["edited_answer"] = edited_answer
-            candidates[candidate_index]["approved_at"] = datetime.now().strftime(
-                "%Y-%m-%d %H:%M:%S"
-            )
-
-            # 2. 승인된 FAQ 목록에 추가
-            approved_faqs = load_approved_faqs()
-            new_faq = {
-                "id": f"approved_{len(approved_faqs) + 1:03d}",
-                "question": edited_question,
-                "answer": edited_answer,
-                "original_question": candidates[candidate_index]["question"],
-                "approved_at": candidates[candidate_index]["approved_at"],
-                "category": "user_generated",
-            }
-            approved_faqs.append(new_faq)
-
-            # 3. 저장
-            if save_faq_candidates(candidates) and save_approved_faqs(approved_faqs):
-                # 4. ChromaDB에 추가
-                add_to_chromadb(new_faq)
-                return True
-        return False
-    except Exception as e:
-        st.error(f"FAQ 승인 실패: {e}")
+    new_faqs = result["approved"]
+    if len(new_faqs) < result["requested"]:
+        st.warning("일부 FAQ 후보는 이미 다른 관리자가 처리했습니다.")
+    if not new_faqs:
         return False
+    st.success(f"✅ ChromaDB에 FAQ {len(new_faqs)}개 추가 완료!")
+    return True
 
 
-def reject_faq(candidate_index, reason=""):
-    """FAQ 거절 처리"""
+def reject_faqs(candidate_ids, reason=""):
+    """FAQ 후보 일괄 거절 처리"""
     try:
-        candidates = load_faq_candidates()
-        if 0 <= candidate_index < len(candidates):
-            candidates[candidate_index]["status"] = "rejected"
-            candidates[candidate_index]["rejection_reason"] = reason
-            candidates[candidate_index]["rejected_at"] = datetime.now().strftime(
-                "%Y-%m-%d %H:%M:%S"
-            )
-            return save_faq_candidates(candidates)
-        return False
-    except Exception as e:
+        result = get_client().reject_candidates(candidate_ids, reason)
+    except ApiError as e:
         st.error(f"FAQ 거절 실패: {e}")
         return False
 
+    if result["rejected"] < result["requested"]:
+        st.warning("일부 FAQ 후보는 이미 다른 관리자가 처리했습니다.")
+    return result["rejected"] > 0
+
+
+def get_pending_clusters(filters, threshold, total):
+    """필터에 맞는 검토 대기 후보 전체의 묶음 ({total, clustered, clusters})
+
+    필터/기준/대기 후보 수가 그대로면 다시 계산하지 않는다 (승인/거절로 후보 수가
+    바뀌면 새로 묶음).
+    """
+    filters = {k: v for k, v in filters.items() if k != "status"}
+    cache_key = (tuple(sorted(filters.items())), threshold, total)
+    cached = st.session_state.get("admin_clusters")
+    if cached is None or cached[0] != cache_key:
+        result = get_client().cluster_candidates(threshold, **filters)
+        cached = (cache_key, result)
+        st.session_state.admin_clusters = cached
+    return cached[1]
+
+
+def selected_members(cluster):
+    """묶음에서 체크된 후보 ID (체크 해제한 후보는 이번 처리에서 제외)"""
+    cluster_key = cluster[0]["id"]
+    return [
+        c["id"]
+        for c in cluster
+        if st.session_state.get(f"member_{cluster_key}_{c['id']}", True)
+    ]
+
+
+def cluster_approval(cluster):
+    """묶음의 (선택된 후보 ID, 편집한 대표 질문, 편집한 대표 답변)"""
+    canonical = cluster[0]
+    cluster_key = canonical["id"]
+    return (
+        selected_members(cluster),
+        st.session_state.get(f"q_{cluster_key}", canonical["question"]),
+        st.session_state.get(f"a_{cluster_key}", canonical["generated_answer"]),
+    )
 
-def add_to_chromadb(faq):
-    """승인된 FAQ를 ChromaDB에 추가"""
-    try:
-        api_key = os.getenv("UPSTAGE_API_KEY")
-        embeddings = UpstageEmbeddings(api_key=api_key, model="solar-embedding-1-large")
-        db = Chroma(persist_directory="chroma_db", embedding_function=embeddings)
-
-        # 새 FAQ를 Document로 변환
-        doc = Document(
-            page_content=f"질문: {faq['question']}\n답변: {faq['answer']}",
-            metadata={
-                "id": faq["id"],
-                "category": faq["category"],
-                "type": "user_generated_faq",
-                "approved_at": faq["approved_at"],
-            },
+
+def listing_filters(key, with_status=False):
+    """검색어/날짜 범위 (+상태) 필터 UI, list_*/count_* 함수에 넘길 인자 반환"""
+    columns = st.columns(3 if with_status else 2)
+    filters = {}
+    if with_status:
+        filters["status"] = columns[2].selectbox(
+            "상태",
+            list(STATUS_LABELS),
+            format_func=STATUS_LABELS.get,
+            key=f"{key}_status",
+        )
+    filters["text"] = columns[0].text_input("검색어", key=f"{key}_text").strip()
+    # 날짜 하나만 고르면 그날 하루, 둘 고르면 그 기간
+    date_range = columns[1].date_input("날짜 범위", value=(), key=f"{key}_dates")
+    filters["date_from"] = date_range[0] if date_range else None
+    filters["date_to"] = date_range[-1] if date_range else None
+    return filters
+
+
+def page_offset(total, key, page_size=PAGE_SIZE):
+    """페이지 선택 UI, 현재 페이지의 offset 반환"""
+    pages = max(1, math.ceil(total / page_size))
+    # 필터가 바뀌어 페이지 수가 줄었으면 마지막 페이지로
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages
+    page = st.number_input(
+        f"페이지 (전체 {pages}쪽, {total}개)",
+        min_value=1,
+        max_value=pages,
+        step=1,
+        key=key,
+    )
+    return (page - 1) * page_size
+
+
+def render_review_queue(filters, total):
+    """검토 대기 후보 묶음 + 승인/거절 (필터에 맞는 후보 전체를 묶은 뒤 묶음 단위 페이지)"""
+    threshold = st.slider(
+        "묶음 기준 유사도",
+        min_value=0.70,
+        max_value=0.99,
+        value=CLUSTER_SIMILARITY_THRESHOLD,
+        step=0.01,
+        help="질문 임베딩 유사도가 이 값 이상인 후보를 한 묶음으로 보여줍니다.",
+    )
+    result = get_pending_clusters(filters, threshold, total)
+    st.write(
+        f"총 {result['total']}개의 FAQ가 검토를 기다리고 있습니다. "
+        f"({len(result['clusters'])}개 묶음)"
+    )
+    if result["clustered"] < result["total"]:
+        st.caption(
+            f"후보가 많아 최신 {result['clustered']}개만 묶었습니다. "
+            "검색어나 날짜로 범위를 좁혀 보세요."
         )
 
-        db.add_documents([doc])
-        st.success("✅ ChromaDB에 FAQ 추가 완료!")
-        return True
-    except Exception as e:
-        st.error(f"ChromaDB 추가 실패: {e}")
-        return False
+    offset = page_offset(len(result["clusters"]), "clusters_page")
+    clusters = result["clusters"][offset : offset + PAGE_SIZE]
+
+    # 선택한 묶음 일괄 처리 (묶음마다 편집한 대표 Q/A 사용)
+    selected = [
+        cluster
+        for cluster in clusters
+        if st.session_state.get(f"select_{cluster[0]['id']}", False)
+    ]
+    col_bulk_approve, col_bulk_reject = st.columns(2)
+    with col_bulk_approve:
+        if st.button(
+            f"✅ 선택한 묶음 {len(selected)}개 일괄 승인", disabled=not selected
+        ):
+            approvals = [cluster_approval(cluster) for cluster in selected]
+            approvals = [a for a in approvals if a[0]]
+            if approve_faqs(approvals):
+                st.success("FAQ 일괄 승인 완료!")
+                st.rerun()
+    with col_bulk_reject:
+        bulk_reason = st.text_input("일괄 거절 사유:", key="bulk_reason")
+        if st.button(
+            f"❌ 선택한 묶음 {len(selected)}개 일괄 거절", disabled=not selected
+        ):
+            candidate_ids = [
+                i for cluster in selected for i in selected_members(cluster)
+            ]
+            if reject_faqs(candidate_ids, bulk_reason):
+                st.success("FAQ 일괄 거절 완료!")
+                st.rerun()
+
+    for n, cluster in enumerate(clusters, offset + 1):
+        canonical = cluster[0]
+        # 대표 후보의 저장소 ID (목록 순서가 바뀌어도 같은 묶음을 가리킴)
+        cluster_key = canonical["id"]
+        total_count = sum(c.get("occurrence_count", 1) for c in cluster)
+        title = f"묶음 #{n}: {canonical['question'][:50]}..."
+        if len(cluster) > 1 or total_count > 1:
+            title += f" ({len(cluster)}개 질문, 총 {total_count}회)"
+
+        with st.expander(title):
+            st.checkbox("일괄 처리 대상으로 선택", key=f"select_{cluster_key}")
+            col1, col2 = st.columns([2, 1])
+
+            with col1:
+                st.write("**묶인 질문:**")
+                for candidate in cluster:
+                    label = candidate["question"]
+                    occurrence_count = candidate.get("occurrence_count", 1)
+                    if occurrence_count > 1:
+                        label += f" ({occurrence_count}회)"
+                    st.checkbox(
+                        label,
+                        value=True,
+                        key=f"member_{cluster_key}_{candidate['id']}",
+                        help=f"등록 시간: {candidate['timestamp']}",
+                    )
+
+                st.write("**AI 생성 답변 (대표 질문):**")
+                st.write(canonical["generated_answer"])
+
+                st.write("**등록 시간:**", canonical["timestamp"])
+
+                occurrences = [t for c in cluster for t in c.get("occurrences", [])]
+                if len(occurrences) > 1:
+                    st.caption(
+                        "최근 질문 시각: " + ", ".join(sorted(occurrences)[-5:])
+                    )
+
+            with col2:
+                st.write("**대표 Q/A 편집**")
+
+                st.text_area(
+                    "질문 편집:",
+                    value=canonical["question"],
+                    key=f"q_{cluster_key}",
+                )
+
+                st.text_area(
+                    "답변 편집:",
+                    value=canonical["generated_answer"],
+                    height=150,
+                    key=f"a_{cluster_key}",
+                )
+
+                reason = st.text_input("거절 사유:", key=f"reason_{cluster_key}")
+
+                col_approve, col_reject = st.columns(2)
+
+                with col_approve:
+                    if st.button("✅ 승인", key=f"approve_{cluster_key}"):
+                        approval = cluster_approval(cluster)
+                        if approval[0] and approve_faqs([approval]):
+                            st.success("FAQ 승인 완료!")
+                            st.rerun()
+
+                with col_reject:
+                    if st.button("❌ 거절", key=f"reject_{cluster_key}"):
+                        if reject_faqs(selected_members(cluster), reason):
+                            st.success("FAQ 거절 완료!")
+                            st.rerun()
+
+
+def render_candidate_list(candidates):
+    """처리된 후보 등 읽기 전용 목록 (현재 페이지 후보만)"""
+    for candidate in candidates:
+        status_emoji = STATUS_LABELS.get(candidate.get("status"), "❓")[0]
+        with st.expander(
+            f"{status_emoji} #{candidate['id']}: {candidate['question'][:50]}..."
+        ):
+            st.write("**원본 질문:**", candidate["question"])
+            st.write("**AI 생성 답변:**", candidate["generated_answer"])
+            st.write("**등록 시간:**", candidate["timestamp"])
+            if candidate.get("occurrence_count", 1) > 1:
+                st.write("**질문 횟수:**", f"{candidate['occurrence_count']}회")
+            if candidate.get("status") == "approved":
+                st.write("**승인 질문:**", candidate.get("edited_question", ""))
+                st.write("**승인 일시:**", candidate.get("approved_at", ""))
+            elif candidate.get("status") == "rejected":
+                st.write("**거절 사유:**", candidate.get("rejection_reason") or "-")
+                st.write("**거절 일시:**", candidate.get("rejected_at", ""))
+
+
+def render_trend_charts():
+    """후보 유입/승인 대기 시간/분류 비율 추이 (일별/시간별 집계값만 조회)"""
+    st.subheader("추이")
+    period = st.radio(
+        "집계 단위",
+        ["day", "hour"],
+        format_func={"day": "일별 (최근 30일)", "hour": "시간별 (최근 48시간)"}.get,
+        horizontal=True,
+    )
+    if period == "day":
+        since = (datetime.now() - timedelta(days=29)).date().isoformat()
+    else:
+        since = (datetime.now() - timedelta(hours=47)).isoformat(timespec="minutes")
+
+    series = get_client().stats_series(period, since)
+    if not series:
+        st.info("아직 집계된 데이터가 없습니다.")
+        return
+
+    df = pd.DataFrame.from_dict(series, orient="index").fillna(0).sort_index()
+
+    st.write("**FAQ 후보 유입**")
+    inflow = pd.DataFrame(
+        {
+            "새 후보": df.get("candidates", 0),
+            "전체 질문 (중복 포함)": df.get("occurrences", 0),
+        },
+        index=df.index,
+    )
+    st.line_chart(inflow)
+
+    st.write("**평균 승인 대기 시간 (시간)**")
+    if "approved" in df:
+        approved = df["approved"].where(df["approved"] > 0)
+        latency_hours = df.get("approval_latency_sum", 0) / approved / 3600
+        st.bar_chart(latency_hours.dropna().rename("평균 승인 대기"))
+    else:
+        st.caption("기간 내 승인된 FAQ가 없습니다.")
+
+    st.write("**질문 분류 비율 (existing/new/skip)**")
+    classification_columns = [c for c in df.columns if c.startswith("classification:")]
+    if classification_columns:
+        mix = df[classification_columns].rename(
+            columns=lambda c: c.split(":", 1)[1]
+        )
+        st.bar_chart(mix)
+    else:
+        st.caption("기간 내 기록된 대화가 없습니다.")
+
+    st.write("**분류 경로 (로컬 키워드 / 벡터 유사도 / LLM 호출)**")
+    routing_columns = [c for c in df.columns if c.startswith("routing:")]
+    if routing_columns:
+        routes = df[routing_columns].rename(columns=lambda c: c.split(":", 1)[1])
+        st.bar_chart(routes)
+    else:
+        st.caption("기간 내 기록된 분류 경로가 없습니다.")
+
+
+def render_performance():
+    """추적 로그(JSONL)의 단계별 지연 시간, 토큰, 캐시 적중률과 느린 턴"""
+    limit = st.select_slider("최근 구간 수", TRACE_SPAN_LIMITS, value=5000)
+    traces = get_client().traces(limit)
+    st.caption(
+        f"API 서버를 `HELPDESK_TRACE=1`로 실행하면 `{traces['trace_file']}`에 "
+        "단계별 구간이 기록됩니다."
+        + ("" if traces["enabled"] else " (현재 꺼져 있음)")
+    )
+    spans = traces["spans"]
+    if not spans:
+        st.info("기록된 추적 구간이 없습니다.")
+        return
+
+    summary = traces["summary"]
+    turns = [s for s in spans if s["name"] == "turn"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    turn_stats = summary.get("turn")
+    with col1:
+        st.metric("턴 수", len(turns))
+    with col2:
+        st.metric("턴 p50", f"{turn_stats['p50_ms'] / 1000:.2f}초" if turn_stats else "-")
+    with col3:
+        st.metric("턴 p95", f"{turn_stats['p95_ms'] / 1000:.2f}초" if turn_stats else "-")
+    with col4:
+        errors = turn_stats["errors"] / turn_stats["count"] if turn_stats else 0
+        st.metric("오류율", f"{errors:.1%}")
+
+    st.subheader("단계별 소요 시간")
+    table = pd.DataFrame.from_dict(summary, orient="index")
+    table = table.loc[[name for name in SPAN_LABELS if name in table.index]]
+    table = table.rename(index=SPAN_LABELS).rename(
+        columns={
+            "count": "횟수",
+            "errors": "오류",
+            "p50_ms": "p50(ms)",
+            "p95_ms": "p95(ms)",
+            "mean_ms": "평균(ms)",
+            "max_ms": "최대(ms)",
+            "input_tokens": "입력 토큰",
+            "output_tokens": "출력 토큰",
+            "cache_hit_rate": "캐시 적중률",
+        }
+    )
+    st.dataframe(table.round(1), use_container_width=True)
+
+    if not turns:
+        return
+
+    df = pd.DataFrame(
+        {
+            "ts": t["ts"],
+            "trace_id": t["trace_id"],
+            "duration_ms": t["duration_ms"],
+            "classification": (t.get("attributes") or {}).get("classification", "-"),
+            "answer_cache_hit": (t.get("attributes") or {}).get("answer_cache_hit"),
+        }
+        for t in turns
+    )
+
+    st.subheader("분류별 턴 소요 시간 (ms)")
+    by_class = df.groupby("classification")["duration_ms"]
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "횟수": by_class.count(),
+                "p50": by_class.quantile(0.5),
+                "p95": by_class.quantile(0.95),
+            }
+        ).round(1),
+        use_container_width=True,
+    )
+    cache_checked = df["answer_cache_hit"].dropna()
+    if len(cache_checked):
+        st.caption(
+            f"첫 질문 답변 캐시 적중률: {cache_checked.astype(bool).mean():.1%}"
+            f" ({len(cache_checked)}턴)"
+        )
+
+    st.write("**턴 소요 시간 추이 (ms)**")
+    st.line_chart(df.set_index("ts")["duration_ms"])
+
+    st.subheader("느린 턴")
+    children = {}
+    for record in spans:
+        children.setdefault(record["trace_id"], []).append(record)
+    for turn in df.nlargest(10, "duration_ms").itertuples():
+        with st.expander(
+            f"{turn.duration_ms / 1000:.2f}초 · {turn.classification} · {turn.ts}"
+        ):
+            rows = [
+                {
+                    "구간": SPAN_LABELS.get(r["name"], r["name"]),
+                    "ms": r["duration_ms"],
+                    "상태": r.get("status"),
+                    "속성": r.get("attributes"),
+                }
+                for r in children.get(turn.trace_id, [])
+                if r["name"] != "turn"
+            ]
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
 
 
 def main():
@@ -128,111 +457,58 @@ def main():
 
     st.title("👨‍💼 FAQ 관리자 페이지")
 
-    # 데이터를 한 번만 로드하고 session_state에 캐시
-    if "admin_candidates" not in st.session_state:
-        st.session_state.admin_candidates = load_faq_candidates()
-
-    if "admin_approved_faqs" not in st.session_state:
-        st.session_state.admin_approved_faqs = load_approved_faqs()
+    client = get_client()
+    try:
+        client.health()
+    except ApiError as e:
+        st.error(f"헬프데스크 서버에 연결할 수 없습니다: {e}")
+        st.stop()
 
-    # 새로고침 버튼
+    # 목록은 실행할 때마다 현재 페이지만 DB에서 조회 (전체 목록을 들고 있지 않음)
     if st.button("🔄 데이터 새로고침"):
-        st.session_state.admin_candidates = load_faq_candidates()
-        st.session_state.admin_approved_faqs = load_approved_faqs()
+        st.session_state.pop("admin_clusters", None)
         st.success("데이터를 새로고침했습니다!")
 
     # 탭 생성
-    tab1, tab2, tab3, tab4 = st.tabs(
-        ["📋 대기 중인 FAQ", "✅ 승인된 FAQ", "📊 통계", "🛠️ 관리"]
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["📋 대기 중인 FAQ", "✅ 승인된 FAQ", "📊 통계", "⏱️ 성능", "🛠️ 관리"]
     )
 
     with tab1:
         st.header("📋 검토 대기 중인 FAQ 후보")
 
-        # 캐시된 데이터 사용
-        candidates = st.session_state.admin_candidates
-        pending = [c for c in candidates if c.get("status") == "pending_review"]
+        filters = listing_filters("candidates", with_status=True)
+        total = client.list_candidates(limit=0, **filters)["total"]
 
-        if not pending:
-            st.info("현재 검토 대기 중인 FAQ가 없습니다.")
+        if not total:
+            if filters["status"] == "pending_review":
+                st.info("현재 검토 대기 중인 FAQ가 없습니다.")
+            else:
+                st.info("조건에 맞는 FAQ 후보가 없습니다.")
+        elif filters["status"] == "pending_review":
+            render_review_queue(filters, total)
         else:
-            st.write(f"총 {len(pending)}개의 FAQ가 검토를 기다리고 있습니다.")
-
-            for i, candidate in enumerate(pending):
-                with st.expander(f"FAQ 후보 #{i+1}: {candidate['question'][:50]}..."):
-                    col1, col2 = st.columns([2, 1])
-
-                    with col1:
-                        st.write("**원본 질문:**")
-                        st.write(candidate["question"])
-
-                        st.write("**AI 생성 답변:**")
-                        st.write(candidate["generated_answer"])
-
-                        st.write("**등록 시간:**", candidate["timestamp"])
-
-                    with col2:
-                        st.write("**편집**")
-
-                        # 원본 찾기 (전체 candidates에서의 인덱스)
-                        original_index = candidates.index(candidate)
-
-                        edited_question = st.text_area(
-                            "질문 편집:",
-                            value=candidate["question"],
-                            key=f"q_{original_index}",
-                        )
-
-                        edited_answer = st.text_area(
-                            "답변 편집:",
-                            value=candidate["generated_answer"],
-                            height=150,
-                            key=f"a_{original_index}",
-                        )
-
-                        col_approve, col_reject = st.columns(2)
-
-                        with col_approve:
-                            if st.button("✅ 승인", key=f"approve_{original_index}"):
-                                if approve_faq(
-                                    original_index, edited_question, edited_answer
-                                ):
-                                    st.success("FAQ 승인 완료!")
-                                    # 캐시 업데이트
-                                    st.session_state.admin_candidates = (
-                                        load_faq_candidates()
-                                    )
-                                    st.session_state.admin_approved_faqs = (
-                                        load_approved_faqs()
-                                    )
-                                    st.rerun()
-
-                        with col_reject:
-                            if st.button("❌ 거절", key=f"reject_{original_index}"):
-                                reason = st.text_input(
-                                    "거절 사유:", key=f"reason_{original_index}"
-                                )
-                                if reject_faq(original_index, reason):
-                                    st.success("FAQ 거절 완료!")
-                                    # 캐시 업데이트
-                                    st.session_state.admin_candidates = (
-                                        load_faq_candidates()
-                                    )
-                                    st.rerun()
+            offset = page_offset(total, "candidates_page")
+            page = client.list_candidates(limit=PAGE_SIZE, offset=offset, **filters)
+            render_candidate_list(page["items"])
 
     with tab2:
         st.header("✅ 승인된 FAQ 목록")
 
-        # 캐시된 데이터 사용
-        approved_faqs = st.session_state.admin_approved_faqs
+        filters = listing_filters("approved")
+        total = client.list_approved(limit=0, **filters)["total"]
 
-        if not approved_faqs:
+        if not total:
             st.info("아직 승인된 FAQ가 없습니다.")
         else:
-            st.write(f"총 {len(approved_faqs)}개의 FAQ가 승인되었습니다.")
+            st.write(f"총 {total}개의 FAQ가 승인되었습니다.")
 
-            for i, faq in enumerate(approved_faqs):
-                with st.expander(f"FAQ #{i+1}: {faq['question'][:50]}..."):
+            offset = page_offset(total, "approved_page")
+            approved_faqs = client.list_approved(
+                limit=PAGE_SIZE, offset=offset, **filters
+            )
+            for faq in approved_faqs["items"]:
+                with st.expander(f"{faq['id']}: {faq['question'][:50]}..."):
                     st.write("**질문:**", faq["question"])
                     st.write("**답변:**", faq["answer"])
                     st.write("**승인 일시:**", faq["approved_at"])
@@ -244,38 +520,50 @@ def main():
     with tab3:
         st.header("📊 FAQ 관리 통계")
 
-        # 캐시된 데이터 사용
-        candidates = st.session_state.admin_candidates
-        approved_faqs = st.session_state.admin_approved_faqs
-
-        # 통계 계산
-        total_candidates = len(candidates)
-        pending_count = len(
-            [c for c in candidates if c.get("status") == "pending_review"]
-        )
-        approved_count = len([c for c in candidates if c.get("status") == "approved"])
-        rejected_count = len([c for c in candidates if c.get("status") == "rejected"])
+        # 통계 계산 (추가/승인/거절 때마다 갱신되는 집계값만 조회)
+        totals = client.stats_totals()
+        approved_count = int(totals.get("approved", 0))
 
         # 메트릭 표시
-        col1, col2, col3, col4 = st.columns(4)
+        col1, col2, col3, col4, col5 = st.columns(5)
 
         with col1:
-            st.metric("총 FAQ 후보", total_candidates)
+            st.metric("총 FAQ 후보", int(totals.get("candidates", 0)))
 
         with col2:
-            st.metric("대기 중", pending_count)
+            st.metric("대기 중", int(totals.get("pending_review", 0)))
 
         with col3:
             st.metric("승인됨", approved_count)
 
         with col4:
-            st.metric("거절됨", rejected_count)
+            st.metric("거절됨", int(totals.get("rejected", 0)))
+
+        with col5:
+            latency = totals.get("approval_latency_sum", 0) / (approved_count or 1)
+            st.metric("평균 승인 대기", f"{latency / 3600:.1f}시간")
+
+        # 로컬 키워드/벡터 유사도로 분류해 solar-mini 호출을 생략한 비율
+        routed = {
+            name: int(totals.get(f"routing:{name}", 0))
+            for name in ("local", "similarity", "llm")
+        }
+        routed_total = sum(routed.values())
+        if routed_total:
+            col_local, col_similarity, col_llm = st.columns(3)
+            with col_local:
+                st.metric("로컬 분류", routed["local"])
+            with col_similarity:
+                st.metric("유사도 분류", routed["similarity"])
+            with col_llm:
+                saved = (routed["local"] + routed["similarity"]) / routed_total
+                st.metric("LLM 분류 호출", routed["llm"], f"{saved:.0%} 절약")
+
+        render_trend_charts()
 
         # 최근 활동
         st.subheader("최근 활동")
-        recent_candidates = sorted(
-            candidates, key=lambda x: x.get("timestamp", ""), reverse=True
-        )[:5]
+        recent_candidates = client.list_candidates(limit=5)["items"]
 
         for candidate in recent_candidates:
             status_emoji = {
@@ -289,6 +577,10 @@ def main():
             )
 
     with tab4:
+        st.header("⏱️ 성능")
+        render_performance()
+
+    with tab5:
         st.header("🛠️ 시스템 관리")
 
         st.subheader("위험한 작업")
@@ -299,26 +591,45 @@ def main():
         with col1:
             if st.button("🗑️ 모든 FAQ 후보 삭제", type="secondary"):
                 if st.checkbox("정말 삭제하시겠습니까?"):
-                    if clear_all_candidates():
+                    try:
+                        cleared = client.clear_candidates()["deleted"]
+                    except ApiError as e:
+                        st.error(f"FAQ 후보 삭제 실패: {e}")
+                        cleared = False
+                    if cleared:
                         st.success("모든 FAQ 후보가 삭제되었습니다.")
                         # 캐시 초기화
-                        st.session_state.admin_candidates = []
+                        st.session_state.pop("admin_clusters", None)
                         st.rerun()
 
         with col2:
             if st.button("🔄 ChromaDB 재구성", type="secondary"):
-                st.info("이 기능은 아직 구현되지 않았습니다.")
+                # 백그라운드에서 새 인덱스를 만들고 완성되면 교체 (챗봇은 계속 응답)
+                if client.start_rebuild():
+                    st.success("ChromaDB 재구성을 시작했습니다.")
+                else:
+                    st.info("이미 재구성이 진행 중입니다.")
+
+            rebuild = client.rebuild_status()
+            if rebuild["status"] == "running":
+                total = rebuild["total"] or 1
+                st.progress(
+                    min(rebuild["done"] / total, 1.0),
+                    text=f"{rebuild['message']} ({rebuild['done']}/{rebuild['total']})",
+                )
+                st.button("진행 상황 새로고침")
+            elif rebuild["status"] == "done":
+                st.success(f"✅ {rebuild['message']}")
+            elif rebuild["status"] == "failed":
+                st.error(f"재구성 실패: {rebuild['message']} (기존 인덱스 유지)")
 
         st.subheader("데이터 내보내기")
 
-        # JSON 다운로드
-        candidates = st.session_state.admin_candidates
-        approved_faqs = st.session_state.admin_approved_faqs
-
+        # JSON 다운로드 (저장소 전체)
         if st.button("📥 FAQ 후보 데이터 다운로드"):
             st.download_button(
                 label="다운로드",
-                data=json.dumps(candidates, ensure_ascii=False, indent=2),
+                data=client.export_candidates(),
                 file_name=f"faq_candidates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
             )
@@ -326,7 +637,7 @@ def main():
         if st.button("📥 승인된 FAQ 데이터 다운로드"):
             st.download_button(
                 label="다운로드",
-                data=json.dumps(approved_faqs, ensure_ascii=False, indent=2),
+                data=client.export_approved(),
                 file_name=f"approved_faqs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
             )
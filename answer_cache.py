@@ -0,0 +1,121 @@
+import threading
+import time
+
+import numpy as np
+from atomic_io import atomic_write_text
+
+INDEX_VERSION_FILE = "index_version.txt"
+
+# 캐시된 질문과 이 코사인 유사도 이상이면 같은 질문으로 보고 캐시 답변 사용
+ANSWER_CACHE_THRESHOLD = 0.95
+ANSWER_CACHE_TTL = 60 * 60  # 초
+ANSWER_CACHE_CAPACITY = 256
+
+
+def current_index_version(path=INDEX_VERSION_FILE):
+    """벡터 DB 내용 버전 (문서가 추가/변경될 때마다 바뀜)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def bump_index_version(path=INDEX_VERSION_FILE):
+    """벡터 DB 내용이 바뀌었음을 기록 (다른 프로세스의 답변 캐시도 무효화됨)"""
+    version = str(time.time_ns())
+    atomic_write_text(path, version)
+    return version
+
+
+class SemanticAnswerCache:
+    """질문 임베딩 유사도로 찾는 답변 캐시
+
+    대화 기록 없는 첫 질문에 대해, 거의 같은 질문의 답변이 있으면
+    검색/생성 없이 그대로 돌려준다. 항목은 TTL이 지나거나 벡터 DB
+    버전이 바뀌면 버려지고, 용량을 넘으면 오래된 것부터 버린다.
+    """
+
+    def __init__(
+        self,
+        threshold=ANSWER_CACHE_THRESHOLD,
+        ttl=ANSWER_CACHE_TTL,
+        capacity=ANSWER_CACHE_CAPACITY,
+        version_path=INDEX_VERSION_FILE,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.capacity = capacity
+        self.version_path = version_path
+
+        self._lock = threading.Lock()
+        self._entries = []  # {"question", "answer", "vector", "created_at"}
+        self._matrix = None
+        self._version = current_index_version(version_path)
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _refresh(self, now):
+        version = current_index_version(self.version_path)
+        if version != self._version:
+            self._entries = []
+            self._version = version
+            self._stats["invalidations"] += 1
+
+        alive = [e for e in self._entries if now - e["created_at"] < self.ttl]
+        if len(alive) != len(self._entries) or self._matrix is None:
+            self._entries = alive
+            self._matrix = (
+                np.vstack([e["vector"] for e in alive]) if alive else None
+            )
+
+    def lookup(self, query_embedding):
+        """유사한 질문의 캐시 답변 (없으면 None)"""
+        vector = _unit(query_embedding)
+        with self._lock:
+            self._refresh(time.time())
+            if self._matrix is not None:
+                scores = self._matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._stats["hits"] += 1
+                    entry = self._entries[best]
+                    print(
+                        f"💾 답변 캐시 적중 ({scores[best]:.3f}): {entry['question'][:30]}"
+                    )
+                    return entry["answer"]
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, question, query_embedding, answer):
+        """답변을 캐시에 추가"""
+        now = time.time()
+        with self._lock:
+            self._refresh(now)
+            self._entries.append(
+                {
+                    "question": question,
+                    "answer": answer,
+                    "vector": _unit(query_embedding),
+                    "created_at": now,
+                }
+            )
+            # 용량 초과 시 오래된 항목부터 제거
+            self._entries = self._entries[-self.capacity :]
+            self._matrix = np.vstack([e["vector"] for e in self._entries])
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._matrix = None
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        return stats
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,162 @@
+import os
+
+import httpx
+
+# API 서버 주소 (uvicorn api_server:app)
+HELPDESK_API_URL = os.getenv("HELPDESK_API_URL", "http://127.0.0.1:8000")
+# 서버에 HELPDESK_ADMIN_TOKEN이 설정돼 있으면 관리자 요청에 같은 값을 보냄
+HELPDESK_ADMIN_TOKEN = os.getenv("HELPDESK_ADMIN_TOKEN")
+# 답변 생성/요약은 LLM 호출이 끝날 때까지 기다리므로 읽기 시간을 넉넉하게
+API_TIMEOUT = httpx.Timeout(10.0, read=120.0)
+
+
+class ApiError(Exception):
+    """API 서버 오류 (연결 실패면 status_code가 None)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _detail(response):
+    try:
+        return response.json().get("detail", response.text)
+    except ValueError:
+        return response.text
+
+
+class HelpdeskClient:
+    """Streamlit 페이지에서 쓰는 API 서버 클라이언트 (연결 재사용)"""
+
+    def __init__(
+        self,
+        base_url=HELPDESK_API_URL,
+        timeout=API_TIMEOUT,
+        admin_token=HELPDESK_ADMIN_TOKEN,
+    ):
+        self.base_url = base_url
+        headers = {"X-Admin-Token": admin_token} if admin_token else None
+        self._client = httpx.Client(base_url=base_url, timeout=timeout, headers=headers)
+
+    def _request(self, method, path, **kwargs):
+        try:
+            response = self._client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            raise ApiError(f"API 서버 연결 실패 ({self.base_url}): {e}") from e
+        if response.is_error:
+            raise ApiError(_detail(response), response.status_code)
+        return response
+
+    def _json(self, method, path, **kwargs):
+        return self._request(method, path, **kwargs).json()
+
+    def health(self):
+        return self._json("GET", "/health")
+
+    # 대화
+
+    def create_conversation(self):
+        return self._json("POST", "/conversations")
+
+    def get_conversation(self, conversation_id):
+        return self._json("GET", f"/conversations/{conversation_id}")
+
+    def delete_conversation(self, conversation_id):
+        self._request("DELETE", f"/conversations/{conversation_id}")
+
+    def send_message(self, conversation_id, content):
+        """답변을 받는 대로 텍스트 조각으로 내보내는 제너레이터"""
+        path = f"/conversations/{conversation_id}/messages"
+        try:
+            with self._client.stream(
+                "POST", path, json={"content": content, "stream": True}
+            ) as response:
+                if response.is_error:
+                    response.read()
+                    raise ApiError(_detail(response), response.status_code)
+                yield from response.iter_text()
+        except httpx.HTTPError as e:
+            raise ApiError(f"답변 수신 실패: {e}") from e
+
+    def ask(self, conversation_id, content):
+        """스트리밍 없이 답변 ({answer, conversation})"""
+        path = f"/conversations/{conversation_id}/messages"
+        return self._json("POST", path, json={"content": content, "stream": False})
+
+    def save_summary(self, conversation_id, text):
+        path = f"/conversations/{conversation_id}/summary"
+        return self._json("PUT", path, json={"text": text})
+
+    def refresh_summary(self, conversation_id):
+        return self._json("POST", f"/conversations/{conversation_id}/summary/refresh")
+
+    # FAQ 검토
+
+    def list_candidates(self, limit=20, offset=0, newest_first=True, **filters):
+        """FAQ 후보 한 페이지 ({total, items}), filters: status/text/date_from/date_to"""
+        params = {"limit": limit, "offset": offset, "newest_first": newest_first}
+        params = _with_filters(params, filters)
+        return self._json("GET", "/faq/candidates", params=params)
+
+    def cluster_candidates(self, threshold, **filters):
+        """필터에 맞는 검토 대기 후보 묶음 ({total, clustered, clusters})
+
+        filters: text/date_from/date_to
+        """
+        body = _with_filters({"threshold": threshold}, filters)
+        return self._json("POST", "/faq/clusters", json=body)
+
+    def approve_candidates(self, approvals):
+        """approvals: [(후보 ID 목록, 확정 질문, 확정 답변)] -> {requested, approved}"""
+        body = {
+            "approvals": [
+                {"candidate_ids": ids, "question": question, "answer": answer}
+                for ids, question, answer in approvals
+            ]
+        }
+        return self._json("POST", "/faq/candidates/approve", json=body)
+
+    def reject_candidates(self, candidate_ids, reason=""):
+        body = {"candidate_ids": list(candidate_ids), "reason": reason}
+        return self._json("POST", "/faq/candidates/reject", json=body)
+
+    def clear_candidates(self):
+        return self._json("DELETE", "/faq/candidates")
+
+    def list_approved(self, limit=20, offset=0, newest_first=True, **filters):
+        """승인된 FAQ 한 페이지 ({total, items}), filters: text/date_from/date_to"""
+        params = {"limit": limit, "offset": offset, "newest_first": newest_first}
+        params = _with_filters(params, filters)
+        return self._json("GET", "/faq/approved", params=params)
+
+    def export_candidates(self):
+        return self._request("GET", "/faq/candidates/export").text
+
+    def export_approved(self):
+        return self._request("GET", "/faq/approved/export").text
+
+    def stats_totals(self):
+        return self._json("GET", "/faq/stats")
+
+    def stats_series(self, period="day", since=None):
+        params = _with_filters({"period": period}, {"since": since})
+        return self._json("GET", "/faq/stats/series", params=params)
+
+    # 색인/추적
+
+    def start_rebuild(self):
+        return self._json("POST", "/index/rebuild")["started"]
+
+    def rebuild_status(self):
+        return self._json("GET", "/index/rebuild")
+
+    def traces(self, limit=5000):
+        return self._json("GET", "/traces", params={"limit": limit})
+
+
+def _with_filters(params, filters):
+    """값이 있는 필터만 쿼리 파라미터로 (날짜는 YYYY-MM-DD 문자열)"""
+    for key, value in filters.items():
+        if value is not None and value != "":
+            params[key] = str(value)
+    return params
@@ -0,0 +1,409 @@
+"""IT 헬프데스크 API 서버 (챗봇 대화 + FAQ 검토)
+
+Streamlit 챗봇/관리자 페이지는 이 서버를 호출하는 얇은 클라이언트다. 대화 상태는
+conversations.db, FAQ는 faq.db, 벡터 DB는 chroma_db에 두고 프로세스 메모리에는
+캐시만 있으므로, 워커 여러 개가 같은 색인과 저장소를 나눠 쓸 수 있다.
+
+    uvicorn api_server:app --host 127.0.0.1 --port 8000 --workers 4
+
+FAQ 검토/재구성/추적 엔드포인트는 관리자용이므로 기본은 로컬에만 바인딩한다.
+다른 호스트에서 접근하게 하려면 HELPDESK_ADMIN_TOKEN을 설정해 관리자 요청에
+X-Admin-Token 헤더를 요구한다.
+"""
+
+__import__("pysqlite3")
+import sys
+
+sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+
+import os
+import secrets
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+import conversation_store
+import tracing
+from atomic_io import file_lock
+from faq_dedupe import cluster_candidates, CLUSTER_SIMILARITY_THRESHOLD
+from faq_manager import (
+    list_faq_candidates,
+    count_faq_candidates,
+    list_approved_faqs,
+    count_approved_faqs,
+    approve_faq_candidates,
+    reject_faq_candidates,
+    clear_all_candidates,
+    export_faq_candidates_json,
+    export_approved_faqs_json,
+    get_stats_totals,
+    get_stats_series,
+)
+from faq_stats import TIME_FORMAT
+from history import needs_summary_update, update_summary
+from index_rebuild import start_rebuild, get_rebuild_status
+from index_sync import publish_approved_faqs
+from pipeline import aget_response, load_manual, init_faq_system, stream_text
+from resource_pool import get_pool, active_chroma_dir, index_publish_lock
+
+load_dotenv()
+
+# 한 번에 조회할 수 있는 최대 목록 크기
+MAX_PAGE_SIZE = 200
+# 검토 대기 후보 묶음 계산에 쓰는 최대 후보 수 (최신 후보부터)
+MAX_CLUSTER_CANDIDATES = 500
+
+
+def server_api_key():
+    """서버에 설정된 Upstage API 키 (없으면 503)"""
+    api_key = os.getenv("UPSTAGE_API_KEY")
+    if not api_key:
+        raise HTTPException(503, "서버에 UPSTAGE_API_KEY가 설정되지 않았습니다.")
+    return api_key
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """관리자 엔드포인트 인증 (HELPDESK_ADMIN_TOKEN이 설정돼 있을 때만 검사)"""
+    expected = os.getenv("HELPDESK_ADMIN_TOKEN")
+    if expected and not secrets.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(401, "관리자 토큰이 필요합니다.")
+
+
+ADMIN = [Depends(require_admin)]
+
+
+def sync_manual(api_key):
+    """매뉴얼 + 승인된 FAQ를 벡터 DB와 동기화
+
+    워커 여러 개가 동시에 떠도 임베딩은 한 워커만 하도록 파일 잠금 안에서 실행
+    (나머지는 잠금을 기다린 뒤 변경 없음으로 바로 끝남).
+    """
+    # 재구성 후에는 chroma_builds 아래 디렉터리가 활성 인덱스이므로 그 경로로 잠금
+    with file_lock(active_chroma_dir()):
+        report = load_manual(get_pool(api_key).db)
+    if report["added"] or report["updated"] or report["deleted"]:
+        print("✅ 매뉴얼 로딩 완료!")
+    else:
+        print("✅ 기존 매뉴얼 데이터 로딩 완료")
+    return report
+
+
+@asynccontextmanager
+async def lifespan(app):
+    api_key = os.getenv("UPSTAGE_API_KEY")
+    if api_key:
+        await run_in_threadpool(sync_manual, api_key)
+    else:
+        print("API KEY를 찾을 수 없습니다.")
+    # 저장소 스키마 생성/예전 JSON 가져오기
+    init_faq_system()
+    conversation_store.get_connection()
+    yield
+
+
+app = FastAPI(title="IT 헬프데스크 API", lifespan=lifespan)
+
+
+class MessageRequest(BaseModel):
+    content: str = Field(min_length=1)
+    stream: bool = True
+
+
+class SummaryRequest(BaseModel):
+    text: str
+
+
+class ClusterRequest(BaseModel):
+    text: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    threshold: float = Field(CLUSTER_SIMILARITY_THRESHOLD, ge=0, le=1)
+
+
+class Approval(BaseModel):
+    candidate_ids: list[int] = Field(min_length=1)
+    question: str
+    answer: str
+
+
+class ApproveRequest(BaseModel):
+    approvals: list[Approval]
+
+
+class RejectRequest(BaseModel):
+    candidate_ids: list[int]
+    reason: str = ""
+
+
+def _conversation_or_404(conversation_id):
+    conversation = conversation_store.get_conversation(conversation_id)
+    if conversation is None:
+        raise HTTPException(404, "대화를 찾을 수 없습니다.")
+    return conversation
+
+
+def refresh_summary(conversation_id, api_key, force=False):
+    """요약되지 않은 대화가 충분히 쌓였으면 (force면 항상) 이전 요약에 새 턴만 반영"""
+    conversation = conversation_store.get_conversation(conversation_id)
+    if conversation is None:
+        return None
+    messages, summary = conversation["messages"], conversation["summary"]
+    if not force and not needs_summary_update(messages, summary):
+        return conversation
+
+    updated = update_summary(get_pool(api_key).summary_chain, messages, summary)
+    if updated is not summary:
+        conversation_store.save_summary(conversation_id, updated)
+    return conversation_store.get_conversation(conversation_id)
+
+
+def _refresh_summary_quietly(conversation_id, api_key):
+    # 응답을 다 보낸 뒤 실행 (실패해도 다음 턴에 다시 시도)
+    try:
+        refresh_summary(conversation_id, api_key)
+    except Exception as e:
+        print(f"대화 요약 실패: {e}")
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "api_key": bool(os.getenv("UPSTAGE_API_KEY"))}
+
+
+@app.post("/conversations", status_code=201)
+def create_conversation():
+    return conversation_store.create_conversation()
+
+
+@app.get("/conversations/{conversation_id}")
+def get_conversation(conversation_id: str):
+    return _conversation_or_404(conversation_id)
+
+
+@app.delete("/conversations/{conversation_id}", status_code=204)
+def delete_conversation(conversation_id: str):
+    if not conversation_store.delete_conversation(conversation_id):
+        raise HTTPException(404, "대화를 찾을 수 없습니다.")
+
+
+@app.post("/conversations/{conversation_id}/messages")
+async def send_message(
+    conversation_id: str, request: MessageRequest, background_tasks: BackgroundTasks
+):
+    """질문에 답변 (stream=True면 text/plain으로 토큰 단위 전송)
+
+    답변이 끝나면 질문/답변 턴을 대화에 저장하고, 응답을 보낸 뒤 필요하면
+    요약을 갱신한다. 스트리밍 도중 연결이 끊기면 그 턴은 저장하지 않는다.
+    """
+    api_key = server_api_key()
+    conversation = await run_in_threadpool(_conversation_or_404, conversation_id)
+
+    response = await aget_response(
+        request.content,
+        conversation["messages"],
+        api_key,
+        stream=request.stream,
+        summary=conversation["summary"],
+    )
+
+    if request.stream:
+        # 동기 제너레이터는 작업 스레드에서 소비되므로 이벤트 루프를 막지 않음
+        chunks = stream_text(
+            response,
+            lambda answer: conversation_store.append_turn(
+                conversation_id, request.content, answer
+            ),
+        )
+        return StreamingResponse(
+            chunks,
+            media_type="text/plain; charset=utf-8",
+            background=BackgroundTask(
+                _refresh_summary_quietly, conversation_id, api_key
+            ),
+        )
+
+    updated = await run_in_threadpool(
+        conversation_store.append_turn, conversation_id, request.content, response
+    )
+    background_tasks.add_task(_refresh_summary_quietly, conversation_id, api_key)
+    return {"answer": response, "conversation": updated}
+
+
+@app.put("/conversations/{conversation_id}/summary")
+def edit_summary(conversation_id: str, request: SummaryRequest):
+    """사용자가 편집한 요약 저장 (반영 범위는 그대로)"""
+    conversation = _conversation_or_404(conversation_id)
+    summary = dict(conversation["summary"], text=request.text)
+    conversation_store.save_summary(conversation_id, summary, edited=True)
+    return conversation_store.get_conversation(conversation_id)
+
+
+@app.post("/conversations/{conversation_id}/summary/refresh")
+def refresh_summary_now(conversation_id: str):
+    """쌓인 턴 수와 상관없이 지금 요약"""
+    api_key = server_api_key()
+    _conversation_or_404(conversation_id)
+    try:
+        return refresh_summary(conversation_id, api_key, force=True)
+    except Exception as e:
+        raise HTTPException(502, f"요약 실패: {e}")
+
+
+@app.get("/faq/candidates", dependencies=ADMIN)
+def get_candidates(
+    status: Optional[str] = None,
+    text: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 20,
+    offset: int = 0,
+    newest_first: bool = True,
+):
+    """FAQ 후보 한 페이지와 필터에 맞는 전체 개수"""
+    filters = {
+        "status": status,
+        "text": text,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+    return {
+        "total": count_faq_candidates(**filters),
+        "items": list_faq_candidates(
+            limit=min(limit, MAX_PAGE_SIZE),
+            offset=offset,
+            newest_first=newest_first,
+            **filters,
+        ),
+    }
+
+
+@app.delete("/faq/candidates", dependencies=ADMIN)
+def delete_candidates():
+    if not clear_all_candidates():
+        raise HTTPException(500, "FAQ 후보 삭제 실패")
+    return {"deleted": True}
+
+
+@app.post("/faq/clusters", dependencies=ADMIN)
+def get_clusters(request: ClusterRequest):
+    """필터에 맞는 검토 대기 후보 전체를 질문 유사도로 묶은 목록
+
+    페이지와 상관없이 묶어야 다른 페이지에 흩어진 같은 질문이 한 묶음이 된다.
+    후보가 MAX_CLUSTER_CANDIDATES개보다 많으면 최신 후보만 묶는다 (clustered).
+    묶음마다 첫 후보가 대표이며, 페이지 나누기는 클라이언트가 묶음 단위로 한다.
+    """
+    filters = {
+        "status": "pending_review",
+        "text": request.text,
+        "date_from": request.date_from,
+        "date_to": request.date_to,
+    }
+    pending = list_faq_candidates(
+        limit=MAX_CLUSTER_CANDIDATES, newest_first=True, **filters
+    )
+    embeddings = get_pool(server_api_key()).embeddings
+    return {
+        "total": count_faq_candidates(**filters),
+        "clustered": len(pending),
+        "clusters": cluster_candidates(pending, embeddings, request.threshold),
+    }
+
+
+@app.post("/faq/candidates/approve", dependencies=ADMIN)
+def approve_candidates(request: ApproveRequest):
+    """후보 묶음 승인 + 벡터 DB 반영
+
+    다른 관리자가 먼저 처리한 묶음은 건너뛰므로 approved가 요청보다 적을 수 있다.
+    """
+    pool = get_pool(server_api_key())
+    approvals = [(a.candidate_ids, a.question, a.answer) for a in request.approvals]
+    # 재구성이 인덱스를 교체하는 사이에 승인이 끼어들어 새 인덱스에서 빠지지 않도록
+    with index_publish_lock():
+        new_faqs = approve_faq_candidates(approvals)
+        try:
+            publish_approved_faqs(pool.db, new_faqs)
+        except Exception as e:
+            # 저장소 승인은 끝났으므로 벡터 DB는 다음 동기화(재시작/재구성)에서 반영됨
+            raise HTTPException(502, f"ChromaDB 추가 실패: {e}")
+    return {"requested": len(approvals), "approved": new_faqs}
+
+
+@app.post("/faq/candidates/reject", dependencies=ADMIN)
+def reject_candidates(request: RejectRequest):
+    rejected = reject_faq_candidates(request.candidate_ids, request.reason)
+    return {"requested": len(request.candidate_ids), "rejected": rejected}
+
+
+@app.get("/faq/candidates/export", dependencies=ADMIN)
+def export_candidates():
+    return Response(export_faq_candidates_json(), media_type="application/json")
+
+
+@app.get("/faq/approved", dependencies=ADMIN)
+def get_approved(
+    text: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 20,
+    offset: int = 0,
+    newest_first: bool = True,
+):
+    """승인된 FAQ 한 페이지와 필터에 맞는 전체 개수"""
+    filters = {"text": text, "date_from": date_from, "date_to": date_to}
+    return {
+        "total": count_approved_faqs(**filters),
+        "items": list_approved_faqs(
+            limit=min(limit, MAX_PAGE_SIZE),
+            offset=offset,
+            newest_first=newest_first,
+            **filters,
+        ),
+    }
+
+
+@app.get("/faq/approved/export", dependencies=ADMIN)
+def export_approved():
+    return Response(export_approved_faqs_json(), media_type="application/json")
+
+
+@app.get("/faq/stats", dependencies=ADMIN)
+def get_stats():
+    return get_stats_totals()
+
+
+@app.get("/faq/stats/series", dependencies=ADMIN)
+def get_series(period: str = "day", since: Optional[datetime] = None):
+    if period not in ("day", "hour"):
+        raise HTTPException(422, "period는 day 또는 hour")
+    # 버킷과 같은 시각 문자열로 바꿔 넘김 (버킷 길이에 맞춰 자르는 건 집계 쪽에서)
+    return get_stats_series(period, since.strftime(TIME_FORMAT) if since else None)
+
+
+@app.post("/index/rebuild", status_code=202, dependencies=ADMIN)
+def rebuild_index():
+    """ChromaDB 백그라운드 재구성 시작 (이미 진행 중이면 started=False)"""
+    return {"started": start_rebuild(server_api_key())}
+
+
+@app.get("/index/rebuild", dependencies=ADMIN)
+def rebuild_status():
+    return get_rebuild_status()
+
+
+@app.get("/traces", dependencies=ADMIN)
+def get_traces(limit: int = 5000):
+    """최근 추적 구간과 구간 이름별 요약 (관리자 성능 탭용)"""
+    spans = tracing.read_spans(tracing.TRACE_FILE, limit=limit)
+    return {
+        "enabled": tracing.TRACE_ENABLED,
+        "trace_file": tracing.TRACE_FILE,
+        "spans": spans,
+        "summary": tracing.summarize_spans(spans),
+    }
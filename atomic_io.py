@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내부 잠금만 사용
+    fcntl = None
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+# 이 시간(초) 이상 기다린 잠금만 경합으로 셈
+CONTENDED_WAIT_SECONDS = 0.001
+
+
+class LockWaitStats:
+    """잠금을 얻기까지 기다린 시간 통계 (부하 테스트에서 저장소 경합 확인용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {
+                "acquired": 0,
+                "contended": 0,
+                "timeouts": 0,
+                "wait_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+            }
+
+    def record(self, waited):
+        with self._lock:
+            self._stats["acquired"] += 1
+            self._stats["wait_seconds"] += waited
+            if waited >= CONTENDED_WAIT_SECONDS:
+                self._stats["contended"] += 1
+            self._stats["max_wait_seconds"] = max(
+                self._stats["max_wait_seconds"], waited
+            )
+
+    def record_timeout(self):
+        with self._lock:
+            self._stats["timeouts"] += 1
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        acquired = stats["acquired"]
+        if acquired:
+            stats["contended_rate"] = stats["contended"] / acquired
+            stats["mean_wait_seconds"] = stats["wait_seconds"] / acquired
+        else:
+            stats["contended_rate"] = stats["mean_wait_seconds"] = 0.0
+        return stats
+
+
+# file_lock 대기 통계 (프로세스 전체)
+FILE_LOCK_STATS = LockWaitStats()
+
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextmanager
+def file_lock(path):
+    """path.lock 파일로 프로세스/스레드 간 배타 잠금 (같은 파일의 read-modify-write용)"""
+    lock_path = f"{path}.lock"
+    started = time.perf_counter()
+    with _thread_lock(lock_path):
+        if fcntl is None:
+            FILE_LOCK_STATS.record(time.perf_counter() - started)
+            yield
+            return
+        with open(lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            FILE_LOCK_STATS.record(time.perf_counter() - started)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def atomic_write_text(path, text):
+    """같은 디렉터리의 임시 파일에 쓴 뒤 rename (읽는 쪽은 이전/새 내용만 봄)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path, data, **dump_options):
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, **dump_options))
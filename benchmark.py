@@ -0,0 +1,307 @@
+"""오프라인 성능 벤치마크 (Upstage API 대신 결정적 대역 사용)
+
+매뉴얼 시나리오로 만든 질문과 새 유형/잡담 질문으로 단계별 지연 시간(p50/p95),
+메모리, 캐시 적중률을 측정해 JSON으로 남긴다. 임시 디렉터리에서 실행하므로
+실제 faq.db / chroma_db는 건드리지 않는다. 이전 결과와 비교하려면 --compare.
+
+    python benchmark.py --output bench_results/before.json
+    python benchmark.py --output bench_results/after.json \
+        --compare bench_results/before.json
+"""
+
+__import__("pysqlite3")
+import sys
+
+sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+BENCHMARK_API_KEY = "benchmark"
+MANUAL_FILE = "it_helpdesk_manual.json"
+
+# 매뉴얼에 없는 새 유형 질문 (도구 x 질문 형태)
+NEW_TOOLS = ["노션", "슬랙 허들", "깃허브 코파일럿", "피그마", "줌 웨비나", "지라"]
+NEW_PATTERNS = [
+    "{} 사내 도입 일정이 있나요?",
+    "{} 라이선스 신청은 어떻게 하나요?",
+    "{} 보안 정책상 써도 되나요?",
+]
+SKIP_QUESTIONS = ["안녕하세요", "감사합니다", "점심 뭐 먹을까요", "회의실 예약하고 싶어요"]
+
+# 지연 시간을 보고할 단계 (측정 순서)
+STAGES = [
+    "load_manual_cold",
+    "load_manual_warm",
+    "classify",
+    "chroma_query",
+    "handle_existing",
+    "handle_new",
+    "approve",
+    "get_response",
+]
+
+
+def build_corpus(manual_path, rng):
+    """(existing, new, skip) 질문 목록"""
+    with open(manual_path, "r", encoding="utf-8") as f:
+        manual = json.load(f)
+
+    scenarios = sorted({item["metadata"]["scenario"] for item in manual})
+    existing = [f"{scenario} 어떻게 해결하나요?" for scenario in scenarios]
+    for item in manual:
+        keywords = item["metadata"]["keywords"]
+        existing.append(f"{' '.join(keywords[:2])} 문제가 있어요")
+    new = [pattern.format(tool) for tool in NEW_TOOLS for pattern in NEW_PATTERNS]
+
+    rng.shuffle(existing)
+    rng.shuffle(new)
+    return existing, new, list(SKIP_QUESTIONS)
+
+
+def summarize(samples):
+    """지연 시간 목록(초) -> 통계(밀리초)"""
+    if not samples:
+        return None
+    values = np.asarray(samples) * 1000
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "mean_ms": round(float(values.mean()), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def run_benchmark(args, out):
+    # 대역 설치는 풀을 만들기 전에 (파이프라인 모듈은 그 뒤에 가져옴)
+    from fake_upstage import install_fakes
+
+    install_fakes(
+        first_token_latency=args.llm_latency,
+        token_latency=args.token_latency,
+        output_tokens=args.output_tokens,
+        embedding_latency=args.embedding_latency,
+    )
+
+    import faq_manager
+    import pipeline
+    import tracing
+    from index_sync import publish_approved_faqs
+    from resource_pool import get_pool, index_publish_lock
+    from retrieval import search_with_relevance
+
+    # 추적 로그도 작업 디렉터리에 남음 (--keep으로 확인)
+    tracing.set_tracing(args.trace)
+
+    rng = random.Random(args.seed)
+    existing, new, skip = build_corpus(MANUAL_FILE, rng)
+    existing = existing[: args.questions]
+    new = new[: args.questions]
+    pool = get_pool(BENCHMARK_API_KEY)
+    samples = {stage: [] for stage in STAGES}
+
+    def measure(stage, func, *func_args, **kwargs):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(out):
+            result = func(*func_args, **kwargs)
+        samples[stage].append(time.perf_counter() - started)
+        return result
+
+    def previous_turn(question):
+        return [
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": "이전 답변입니다."},
+        ]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    # 벡터 DB 최초 구축(전체 임베딩)과 변경 없는 재동기화
+    measure("load_manual_cold", pipeline.load_manual, pool.db)
+    for _ in range(args.repeat):
+        measure("load_manual_warm", pipeline.load_manual, pool.db)
+
+    for _ in range(args.repeat):
+        for question in existing + new + skip:
+            measure("classify", pipeline.classify, question, BENCHMARK_API_KEY)
+
+        for question in existing:
+            embedding = pool.embeddings.embed_query(question)
+            measure("chroma_query", search_with_relevance, pool.db, embedding, k=10)
+            # 이전 대화가 있는 턴 (답변 캐시를 거치지 않는 경로)
+            measure(
+                "handle_existing",
+                pipeline.handle_existing,
+                question,
+                previous_turn(existing[0]),
+                BENCHMARK_API_KEY,
+            )
+
+    for question in new:
+        measure("handle_new", pipeline.handle_new, question, [], BENCHMARK_API_KEY)
+
+    # 관리자 승인: API 서버와 같은 경로 (재구성 잠금 안에서 저장소 트랜잭션 +
+    # 벡터 DB upsert + 답변 캐시 무효화)
+    def approve(candidate):
+        with index_publish_lock():
+            faq = faq_manager.approve_faq_candidate(
+                candidate["id"], candidate["question"], candidate["generated_answer"]
+            )
+            publish_approved_faqs(pool.db, [faq] if faq else [])
+        return faq
+
+    for candidate in faq_manager.list_faq_candidates(status="pending_review"):
+        measure("approve", approve, candidate)
+
+    # 종단간: 첫 질문(답변 캐시 사용 가능)과 이어지는 질문을 섞어서
+    mixed = existing + new + skip
+    for _ in range(args.repeat):
+        for i, question in enumerate(mixed):
+            history = previous_turn(mixed[i - 1]) if i % 2 else []
+            measure(
+                "get_response",
+                pipeline.get_response,
+                question,
+                history,
+                BENCHMARK_API_KEY,
+            )
+
+    elapsed = time.perf_counter() - started
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "seed": args.seed,
+            "trace": args.trace,
+            "repeat": args.repeat,
+            "questions": {
+                "existing": len(existing),
+                "new": len(new),
+                "skip": len(skip),
+            },
+            "fake_latency": {
+                "llm_first_token_s": args.llm_latency,
+                "llm_token_s": args.token_latency,
+                "output_tokens": args.output_tokens,
+                "embedding_s": args.embedding_latency,
+            },
+            "elapsed_s": round(elapsed, 2),
+        },
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+        "memory": {
+            "traced_peak_mb": round(traced_peak / 1024 / 1024, 1),
+            # 리눅스 ru_maxrss 단위는 KB
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+        },
+        "caches": {
+            "embedding": pool.embeddings.get_stats(),
+            "answer": pool.answer_cache.get_stats(),
+            "rewrite": pool.rewrite_cache.get_stats(),
+        },
+    }
+
+
+def print_report(report, baseline=None):
+    header = f"{'단계':<18}{'횟수':>6}{'p50(ms)':>11}{'p95(ms)':>11}{'최대(ms)':>11}"
+    if baseline:
+        header += f"{'p50 변화':>11}{'p95 변화':>11}"
+    print(header)
+
+    def change(now, before):
+        if not before:
+            return f"{'-':>11}"
+        return f"{(now - before) / before * 100:>+10.1f}%"
+
+    for stage, stats in report["stages"].items():
+        if stats is None:
+            continue
+        line = (
+            f"{stage:<18}{stats['count']:>6}{stats['p50_ms']:>11.1f}"
+            f"{stats['p95_ms']:>11.1f}{stats['max_ms']:>11.1f}"
+        )
+        before = (baseline or {}).get("stages", {}).get(stage)
+        if baseline:
+            line += change(stats["p50_ms"], before and before["p50_ms"])
+            line += change(stats["p95_ms"], before and before["p95_ms"])
+        print(line)
+
+    memory = report["memory"]
+    print(
+        f"\n메모리: 최대 RSS {memory['max_rss_mb']}MB, "
+        f"Python 할당 최대 {memory['traced_peak_mb']}MB"
+    )
+    if baseline:
+        before = baseline["memory"]
+        print(
+            f"  (이전: 최대 RSS {before['max_rss_mb']}MB, "
+            f"Python 할당 최대 {before['traced_peak_mb']}MB)"
+        )
+    for name, stats in report["caches"].items():
+        print(f"캐시 {name}: {stats}")
+    print(f"전체 {report['meta']['elapsed_s']}초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench_results/benchmark_result.json")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--questions", type=int, default=30, help="유형별 최대 질문 수")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="첫 토큰(초)")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="토큰당(초)")
+    parser.add_argument("--output-tokens", type=int, default=40)
+    parser.add_argument("--embedding-latency", type=float, default=0.01)
+    parser.add_argument("--trace", action="store_true", help="추적 켜고 측정")
+    parser.add_argument("--verbose", action="store_true", help="파이프라인 로그 출력")
+    parser.add_argument("--keep", action="store_true", help="임시 디렉터리 유지")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # 매뉴얼만 복사한 빈 작업 디렉터리에서 실행 (faq.db, chroma_db 등 새로 생성)
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp(prefix="helpdesk_bench_")
+    shutil.copy(os.path.join(source_dir, MANUAL_FILE), workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        out = sys.stdout if args.verbose else io.StringIO()
+        report = run_benchmark(args, out)
+    finally:
+        os.chdir(cwd)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_report(report, baseline)
+    print(f"결과 저장: {output}" + (f" (작업 디렉터리 {workdir})" if args.keep else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+from atomic_io import file_lock
+from history import empty_summary
+
+CONVERSATION_DB_FILE = "conversations.db"
+
+GREETING = """IT 헬프데스크입니다. 💻
+
+    지원 가능:
+    🌐 네트워크 (와이파이, VPN)
+    🔐 계정/로그인
+    📧 이메일/업무시스템
+    🖨️ 하드웨어
+    💿 소프트웨어
+    🛡️ 보안
+
+    문제를 설명해주세요."""
+
+CONVERSATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    summary_text TEXT NOT NULL DEFAULT '',
+    summary_covered INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+)"""
+
+CONVERSATIONS_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_conversations_updated_at
+    ON conversations (updated_at)"""
+
+# 메시지는 한 줄씩 저장해 턴을 추가할 때 기존 대화를 다시 쓰지 않음
+SCHEMA = f"""
+{CONVERSATIONS_TABLE};
+{CONVERSATIONS_INDEX};
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (conversation_id, seq)
+) WITHOUT ROWID;
+"""
+
+_local = threading.local()
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_connection(path=CONVERSATION_DB_FILE):
+    """스레드별 SQLite 연결 (WAL 모드, 최초 연결 시 스키마 생성)
+
+    대화 상태를 서버 쪽 파일에 두므로 API 워커 여러 개가 같은 대화를 이어받을 수 있다.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        # isolation_level=None: 트랜잭션은 BEGIN으로 직접 관리
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # 여러 워커가 동시에 처음 열어도 WAL 전환/스키마 생성은 한 곳에서만
+        with file_lock(path):
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _migrate(conn)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[path] = conn
+    return conn
+
+
+def _migrate(conn):
+    """이전 스키마(대화 전체를 messages JSON 한 칸에 저장)를 메시지 테이블로 옮김"""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(conversations)")}
+    if "messages" not in columns:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for row in conn.execute("SELECT id, messages FROM conversations").fetchall():
+            conn.executemany(
+                "INSERT OR IGNORE INTO messages (conversation_id, seq, role, content) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (row["id"], seq, message["role"], message["content"])
+                    for seq, message in enumerate(json.loads(row["messages"]))
+                ],
+            )
+        # NOT NULL인 messages 컬럼을 빼기 위해 테이블을 새로 만들어 옮김
+        conn.execute("ALTER TABLE conversations RENAME TO conversations_old")
+        conn.execute(CONVERSATIONS_TABLE)
+        conn.execute(
+            "INSERT INTO conversations "
+            "(id, summary_text, summary_covered, created_at, updated_at) "
+            "SELECT id, summary_text, summary_covered, created_at, updated_at "
+            "FROM conversations_old"
+        )
+        conn.execute("DROP TABLE conversations_old")
+        conn.execute(CONVERSATIONS_INDEX)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _read_messages(conn, conversation_id):
+    return [
+        {"role": row["role"], "content": row["content"]}
+        for row in conn.execute(
+            "SELECT role, content FROM messages WHERE conversation_id = ? "
+            "ORDER BY seq",
+            (conversation_id,),
+        )
+    ]
+
+
+def _row_to_dict(row, messages):
+    return {
+        "id": row["id"],
+        "messages": messages,
+        "summary": {"text": row["summary_text"], "covered": row["summary_covered"]},
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def create_conversation():
+    """인사말 하나로 시작하는 새 대화"""
+    conversation_id = uuid.uuid4().hex
+    now = _now()
+    messages = [{"role": "assistant", "content": GREETING}]
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT INTO conversations (id, created_at, updated_at) VALUES (?, ?, ?)",
+            (conversation_id, now, now),
+        )
+        conn.execute(
+            "INSERT INTO messages (conversation_id, seq, role, content) "
+            "VALUES (?, 0, ?, ?)",
+            (conversation_id, "assistant", GREETING),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return {
+        "id": conversation_id,
+        "messages": messages,
+        "summary": empty_summary(),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def get_conversation(conversation_id):
+    """대화 하나 ({id, messages, summary, created_at, updated_at}), 없으면 None"""
+    conn = get_connection()
+    # 대화와 메시지를 같은 스냅숏에서 읽음 (그 사이에 턴이 추가돼도 어긋나지 않게)
+    conn.execute("BEGIN")
+    try:
+        row = conn.execute(
+            "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        messages = _read_messages(conn, conversation_id) if row else None
+    finally:
+        conn.execute("COMMIT")
+    return _row_to_dict(row, messages) if row else None
+
+
+def append_turn(conversation_id, user_input, answer):
+    """질문/답변 한 턴을 대화 끝에 추가하고 갱신된 대화 반환 (없으면 None)
+
+    메시지 두 줄만 추가하고 기존 메시지는 다시 쓰지 않는다. 순번 계산과 추가를
+    한 쓰기 트랜잭션으로 처리하므로, 같은 대화에 답변 두 개가 동시에 끝나도
+    한쪽 턴이 사라지지 않는다 (끝난 순서대로 쌓임).
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cursor = conn.execute(
+            "UPDATE conversations SET updated_at = ? WHERE id = ?",
+            (_now(), conversation_id),
+        )
+        if cursor.rowcount == 0:
+            conn.execute("ROLLBACK")
+            return None
+        seq = conn.execute(
+            "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?",
+            (conversation_id,),
+        ).fetchone()[0]
+        conn.executemany(
+            "INSERT INTO messages (conversation_id, seq, role, content) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (conversation_id, seq, "user", user_input),
+                (conversation_id, seq + 1, "assistant", answer),
+            ],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return get_conversation(conversation_id)
+
+
+def save_summary(conversation_id, summary, edited=False):
+    """대화 요약 저장 (저장했으면 True)
+
+    자동 갱신(edited=False)은 이미 같거나 더 많은 메시지를 반영한 요약이 있으면
+    덮어쓰지 않는다. 느린 요약 요청이 나중에 끝나 최신 요약을 되돌리는 일을 막기 위함.
+    사용자가 사이드바에서 편집한 요약(edited=True)은 반영 범위와 상관없이 저장한다.
+    """
+    query = (
+        "UPDATE conversations SET summary_text = ?, summary_covered = ?, "
+        "updated_at = ? WHERE id = ?"
+    )
+    params = [summary["text"], summary["covered"], _now(), conversation_id]
+    if not edited:
+        query += " AND summary_covered < ?"
+        params.append(summary["covered"])
+    cursor = get_connection().execute(query, params)
+    return cursor.rowcount > 0
+
+
+def delete_conversation(conversation_id):
+    """대화와 메시지 삭제 (삭제했으면 True)"""
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cursor = conn.execute(
+            "DELETE FROM conversations WHERE id = ?", (conversation_id,)
+        )
+        conn.execute(
+            "DELETE FROM messages WHERE conversation_id = ?", (conversation_id,)
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return cursor.rowcount > 0
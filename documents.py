@@ -0,0 +1,60 @@
+import json
+
+from langchain_core.documents import Document
+from faq_manager import load_approved_faqs
+
+MANUAL_FILE = "it_helpdesk_manual.json"
+
+
+def manual_document(item):
+    """매뉴얼 항목을 Document로 변환"""
+    return Document(
+        page_content=item["text_content"],
+        metadata={
+            "id": item["id"],
+            "category": item["metadata"]["category"],
+            "scenario": item["metadata"]["scenario"],
+            "keywords": ", ".join(item["metadata"]["keywords"]),
+            "priority": item["metadata"]["priority"],
+        },
+    )
+
+
+def approved_faq_document(faq):
+    """승인된 FAQ를 Document로 변환"""
+    return Document(
+        page_content=f"질문: {faq['question']}\n답변: {faq['answer']}",
+        metadata={
+            "id": faq["id"],
+            "category": faq["category"],
+            "type": "user_generated_faq",
+            "approved_at": faq["approved_at"],
+        },
+    )
+
+
+def load_manual_documents(path=MANUAL_FILE):
+    """매뉴얼 JSON 전체를 Document 목록으로 로드"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [manual_document(item) for item in data]
+
+
+def load_approved_faq_documents():
+    """승인된 FAQ를 Document 목록으로 로드"""
+    try:
+        approved_faqs = load_approved_faqs()
+    except Exception as e:
+        print(f"승인된 FAQ 로드 실패: {e}")
+        return []
+
+    if approved_faqs:
+        print(f"승인된 FAQ {len(approved_faqs)}개 추가")
+    else:
+        print("💡 승인된 FAQ 없음")
+    return [approved_faq_document(faq) for faq in approved_faqs]
+
+
+def load_all_documents():
+    """벡터 DB에 들어가는 전체 문서 (매뉴얼 + 승인된 FAQ)"""
+    return load_manual_documents() + load_approved_faq_documents()
@@ -0,0 +1,246 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+
+from langchain_core.embeddings import Embeddings
+
+from atomic_io import file_lock
+from tracing import span
+
+EMBEDDING_CACHE_FILE = "embedding_cache.db"
+
+# 메모리 LRU / 디스크 저장소 최대 항목 수
+MEMORY_CACHE_SIZE = 1024
+DISK_CACHE_SIZE = 50000
+
+# 디스크가 가득 차면 오래 안 쓴 항목을 이 비율만큼 한 번에 정리
+DISK_EVICT_RATIO = 0.1
+
+
+def normalize_text(text):
+    """캐시 키용 질문 정규화 (유니코드, 대소문자, 문장부호, 공백)"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = "".join(
+        " " if unicodedata.category(char).startswith("P") else char for char in text
+    )
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_cache_key(model_name, text):
+    """모델 이름과 정규화된 텍스트로 캐시 키 생성"""
+    normalized = normalize_text(text)
+    return hashlib.sha256(f"{model_name}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """질문 임베딩을 메모리 LRU + 디스크(SQLite)에 캐시하는 Embeddings 래퍼
+
+    같은 질문("와이파이 안돼요", "와이파이 안돼요!" 등)은 임베딩 API를 다시
+    호출하지 않는다. 디스크 저장소는 Streamlit 재시작 후에도 유지된다.
+    문서 임베딩(embed_documents)은 캐시하지 않고 그대로 전달하며, 여러 질문을
+    서로 비교할 때 쓰는 embed_documents_cached만 문서 모델 벡터를 따로 캐시한다.
+    """
+
+    def __init__(
+        self,
+        underlying,
+        model_name,
+        path=EMBEDDING_CACHE_FILE,
+        memory_size=MEMORY_CACHE_SIZE,
+        disk_size=DISK_CACHE_SIZE,
+    ):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._conn = None
+        self._disk_count = 0
+        if path:
+            try:
+                # isolation_level=None: 트랜잭션은 BEGIN으로 직접 관리
+                # timeout: 다른 워커가 쓰는 중이면 바로 실패하지 않고 기다림
+                self._conn = sqlite3.connect(
+                    path, timeout=30, isolation_level=None, check_same_thread=False
+                )
+                # 여러 워커가 동시에 처음 열어도 WAL 전환/스키마 생성은 한 곳에서만
+                with file_lock(path):
+                    self._conn.execute("PRAGMA journal_mode=WAL")
+                    self._conn.executescript(
+                        """CREATE TABLE IF NOT EXISTS query_embeddings (
+                            key TEXT PRIMARY KEY,
+                            model TEXT NOT NULL,
+                            vector BLOB NOT NULL,
+                            last_used REAL NOT NULL
+                        );
+                        CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_used
+                            ON query_embeddings (last_used);"""
+                    )
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._disk_count = self._conn.execute(
+                    "SELECT COUNT(*) FROM query_embeddings"
+                ).fetchone()[0]
+            except Exception as e:
+                print(f"임베딩 캐시 파일 열기 실패, 메모리 캐시만 사용: {e}")
+                self._conn = None
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, key):
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE query_embeddings SET last_used = ? WHERE key = ?",
+            (time.time(), key),
+        )
+        return array("f", row[0]).tolist()
+
+    def _save_to_disk(self, key, vector):
+        if self._conn is None:
+            return
+        now = time.time()
+        # 저장 파일은 워커 여러 개가 함께 쓰므로 항목 수는 쓰기 트랜잭션 안에서
+        # 다시 세어야 DISK_CACHE_SIZE가 전체 기준으로 지켜짐
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "INSERT INTO query_embeddings (key, model, vector, last_used) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET last_used = excluded.last_used",
+                (key, self.model_name, array("f", vector).tobytes(), now),
+            )
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM query_embeddings"
+            ).fetchone()[0]
+            if count > self.disk_size:
+                evict = max(
+                    count - self.disk_size, int(self.disk_size * DISK_EVICT_RATIO), 1
+                )
+                cursor = self._conn.execute(
+                    "DELETE FROM query_embeddings WHERE key IN ("
+                    "SELECT key FROM query_embeddings ORDER BY last_used LIMIT ?)",
+                    (evict,),
+                )
+                count -= cursor.rowcount
+                self._stats["evictions"] += cursor.rowcount
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._disk_count = count
+
+    def embed_query(self, text):
+        with span("embedding", kind="query") as trace:
+            return self._embed_query(text, trace)
+
+    def _lookup(self, key):
+        """메모리 -> 디스크 순으로 찾기, (벡터, 적중 위치) 또는 (None, None)
+
+        호출하는 쪽에서 self._lock을 잡고 부른다.
+        """
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return vector, "memory"
+
+        try:
+            vector = self._load_from_disk(key)
+        except Exception as e:
+            print(f"임베딩 캐시 읽기 실패: {e}")
+            vector = None
+        if vector is not None:
+            self._remember(key, vector)
+            self._stats["disk_hits"] += 1
+            return vector, "disk"
+
+        self._stats["misses"] += 1
+        return None, None
+
+    def _store(self, key, vector):
+        # 호출하는 쪽에서 self._lock을 잡고 부른다
+        self._remember(key, vector)
+        try:
+            self._save_to_disk(key, vector)
+        except Exception as e:
+            print(f"임베딩 캐시 저장 실패: {e}")
+
+    def _embed_query(self, text, trace):
+        key = make_cache_key(self.model_name, text)
+
+        with self._lock:
+            vector, level = self._lookup(key)
+        if vector is not None:
+            trace.set(cache_hit=True, cache_level=level)
+            return vector
+        trace.set(cache_hit=False)
+
+        # API 호출은 잠금 밖에서 수행
+        vector = self.underlying.embed_query(text)
+
+        with self._lock:
+            self._store(key, vector)
+        return vector
+
+    def embed_documents_cached(self, texts):
+        """여러 텍스트를 문서 모델로 임베딩 (캐시에 없는 것만 한 번에 배치 요청)
+
+        검토 대기 후보 묶기처럼 많은 질문을 서로 비교할 때 쓴다. 문서 모델 벡터는
+        질문 모델 벡터와 공간이 달라서 질문 캐시와 다른 키로 저장한다.
+        """
+        with span("embedding", kind="documents_cached", count=len(texts)) as trace:
+            keys = [make_cache_key(f"{self.model_name}:passage", t) for t in texts]
+            with self._lock:
+                vectors = [self._lookup(key)[0] for key in keys]
+
+            # 캐시에 없는 텍스트 (같은 텍스트는 한 번만 요청)
+            missing = {}
+            for key, text, vector in zip(keys, texts, vectors):
+                if vector is None:
+                    missing.setdefault(key, text)
+            trace.set(cache_misses=len(missing))
+
+            if missing:
+                fetched = self.underlying.embed_documents(list(missing.values()))
+                fetched = dict(zip(missing, fetched))
+                with self._lock:
+                    for key, vector in fetched.items():
+                        self._store(key, vector)
+                vectors = [
+                    fetched[key] if vector is None else vector
+                    for key, vector in zip(keys, vectors)
+                ]
+            return vectors
+
+    def embed_documents(self, texts):
+        with span("embedding", kind="documents", count=len(texts)):
+            return self.underlying.embed_documents(texts)
+
+    def get_stats(self):
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._memory)
+            stats["disk_size"] = self._disk_count
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        total = hits + stats["misses"]
+        stats["hit_rate"] = hits / total if total else 0.0
+        return stats
@@ -0,0 +1,475 @@
+import argparse
+import base64
+import functools
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from embedding_cache import normalize_text
+from history import estimate_tokens
+
+FAKE_EMBEDDING_DIMENSIONS = 4096  # solar-embedding-1-large와 같은 차원
+
+# 답변 생성용 단어 (해시로 골라 매번 같은 답변이 나오게 함)
+_ANSWER_WORDS = [
+    "먼저", "설정", "메뉴에서", "네트워크", "연결을", "확인하고", "다시", "시도해",
+    "보세요", "계정", "비밀번호를", "재설정", "후", "로그인", "프로그램을", "재시작",
+    "하면", "대부분", "해결됩니다", "그래도", "안되면", "IT", "관리자에게", "문의하세요",
+]
+_QUESTION_PATTERN = re.compile(r"문의:\s*(.+?)\s*분류:", re.S)
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def fake_reply_tokens(contents, output_tokens):
+    """메시지 본문 목록 -> 대역 응답 단어 목록 (같은 입력이면 같은 응답)
+
+    - 분류 프롬프트: 질문 해시로 existing 60% / new 30% / skip 10%
+    - 질문 재구성/요약 프롬프트: 짧은 고정 형식 응답
+    - 그 외: output_tokens 단어 답변
+    """
+    prompt = "\n".join(contents)
+    last = contents[-1] if contents else ""
+
+    question = _QUESTION_PATTERN.search(last)
+    if question:
+        bucket = _digest(question.group(1))[0] % 10
+        label = "existing" if bucket < 6 else "new" if bucket < 9 else "skip"
+        return [label]
+    if "질문을 재구성" in prompt:
+        return last.split()
+    if "요약을 작성" in last:
+        return ["요약:", "사용자가", f"{len(contents) - 2}개", "메시지에서", "문의함"]
+
+    seed = _digest(prompt)
+    return [
+        _ANSWER_WORDS[seed[i % len(seed)] % len(_ANSWER_WORDS)]
+        for i in range(output_tokens)
+    ]
+
+
+def fake_embedding(text, dimensions=FAKE_EMBEDDING_DIMENSIONS):
+    """해시 기반 결정적 임베딩 (단위 벡터)
+
+    정규화한 텍스트의 음절 2-gram과 단어를 특징 해싱으로 벡터에 더하므로
+    글자가 많이 겹치는 문장일수록 코사인 유사도가 높다.
+    """
+    normalized = normalize_text(text)
+    compact = normalized.replace(" ", "")
+    features = normalized.split() + [
+        compact[i : i + 2] for i in range(len(compact) - 1)
+    ]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature in features or [""]:
+        digest = _digest(feature)
+        index = int.from_bytes(digest[:4], "big") % dimensions
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class FakeChatUpstage(BaseChatModel):
+    """ChatUpstage 대역 (API 호출 없이 지연 시간만 흉내, 응답은 fake_reply_tokens)
+
+    스트리밍이면 단어 단위로 내보낸다.
+    """
+
+    model: str = "solar-mini"
+    api_key: Optional[Any] = None
+    base_url: Optional[str] = None
+    first_token_latency: float = 0.3  # 초, 첫 토큰까지
+    token_latency: float = 0.01  # 초, 토큰당
+    output_tokens: int = 60
+
+    @property
+    def _llm_type(self):
+        return "fake-upstage"
+
+    def _reply_tokens(self, messages):
+        contents = [str(message.content) for message in messages]
+        return fake_reply_tokens(contents, self.output_tokens)
+
+    def _usage(self, messages, tokens):
+        input_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        output_tokens = len(tokens)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._reply_tokens(messages)
+        time.sleep(self.first_token_latency + self.token_latency * len(tokens))
+        message = AIMessage(
+            content=" ".join(tokens), usage_metadata=self._usage(messages, tokens)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._reply_tokens(messages)
+        time.sleep(self.first_token_latency)
+        for i, token in enumerate(tokens):
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(content=token if i == 0 else f" {token}")
+            )
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="", usage_metadata=self._usage(messages, tokens)
+            )
+        )
+
+
+class FakeUpstageEmbeddings(Embeddings):
+    """UpstageEmbeddings 대역 (fake_embedding + 지연 시간)"""
+
+    def __init__(
+        self,
+        model="solar-embedding-1-large",
+        api_key=None,
+        latency=0.05,  # 초, 요청당
+        dimensions=FAKE_EMBEDDING_DIMENSIONS,
+        **kwargs,
+    ):
+        self.model = model
+        self.latency = latency
+        self.dimensions = dimensions
+
+    def _vector(self, text):
+        return fake_embedding(text, self.dimensions).tolist()
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return self._vector(text)
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+
+def install_fakes(
+    first_token_latency=0.3,
+    token_latency=0.01,
+    output_tokens=60,
+    embedding_latency=0.05,
+    dimensions=FAKE_EMBEDDING_DIMENSIONS,
+):
+    """resource_pool이 만드는 Upstage 클라이언트를 대역으로 교체
+
+    get_pool()을 처음 호출하기 전에 불러야 한다 (이미 만든 풀은 그대로).
+    """
+    import resource_pool
+
+    resource_pool.ChatUpstage = functools.partial(
+        FakeChatUpstage,
+        first_token_latency=first_token_latency,
+        token_latency=token_latency,
+        output_tokens=output_tokens,
+    )
+    resource_pool.UpstageEmbeddings = functools.partial(
+        FakeUpstageEmbeddings, latency=embedding_latency, dimensions=dimensions
+    )
+
+
+class _RateLimiter:
+    """초당 요청 수 제한 (토큰 버킷, 넘으면 429)"""
+
+    def __init__(self, per_second):
+        self.per_second = per_second
+        self._tokens = per_second
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self):
+        if not self.per_second:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.per_second, self._tokens + (now - self._updated) * self.per_second
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class FakeUpstageServer:
+    """OpenAI 호환 /chat/completions, /embeddings를 흉내 내는 로컬 HTTP 서버
+
+    실제 ChatUpstage/UpstageEmbeddings 클라이언트가 HTTP로 호출하게 해서
+    연결/직렬화/재시도까지 포함한 부하를 볼 수 있다. rate_limit(초당 요청 수)을
+    넘으면 429, error_rate 비율로 500을 돌려준다.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        first_token_latency=0.3,
+        token_latency=0.01,
+        output_tokens=60,
+        embedding_latency=0.05,
+        dimensions=FAKE_EMBEDDING_DIMENSIONS,
+        rate_limit=0,
+        error_rate=0.0,
+        seed=0,
+    ):
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.output_tokens = output_tokens
+        self.embedding_latency = embedding_latency
+        self.dimensions = dimensions
+        self.error_rate = error_rate
+
+        self._limiter = _RateLimiter(rate_limit)
+        self._rng = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._in_flight = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-upstage", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, **counts):
+        with self._stats_lock:
+            for key, value in counts.items():
+                self._stats[key] = self._stats.get(key, 0) + value
+
+    def _should_fail(self):
+        with self._stats_lock:
+            return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def _enter(self):
+        with self._stats_lock:
+            self._in_flight += 1
+            self._stats["max_in_flight"] = max(
+                self._stats.get("max_in_flight", 0), self._in_flight
+            )
+
+    def _leave(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {}
+
+    def get_stats(self):
+        """요청 수, 429/500 응답 수, 최대 동시 요청 수"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # 요청마다 찍히는 접근 로그 생략
+
+            def _send_json(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, server.get_stats())
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                endpoint = self.path.rstrip("/").rsplit("/", 1)[-1]
+
+                server._count(requests=1, **{f"requests_{endpoint}": 1})
+                if not server._limiter.allow():
+                    server._count(rate_limited=1)
+                    self._send_json(
+                        429,
+                        {"error": {"message": "rate limit", "type": "rate_limit"}},
+                    )
+                    return
+                if server._should_fail():
+                    server._count(server_errors=1)
+                    self._send_json(500, {"error": {"message": "injected failure"}})
+                    return
+
+                server._enter()
+                try:
+                    if endpoint == "completions":
+                        self._chat(request)
+                    elif endpoint == "embeddings":
+                        self._embeddings(request)
+                    else:
+                        self._send_json(404, {"error": {"message": "not found"}})
+                finally:
+                    server._leave()
+
+            def _chat(self, request):
+                contents = [
+                    message.get("content") or ""
+                    for message in request.get("messages", [])
+                ]
+                tokens = fake_reply_tokens(contents, server.output_tokens)
+                prompt_tokens = sum(estimate_tokens(c) for c in contents)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                }
+                base = {
+                    "id": f"chatcmpl-fake-{time.time_ns()}",
+                    "created": int(time.time()),
+                    "model": request.get("model", "solar-mini"),
+                }
+
+                time.sleep(server.first_token_latency)
+                if not request.get("stream"):
+                    time.sleep(server.token_latency * len(tokens))
+                    message = {"role": "assistant", "content": " ".join(tokens)}
+                    choice = {"index": 0, "message": message, "finish_reason": "stop"}
+                    self._send_json(
+                        200,
+                        {
+                            **base,
+                            "object": "chat.completion",
+                            "choices": [choice],
+                            "usage": usage,
+                        },
+                    )
+                    return
+
+                # SSE 스트리밍 (연결을 닫아서 끝을 알림)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def send(delta, finish_reason=None, **extra):
+                    choice = {
+                        "index": 0,
+                        "delta": delta,
+                        "finish_reason": finish_reason,
+                    }
+                    chunk = {
+                        **base,
+                        "object": "chat.completion.chunk",
+                        "choices": [choice],
+                        **extra,
+                    }
+                    data = json.dumps(chunk, ensure_ascii=False)
+                    self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+                for i, token in enumerate(tokens):
+                    time.sleep(server.token_latency)
+                    send({"content": token if i == 0 else f" {token}"})
+                send({}, "stop", usage=usage)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def _embeddings(self, request):
+                texts = request.get("input", [])
+                if isinstance(texts, str):
+                    texts = [texts]
+                time.sleep(server.embedding_latency)
+
+                data = []
+                for i, text in enumerate(texts):
+                    vector = fake_embedding(text, server.dimensions)
+                    if request.get("encoding_format") == "base64":
+                        # openai 클라이언트 기본값 (float32 리틀 엔디언)
+                        encoded = base64.b64encode(
+                            vector.astype("<f4").tobytes()
+                        ).decode("ascii")
+                    else:
+                        encoded = vector.tolist()
+                    data.append(
+                        {"object": "embedding", "index": i, "embedding": encoded}
+                    )
+
+                tokens = sum(estimate_tokens(text) for text in texts)
+                self._send_json(
+                    200,
+                    {
+                        "object": "list",
+                        "data": data,
+                        "model": request.get("model", "solar-embedding-1-large"),
+                        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                    },
+                )
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 가짜 Upstage API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="첫 토큰(초)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="토큰당(초)")
+    parser.add_argument("--output-tokens", type=int, default=60)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=0, help="초당 요청 수")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeUpstageServer(
+        args.host,
+        args.port,
+        first_token_latency=args.llm_latency,
+        token_latency=args.token_latency,
+        output_tokens=args.output_tokens,
+        embedding_latency=args.embedding_latency,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+    )
+    print(f"가짜 Upstage 서버: UPSTAGE_API_BASE={server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import hashlib
+import random
+import threading
+from collections import defaultdict
+
+import numpy as np
+from embedding_cache import normalize_text
+from faq_manager import (
+    list_faq_candidates,
+    get_faq_candidate,
+    load_approved_faqs,
+    count_approved_faqs,
+)
+
+NGRAM_SIZE = 2  # 한글은 음절 2개 단위가 어절 변형(조사 등)에 덜 민감
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 밴드당 4행 -> 자카드 유사도 약 0.5부터 후보로 잡힘
+# MinHash로 추정한 자카드 유사도가 이 값 미만이면 임베딩 비교 없이 제외
+MINHASH_MIN_JACCARD = 0.4
+# 임베딩 코사인 유사도가 이 값 이상이면 같은 질문으로 보고 합침
+DEDUPE_SIMILARITY_THRESHOLD = 0.92
+# 임베딩으로 확인할 최대 후보 수 (자카드 유사도 높은 순)
+DEDUPE_MAX_CONFIRM = 5
+# 관리자 검토 화면에서 같은 묶음으로 보여줄 질문 유사도 (중복보다 느슨하게)
+CLUSTER_SIMILARITY_THRESHOLD = 0.85
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def char_ngrams(text, n=NGRAM_SIZE):
+    """정규화한 질문(공백 제거)의 문자 n-gram 집합"""
+    compact = normalize_text(text).replace(" ", "")
+    if len(compact) <= n:
+        return {compact} if compact else set()
+    return {compact[i : i + n] for i in range(len(compact) - n + 1)}
+
+
+def _shingle_hash(shingle):
+    # 프로세스마다 달라지는 hash() 대신 고정 해시 사용
+    digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class MinHashLSH:
+    """문자 n-gram MinHash 서명 + 밴드 LSH 버킷
+
+    서명의 밴드 하나라도 같은 항목만 후보로 돌려주므로, 전체 목록과
+    비교하지 않고 비슷한 질문을 찾을 수 있다.
+    """
+
+    def __init__(self, num_perm=MINHASH_PERMUTATIONS, bands=LSH_BANDS, seed=1):
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = defaultdict(set)
+        self._signatures = {}
+
+    def signature(self, text):
+        hashes = [_shingle_hash(shingle) for shingle in char_ngrams(text)]
+        if not hashes:
+            return None
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms
+        )
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start : start + self.rows]
+
+    def add(self, key, text):
+        signature = self.signature(text)
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].add(key)
+
+    def discard(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].discard(key)
+
+    def query(self, text, min_jaccard=MINHASH_MIN_JACCARD):
+        """비슷한 항목 [(key, 추정 자카드 유사도)] (유사도 높은 순)"""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        keys = set()
+        for band_key in self._band_keys(signature):
+            keys |= self._buckets.get(band_key, set())
+
+        matches = []
+        for key in keys:
+            other = self._signatures[key]
+            jaccard = sum(x == y for x, y in zip(signature, other)) / len(signature)
+            if jaccard >= min_jaccard:
+                matches.append((key, jaccard))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+
+class FaqDeduplicator:
+    """FAQ 후보 저장 전 중복 확인
+
+    1) MinHash/LSH로 검토 대기 후보와 승인된 FAQ 중 글자가 비슷한 것만 추리고
+    2) 그 몇 개만 질문 임베딩 코사인 유사도로 같은 질문인지 확인한다.
+    색인은 저장소에 새로 추가된 행만 읽어 따라가므로 다른 프로세스에서
+    등록된 후보도 반영된다.
+    """
+
+    def __init__(self, embeddings, threshold=DEDUPE_SIMILARITY_THRESHOLD):
+        self.embeddings = embeddings
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._lsh = MinHashLSH()
+        self._questions = {}  # ("candidate", id) / ("approved", id) -> 질문
+        self._last_candidate_id = 0
+        self._approved_ids = set()
+
+    def _add(self, key, question):
+        self._questions[key] = question
+        self._lsh.add(key, question)
+
+    def _discard(self, key):
+        self._questions.pop(key, None)
+        self._lsh.discard(key)
+
+    def _sync(self):
+        """저장소에 새로 생긴 후보/승인 FAQ를 색인에 반영 (DB 읽기는 잠금 밖에서)"""
+        with self._lock:
+            after_id = self._last_candidate_id
+            approved_count = len(self._approved_ids)
+        candidates = list_faq_candidates(after_id=after_id)
+        approved = []
+        if count_approved_faqs() != approved_count:
+            approved = load_approved_faqs()
+
+        with self._lock:
+            for candidate in candidates:
+                # 다른 스레드가 먼저 반영한 후보는 건너뜀 (그 사이 처리된 후보 재등록 방지)
+                if candidate["id"] <= self._last_candidate_id:
+                    continue
+                self._last_candidate_id = candidate["id"]
+                if candidate["status"] == "pending_review":
+                    self._add(("candidate", candidate["id"]), candidate["question"])
+
+            for faq in approved:
+                if faq["id"] not in self._approved_ids:
+                    self._approved_ids.add(faq["id"])
+                    self._add(("approved", faq["id"]), faq["question"])
+
+    def find_duplicate(self, question, query_embedding=None):
+        """같은 질문으로 판단된 (종류, ID, 유사도), 없으면 None
+
+        종류는 "candidate"(검토 대기 후보) 또는 "approved"(승인된 FAQ).
+        잠금은 색인을 읽고 고칠 때만 잡고, 임베딩 API 호출은 잠금 밖에서 한다.
+        """
+        self._sync()
+        with self._lock:
+            matches = [
+                (key, self._questions[key])
+                for key, _ in self._lsh.query(question)[:DEDUPE_MAX_CONFIRM]
+            ]
+        if not matches:
+            return None
+
+        if query_embedding is None:
+            query_embedding = self.embeddings.embed_query(question)
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+
+        for key, matched_question in matches:
+            kind, record_id = key
+            if kind == "candidate":
+                candidate = get_faq_candidate(record_id)
+                # 그 사이 승인/거절된 후보는 더 이상 합칠 대상이 아님
+                if candidate is None or candidate["status"] != "pending_review":
+                    with self._lock:
+                        self._discard(key)
+                    continue
+
+            vector = np.asarray(
+                self.embeddings.embed_query(matched_question), dtype=np.float32
+            )
+            similarity = float(
+                np.dot(query_vector, vector)
+                / (np.linalg.norm(query_vector) * np.linalg.norm(vector) or 1.0)
+            )
+            if similarity >= self.threshold:
+                return kind, record_id, similarity
+        return None
+
+
+def cluster_candidates(candidates, embeddings, threshold=CLUSTER_SIMILARITY_THRESHOLD):
+    """검토 대기 후보를 질문 임베딩 유사도로 묶기
+
+    질문 횟수가 많은 후보부터 차례로, 대표 질문과의 코사인 유사도가
+    threshold 이상인 첫 묶음에 넣고 없으면 새 묶음을 만든다. 각 묶음의
+    첫 후보가 대표이며, 묶음은 전체 질문 횟수가 많은 순으로 정렬된다.
+    """
+    if not candidates:
+        return []
+
+    ordered = sorted(
+        candidates,
+        key=lambda c: (-c.get("occurrence_count", 1), c["timestamp"], c["id"]),
+    )
+    # 캐시에 없는 질문만 모아 한 번에 배치 요청 (후보 수백 개를 하나씩 호출하지 않음)
+    vectors = np.asarray(
+        embeddings.embed_documents_cached([c["question"] for c in ordered]),
+        dtype=np.float32,
+    )
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+    clusters = []  # [(대표 벡터, [후보])]
+    for candidate, vector in zip(ordered, vectors):
+        for leader, members in clusters:
+            if float(np.dot(leader, vector)) >= threshold:
+                members.append(candidate)
+                break
+        else:
+            clusters.append((vector, [candidate]))
+
+    groups = [members for _, members in clusters]
+    groups.sort(key=lambda members: -sum(c.get("occurrence_count", 1) for c in members))
+    return groups
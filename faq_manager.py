@@ -1,60 +1,690 @@
 import json
 import os
-from datetime import datetime
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
 
+from atomic_io import file_lock, LockWaitStats
+from embedding_cache import normalize_text
+from faq_stats import (
+    STATS_SCHEMA,
+    CLASSIFICATION_PREFIX,
+    ROUTING_PREFIX,
+    add_stats,
+    approval_latency,
+    rebuild_stats,
+    read_totals,
+    read_series,
+)
+
+FAQ_DB_FILE = "faq.db"
+
+# 예전 JSON 저장 파일 (최초 1회 가져오기 용도)
 FAQ_CANDIDATES_FILE = "faq_candidates.json"
+APPROVED_FAQS_FILE = "approved_faqs.json"
+
+CANDIDATE_COLUMNS = [
+    "id",
+    "question",
+    "generated_answer",
+    "timestamp",
+    "status",
+    "edited_question",
+    "edited_answer",
+    "approved_at",
+    "rejected_at",
+    "rejection_reason",
+    "occurrence_count",
+    "occurrences",
+]
+APPROVED_COLUMNS = [
+    "id",
+    "question",
+    "answer",
+    "original_question",
+    "candidate_id",
+    "approved_at",
+    "category",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS faq_candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question TEXT NOT NULL,
+    generated_answer TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending_review',
+    edited_question TEXT,
+    edited_answer TEXT,
+    approved_at TEXT,
+    rejected_at TEXT,
+    rejection_reason TEXT,
+    occurrence_count INTEGER NOT NULL DEFAULT 1,
+    occurrences TEXT,
+    question_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_faq_candidates_status_timestamp
+    ON faq_candidates (status, timestamp);
+CREATE INDEX IF NOT EXISTS idx_faq_candidates_timestamp
+    ON faq_candidates (timestamp);
+
+CREATE TABLE IF NOT EXISTS approved_faqs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    original_question TEXT,
+    candidate_id INTEGER,
+    approved_at TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT 'user_generated'
+);
+CREATE INDEX IF NOT EXISTS idx_approved_faqs_approved_at
+    ON approved_faqs (approved_at);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_local = threading.local()
 
+# 쓰기 트랜잭션(BEGIN IMMEDIATE)이 다른 연결의 쓰기 잠금을 기다린 시간
+STORE_LOCK_STATS = LockWaitStats()
 
-def save_faq_candidates(candidates):
-    """FAQ 후보를 JSON 파일로 저장"""
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _begin(conn):
+    """쓰기 트랜잭션 시작 (다른 연결이 쓰는 중이면 timeout까지 대기, 대기 시간 기록)"""
+    started = time.perf_counter()
     try:
-        with open(FAQ_CANDIDATES_FILE, "w", encoding="utf-8") as f:
-            json.dump(candidates, f, ensure_ascii=False, indent=2)
-        print(f"FAQ 후보 {len(candidates)}개 저장 완료: {FAQ_CANDIDATES_FILE}")
-        return True
-    except Exception as e:
-        print(f"FAQ 후보 저장 실패: {e}")
-        return False
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError:
+        STORE_LOCK_STATS.record_timeout()
+        raise
+    STORE_LOCK_STATS.record(time.perf_counter() - started)
 
 
-def load_faq_candidates():
-    """JSON 파일에서 FAQ 후보 로드"""
-    try:
-        if os.path.exists(FAQ_CANDIDATES_FILE):
-            with open(FAQ_CANDIDATES_FILE, "r", encoding="utf-8") as f:
-                candidates = json.load(f)
-            return candidates
-        else:
-            return []
+def get_connection(path=FAQ_DB_FILE):
+    """스레드별 SQLite 연결 (WAL 모드, 최초 연결 시 스키마 생성/JSON 가져오기)"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        # isolation_level=None: 트랜잭션은 BEGIN으로 직접 관리
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # WAL 전환/스키마 생성/JSON 가져오기는 챗봇과 관리자 페이지가 동시에
+        # 처음 열어도 한 곳에서만 진행되도록 파일 잠금 안에서 수행
+        with file_lock(path):
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA + STATS_SCHEMA)
+            _migrate(conn)
+            import_json_files(conn)
+            _build_stats_once(conn)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[path] = conn
+    return conn
+
+
+def _migrate(conn):
+    """이전 버전 스키마에 없는 컬럼 추가"""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(faq_candidates)")}
+    if "occurrence_count" not in columns:
+        conn.execute(
+            "ALTER TABLE faq_candidates "
+            "ADD COLUMN occurrence_count INTEGER NOT NULL DEFAULT 1"
+        )
+    if "occurrences" not in columns:
+        conn.execute("ALTER TABLE faq_candidates ADD COLUMN occurrences TEXT")
+    if "question_key" not in columns:
+        conn.execute("ALTER TABLE faq_candidates ADD COLUMN question_key TEXT")
+    missing = conn.execute(
+        "SELECT id, question FROM faq_candidates WHERE question_key IS NULL"
+    ).fetchall()
+    if missing:
+        conn.executemany(
+            "UPDATE faq_candidates SET question_key = ? WHERE id = ?",
+            [(question_key(row["question"]), row["id"]) for row in missing],
+        )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_faq_candidates_question_key "
+        "ON faq_candidates (question_key, status)"
+    )
+
+
+def question_key(question):
+    """같은 질문 판단용 키 (정규화 후 공백 제거, "VPN 안돼요!" == "vpn안돼요")"""
+    return normalize_text(question).replace(" ", "")
+
+
+def _build_stats_once(conn):
+    """집계 테이블이 생기기 전 데이터로 통계 초기화 (이후로는 변경 시 증분 갱신)"""
+    _begin(conn)
+    try:
+        built = conn.execute(
+            "SELECT value FROM store_meta WHERE key = 'stats_built'"
+        ).fetchone()
+        if not built:
+            rebuild_stats(conn)
+            conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('stats_built', ?)",
+                (_now(),),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def import_json_files(conn):
+    """예전 JSON 파일(faq_candidates.json, approved_faqs.json)을 한 번만 가져오기"""
+    _begin(conn)
+    try:
+        imported = conn.execute(
+            "SELECT value FROM store_meta WHERE key = 'json_imported'"
+        ).fetchone()
+        if imported:
+            conn.execute("COMMIT")
+            return
+
+        candidates = _read_json(FAQ_CANDIDATES_FILE)
+        for candidate in candidates:
+            _insert_candidate(conn, candidate)
+
+        approved_faqs = _read_json(APPROVED_FAQS_FILE)
+        for faq in approved_faqs:
+            conn.execute(
+                "INSERT OR IGNORE INTO approved_faqs "
+                "(id, question, answer, original_question, approved_at, category) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    faq["id"],
+                    faq["question"],
+                    faq["answer"],
+                    faq.get("original_question"),
+                    faq["approved_at"],
+                    faq.get("category", "user_generated"),
+                ),
+            )
+
+        conn.execute(
+            "INSERT INTO store_meta (key, value) VALUES ('json_imported', ?)", (_now(),)
+        )
+        conn.execute("COMMIT")
+        if candidates or approved_faqs:
+            print(
+                f"JSON 가져오기 완료: FAQ 후보 {len(candidates)}개, "
+                f"승인된 FAQ {len(approved_faqs)}개"
+            )
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
     except Exception as e:
-        print(f"FAQ 후보 로드 실패: {e}")
+        print(f"{path} 읽기 실패: {e}")
         return []
 
 
+def _insert_candidate(conn, candidate):
+    columns = [c for c in CANDIDATE_COLUMNS if c != "id" and c in candidate]
+    cursor = conn.execute(
+        f"INSERT INTO faq_candidates ({', '.join(columns)}, question_key) "
+        f"VALUES ({', '.join('?' for _ in columns)}, ?)",
+        [
+            json.dumps(candidate[c]) if c == "occurrences" else candidate[c]
+            for c in columns
+        ]
+        + [question_key(candidate["question"])],
+    )
+    return cursor.lastrowid
+
+
+def _row_to_dict(row):
+    # 값이 없는 선택 항목은 예전 JSON 형식처럼 키 자체를 생략 (내부 키 컬럼 제외)
+    record = {
+        key: row[key]
+        for key in row.keys()
+        if row[key] is not None and key != "question_key"
+    }
+    if "occurrence_count" in record:
+        # 질문이 들어온 시각 목록 (예전 후보는 등록 시각 하나)
+        occurrences = record.get("occurrences")
+        record["occurrences"] = (
+            json.loads(occurrences) if occurrences else [record["timestamp"]]
+        )
+    return record
+
+
 def add_faq_candidate(question, answer, status="pending_review"):
     """새로운 FAQ 후보 생성"""
+    timestamp = _now()
     candidate = {
         "question": question,
         "generated_answer": answer,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "timestamp": timestamp,
         "status": status,
+        "occurrence_count": 1,
+        "occurrences": [timestamp],
     }
     return candidate
 
 
+def save_faq_candidate(candidate):
+    """FAQ 후보 한 건 저장, 저장된 후보(id 포함) 반환"""
+    conn = get_connection()
+    candidate = dict(candidate)
+    _begin(conn)
+    try:
+        candidate["id"] = _insert_candidate(conn, candidate)
+        add_stats(
+            conn,
+            candidate["timestamp"],
+            {"candidates": 1, "occurrences": 1},
+            totals={"pending_review": 1},
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return candidate
+
+
+def save_or_merge_faq_candidate(candidate):
+    """같은 질문의 검토 대기 후보가 있으면 합치고, 없으면 저장 -> (후보, 합쳤는지)
+
+    중복 확인(LSH + 임베딩)과 저장 사이에 같은 질문이 동시에 들어와도(장애 때
+    같은 문의가 몰리는 경우) 후보가 여러 개 생기지 않도록, 쓰기 트랜잭션 안에서
+    정규화한 질문 키로 한 번 더 확인한다.
+    """
+    conn = get_connection()
+    candidate = dict(candidate)
+    _begin(conn)
+    try:
+        row = conn.execute(
+            "SELECT * FROM faq_candidates "
+            "WHERE question_key = ? AND status = 'pending_review' "
+            "ORDER BY id LIMIT 1",
+            (question_key(candidate["question"]),),
+        ).fetchone()
+        if row is not None:
+            merged = _merge_occurrence(conn, row, candidate["timestamp"])
+            conn.execute("COMMIT")
+            return merged, True
+
+        candidate["id"] = _insert_candidate(conn, candidate)
+        add_stats(
+            conn,
+            candidate["timestamp"],
+            {"candidates": 1, "occurrences": 1},
+            totals={"pending_review": 1},
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return candidate, False
+
+
+def _merge_occurrence(conn, row, timestamp):
+    # 호출한 트랜잭션 안에서 횟수 +1, 시각 추가
+    candidate = _row_to_dict(row)
+    candidate["occurrence_count"] += 1
+    candidate["occurrences"].append(timestamp)
+    conn.execute(
+        "UPDATE faq_candidates SET occurrence_count = ?, occurrences = ? "
+        "WHERE id = ?",
+        (
+            candidate["occurrence_count"],
+            json.dumps(candidate["occurrences"]),
+            candidate["id"],
+        ),
+    )
+    add_stats(conn, timestamp, {"occurrences": 1})
+    return candidate
+
+
+def record_candidate_occurrence(candidate_id, timestamp=None):
+    """중복 질문을 기존 후보에 합치기 (횟수 +1, 시각 추가), 합친 후보 반환
+
+    검토 대기 중인 후보에만 합치며, 그 사이 승인/거절됐으면 None.
+    """
+    conn = get_connection()
+    timestamp = timestamp or _now()
+    _begin(conn)
+    try:
+        row = conn.execute(
+            "SELECT * FROM faq_candidates WHERE id = ? AND status = 'pending_review'",
+            (candidate_id,),
+        ).fetchone()
+        if row is None:
+            conn.execute("ROLLBACK")
+            return None
+
+        candidate = _merge_occurrence(conn, row, timestamp)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return candidate
+
+
+def get_faq_candidate(candidate_id):
+    """ID로 FAQ 후보 조회 (없으면 None)"""
+    row = (
+        get_connection()
+        .execute("SELECT * FROM faq_candidates WHERE id = ?", (candidate_id,))
+        .fetchone()
+    )
+    return _row_to_dict(row) if row else None
+
+
+def _like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _date_conditions(column, date_from, date_to):
+    """날짜(date 또는 YYYY-MM-DD, 끝 날짜 포함) 조건 -> (조건 목록, 파라미터)
+
+    시각은 "YYYY-MM-DD HH:MM:SS" 문자열이라 문자열 비교로 범위 검색 (인덱스 사용)
+    """
+    conditions, params = [], []
+    if date_from:
+        conditions.append(f"{column} >= ?")
+        params.append(str(date_from))
+    if date_to:
+        if isinstance(date_to, str):
+            date_to = date.fromisoformat(date_to)
+        conditions.append(f"{column} < ?")
+        params.append(str(date_to + timedelta(days=1)))
+    return conditions, params
+
+
+def _candidate_filters(
+    status=None, text=None, date_from=None, date_to=None, after_id=None
+):
+    conditions, params = _date_conditions("timestamp", date_from, date_to)
+    if status is not None:
+        conditions.append("status = ?")
+        params.append(status)
+    if text:
+        conditions.append(
+            "(question LIKE ? ESCAPE '\\' OR generated_answer LIKE ? ESCAPE '\\' "
+            "OR edited_question LIKE ? ESCAPE '\\')"
+        )
+        params += [_like_pattern(text)] * 3
+    if after_id is not None:
+        conditions.append("id > ?")
+        params.append(after_id)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+def list_faq_candidates(
+    status=None,
+    limit=None,
+    offset=0,
+    newest_first=False,
+    after_id=None,
+    text=None,
+    date_from=None,
+    date_to=None,
+):
+    """FAQ 후보 목록
+
+    status/등록 날짜(date_from~date_to)/검색어(text) 필터, limit/offset 페이지,
+    after_id 이후 추가분만 조회 가능. 필요한 페이지만 DB에서 읽는다.
+    """
+    where, params = _candidate_filters(status, text, date_from, date_to, after_id)
+    query = "SELECT * FROM faq_candidates" + where
+    query += " ORDER BY timestamp DESC, id DESC" if newest_first else " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return [_row_to_dict(row) for row in get_connection().execute(query, params)]
+
+
+def load_faq_candidates():
+    """전체 FAQ 후보 로드"""
+    try:
+        return list_faq_candidates()
+    except Exception as e:
+        print(f"FAQ 후보 로드 실패: {e}")
+        return []
+
+
+def count_faq_candidates(status=None, text=None, date_from=None, date_to=None):
+    """FAQ 후보 개수 (list_faq_candidates와 같은 필터)"""
+    where, params = _candidate_filters(status, text, date_from, date_to)
+    query = "SELECT COUNT(*) FROM faq_candidates" + where
+    return get_connection().execute(query, params).fetchone()[0]
+
+
 def get_faq_candidates_count():
     """저장된 FAQ 후보 개수 반환"""
-    candidates = load_faq_candidates()
-    return len(candidates)
+    return count_faq_candidates()
+
+
+def approve_faq_candidates(approvals):
+    """여러 FAQ 후보 묶음을 한 트랜잭션으로 승인, 새로 추가된 FAQ 목록 반환
+
+    approvals: [(후보 ID 목록, 확정 질문, 확정 답변)]. 묶음마다 승인된 FAQ를
+    하나 만들고 (원본 질문은 첫 번째 후보 기준), 묶음의 후보는 모두 승인
+    처리한다. 검토 대기 상태인 후보만 승인하며, 다른 세션이 이미 모두
+    처리한 묶음은 건너뛴다 (중복 승인 방지).
+    """
+    conn = get_connection()
+    approved_at = _now()
+    new_faqs = []
+    # IMMEDIATE: 시작할 때 쓰기 잠금을 잡아 읽은 상태가 커밋까지 유지됨
+    _begin(conn)
+    try:
+        for candidate_ids, question, answer in approvals:
+            candidate_ids = list(candidate_ids)
+            rows = conn.execute(
+                "SELECT id, question, timestamp FROM faq_candidates "
+                f"WHERE id IN ({', '.join('?' for _ in candidate_ids)}) "
+                "AND status = 'pending_review'",
+                candidate_ids,
+            ).fetchall()
+            if not rows:
+                continue
+            pending = {row["id"]: row["question"] for row in rows}
+            canonical_id = next(i for i in candidate_ids if i in pending)
+            latency = sum(
+                approval_latency(row["timestamp"], approved_at) for row in rows
+            )
+
+            conn.executemany(
+                "UPDATE faq_candidates SET status = 'approved', edited_question = ?, "
+                "edited_answer = ?, approved_at = ? WHERE id = ?",
+                [(question, answer, approved_at, i) for i in pending],
+            )
+            cursor = conn.execute(
+                "INSERT INTO approved_faqs (id, question, answer, original_question, "
+                "candidate_id, approved_at) VALUES ('', ?, ?, ?, ?, ?)",
+                (question, answer, pending[canonical_id], canonical_id, approved_at),
+            )
+            # 승인 순번으로 안정적인 ID 부여 (approved_001, ...)
+            faq_id = f"approved_{cursor.lastrowid:03d}"
+            conn.execute(
+                "UPDATE approved_faqs SET id = ? WHERE seq = ?",
+                (faq_id, cursor.lastrowid),
+            )
+            add_stats(
+                conn,
+                approved_at,
+                {"approved": len(rows), "approval_latency_sum": latency},
+                totals={"pending_review": -len(rows)},
+            )
+            new_faqs.append(
+                {
+                    "id": faq_id,
+                    "question": question,
+                    "answer": answer,
+                    "original_question": pending[canonical_id],
+                    "candidate_id": canonical_id,
+                    "approved_at": approved_at,
+                    "category": "user_generated",
+                }
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return new_faqs
+
+
+def approve_faq_candidate(candidate_id, edited_question, edited_answer):
+    """FAQ 후보 한 건 승인, 새 FAQ 반환 (이미 처리된 후보면 None)"""
+    new_faqs = approve_faq_candidates(
+        [([candidate_id], edited_question, edited_answer)]
+    )
+    return new_faqs[0] if new_faqs else None
+
+
+def reject_faq_candidates(candidate_ids, reason=""):
+    """여러 FAQ 후보를 한 번에 거절, 실제로 거절된 개수 반환
+
+    검토 대기 상태인 후보만 거절한다 (이미 처리된 후보는 그대로).
+    """
+    candidate_ids = list(candidate_ids)
+    if not candidate_ids:
+        return 0
+    conn = get_connection()
+    rejected_at = _now()
+    _begin(conn)
+    try:
+        cursor = conn.execute(
+            "UPDATE faq_candidates SET status = 'rejected', rejection_reason = ?, "
+            f"rejected_at = ? WHERE id IN ({', '.join('?' for _ in candidate_ids)}) "
+            "AND status = 'pending_review'",
+            [reason, rejected_at] + candidate_ids,
+        )
+        rejected = cursor.rowcount
+        if rejected:
+            add_stats(
+                conn,
+                rejected_at,
+                {"rejected": rejected},
+                totals={"pending_review": -rejected},
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return rejected
+
+
+def reject_faq_candidate(candidate_id, reason=""):
+    """FAQ 후보 거절 (검토 대기 상태일 때만, 이미 처리됐으면 False)"""
+    return reject_faq_candidates([candidate_id], reason) == 1
+
+
+def _approved_filters(text=None, date_from=None, date_to=None):
+    conditions, params = _date_conditions("approved_at", date_from, date_to)
+    if text:
+        conditions.append(
+            "(question LIKE ? ESCAPE '\\' OR answer LIKE ? ESCAPE '\\' "
+            "OR original_question LIKE ? ESCAPE '\\')"
+        )
+        params += [_like_pattern(text)] * 3
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+def list_approved_faqs(
+    limit=None, offset=0, newest_first=False, text=None, date_from=None, date_to=None
+):
+    """승인된 FAQ 목록 (승인 날짜/검색어 필터, limit/offset 페이지)"""
+    where, params = _approved_filters(text, date_from, date_to)
+    query = f"SELECT {', '.join(APPROVED_COLUMNS)} FROM approved_faqs" + where
+    query += " ORDER BY seq DESC" if newest_first else " ORDER BY seq"
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return [_row_to_dict(row) for row in get_connection().execute(query, params)]
+
+
+def load_approved_faqs():
+    """승인된 FAQ 목록 (승인 순)"""
+    return list_approved_faqs()
+
+
+def count_approved_faqs(text=None, date_from=None, date_to=None):
+    """승인된 FAQ 개수 (list_approved_faqs와 같은 필터)"""
+    where, params = _approved_filters(text, date_from, date_to)
+    query = "SELECT COUNT(*) FROM approved_faqs" + where
+    return get_connection().execute(query, params).fetchone()[0]
+
+
+def export_faq_candidates_json():
+    """FAQ 후보 전체를 JSON 문자열로 내보내기 (다운로드용)"""
+    return json.dumps(load_faq_candidates(), ensure_ascii=False, indent=2)
+
+
+def export_approved_faqs_json():
+    """승인된 FAQ 전체를 JSON 문자열로 내보내기 (다운로드용)"""
+    return json.dumps(load_approved_faqs(), ensure_ascii=False, indent=2)
 
 
 def clear_all_candidates():
     """모든 FAQ 후보 삭제 (테스트용)"""
+    conn = get_connection()
     try:
-        if os.path.exists(FAQ_CANDIDATES_FILE):
-            os.remove(FAQ_CANDIDATES_FILE)
+        _begin(conn)
+        try:
+            conn.execute("DELETE FROM faq_candidates")
+            rebuild_stats(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
         print("모든 FAQ 후보 삭제 완료")
         return True
     except Exception as e:
         print(f"FAQ 후보 삭제 실패: {e}")
         return False
+
+
+def record_classification(label, method=None, timestamp=None):
+    """대화 분류 결과(existing/new/skip)와 분류 경로(local/similarity/llm) 집계
+
+    워커 여러 개의 집계가 한 저장소에 모이므로 관리자 통계에서 LLM 분류 호출을
+    얼마나 아꼈는지 볼 수 있다.
+    """
+    metrics = {f"{CLASSIFICATION_PREFIX}{label}": 1}
+    if method:
+        metrics[f"{ROUTING_PREFIX}{method}"] = 1
+    conn = get_connection()
+    _begin(conn)
+    try:
+        add_stats(conn, timestamp or _now(), metrics)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def get_stats_totals():
+    """누적 통계 {지표: 값} (후보 목록을 읽지 않고 집계 테이블만 조회)"""
+    return read_totals(get_connection())
+
+
+def get_stats_series(period="day", since=None):
+    """일별(day)/시간별(hour) 통계 {버킷: {지표: 값}}"""
+    return read_series(get_connection(), period, since)
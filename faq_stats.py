@@ -0,0 +1,114 @@
+import json
+from datetime import datetime
+
+# 집계 단위: 전체 누적(total), 일별(day), 시간별(hour)
+STATS_PERIODS = {"day": 10, "hour": 13}  # 시각 문자열에서 버킷으로 쓸 앞부분 길이
+
+# 지표: candidates(등록된 후보), occurrences(중복 포함 질문 유입), approved,
+# rejected, approval_latency_sum(초, approved로 나누면 평균 승인 대기 시간),
+# pending_review(누적에만 있는 현재 대기 개수), classification:<분류>(대화 분류),
+# routing:<경로>(분류 경로: local 키워드, similarity 벡터 유사도, llm solar-mini 호출)
+CLASSIFICATION_PREFIX = "classification:"
+ROUTING_PREFIX = "routing:"
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats_aggregates (
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, bucket, metric)
+) WITHOUT ROWID;
+"""
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def add_stats(conn, timestamp, metrics, totals=None):
+    """시각이 속한 일/시간 버킷과 누적값에 지표를 더함 (호출한 트랜잭션 안에서)
+
+    metrics: {지표: 증가량} (일/시간/누적 모두), totals: 누적에만 더할 지표
+    """
+    rows = []
+    for metric, value in metrics.items():
+        rows.append(("total", "", metric, value))
+        for period, length in STATS_PERIODS.items():
+            rows.append((period, timestamp[:length], metric, value))
+    for metric, value in (totals or {}).items():
+        rows.append(("total", "", metric, value))
+
+    conn.executemany(
+        "INSERT INTO stats_aggregates (period, bucket, metric, value) "
+        "VALUES (?, ?, ?, ?) ON CONFLICT (period, bucket, metric) "
+        "DO UPDATE SET value = value + excluded.value",
+        rows,
+    )
+
+
+def approval_latency(candidate_timestamp, approved_at):
+    """후보 등록부터 승인까지 걸린 시간 (초)"""
+    registered = datetime.strptime(candidate_timestamp, TIME_FORMAT)
+    approved = datetime.strptime(approved_at, TIME_FORMAT)
+    return max((approved - registered).total_seconds(), 0.0)
+
+
+def rebuild_stats(conn):
+    """후보 테이블로 후보 관련 집계를 처음부터 다시 계산 (최초 1회/전체 삭제 후)
+
+    분류 비율/경로 집계는 원본이 없으므로 그대로 둔다. 호출한 트랜잭션 안에서 실행.
+    """
+    conn.execute(
+        "DELETE FROM stats_aggregates WHERE metric NOT LIKE ? AND metric NOT LIKE ?",
+        (f"{CLASSIFICATION_PREFIX}%", f"{ROUTING_PREFIX}%"),
+    )
+    rows = conn.execute(
+        "SELECT timestamp, status, approved_at, rejected_at, occurrences "
+        "FROM faq_candidates"
+    ).fetchall()
+    for row in rows:
+        occurrences = (
+            json.loads(row["occurrences"]) if row["occurrences"] else [row["timestamp"]]
+        )
+        add_stats(conn, row["timestamp"], {"candidates": 1})
+        for timestamp in occurrences:
+            add_stats(conn, timestamp, {"occurrences": 1})
+
+        if row["status"] == "approved" and row["approved_at"]:
+            add_stats(
+                conn,
+                row["approved_at"],
+                {
+                    "approved": 1,
+                    "approval_latency_sum": approval_latency(
+                        row["timestamp"], row["approved_at"]
+                    ),
+                },
+            )
+        elif row["status"] == "rejected" and row["rejected_at"]:
+            add_stats(conn, row["rejected_at"], {"rejected": 1})
+        elif row["status"] == "pending_review":
+            add_stats(conn, row["timestamp"], {}, totals={"pending_review": 1})
+
+
+def read_totals(conn):
+    """누적 지표 {지표: 값}"""
+    rows = conn.execute(
+        "SELECT metric, value FROM stats_aggregates WHERE period = 'total'"
+    )
+    return {row["metric"]: row["value"] for row in rows}
+
+
+def read_series(conn, period, since=None):
+    """일/시간별 지표 {버킷: {지표: 값}} (버킷 순)
+
+    since: TIME_FORMAT 시각 문자열, 이 시각이 속한 버킷부터 반환
+    """
+    query = "SELECT bucket, metric, value FROM stats_aggregates WHERE period = ?"
+    params = [period]
+    if since:
+        query += " AND bucket >= ?"
+        params.append(since[: STATS_PERIODS[period]])
+    series = {}
+    for row in conn.execute(query + " ORDER BY bucket", params):
+        series.setdefault(row["bucket"], {})[row["metric"]] = row["value"]
+    return series
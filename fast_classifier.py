@@ -0,0 +1,74 @@
+import re
+
+from keyword_matcher import match_keywords
+from keywords import SMALL_TALK_WORDS
+
+# 이 길이 이하의 입력은 짧은 문의로 보고 신뢰도 가산
+SHORT_INPUT_LENGTH = 15
+
+SKIP_CATEGORIES = ["greeting", "casual", "offtopic"]
+
+_WORD_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+
+
+def _overlaps(span, others):
+    return any(span.start < other.end and other.start < span.end for other in others)
+
+
+def is_small_talk(text):
+    """메시지 전체가 인사/감사 표현뿐인지 (단어 단위로 비교, 부분 일치 없음)"""
+    words = _WORD_PATTERN.findall(text.lower())
+    return bool(words) and all(word in SMALL_TALK_WORDS for word in words)
+
+
+def score_input(user_input):
+    """로컬 키워드 기반 분류 점수 계산
+
+    skip은 메시지 전체가 인사/감사일 때만 로컬에서 정한다. 일상/타 업무
+    키워드가 일부에만 들어간 질문("보안 정책", "회의 녹화")은 IT 질문일 수
+    있으므로 LLM에게 맡긴다.
+    반환값: (분류, 신뢰도). 판단 근거가 없으면 (None, 0.0)
+    """
+    text = user_input.strip().lower()
+    if not text or is_small_talk(text):
+        return "skip", 1.0
+
+    matches = match_keywords(text)
+    it_spans = [match for match in matches if match.category == "it"]
+    # 한 글자 키워드("서비스" 안의 "비")와 IT 키워드에 포함된 일상 키워드
+    # ("비밀번호" 안의 "비")는 무시
+    skip_spans = [
+        match
+        for match in matches
+        if match.category in SKIP_CATEGORIES
+        and len(match.keyword) > 1
+        and not _overlaps(match, it_spans)
+    ]
+    is_short = len(text.replace(" ", "")) <= SHORT_INPUT_LENGTH
+
+    # IT 키워드와 일상 키워드가 섞여 있으면 LLM에게 맡김
+    if it_spans and skip_spans:
+        return None, 0.0
+
+    # 키워드 하나만 든 문장("Slack 이메일 연동 방법")은 새 질문일 수 있으므로
+    # 짧은 입력에서 서로 다른 키워드가 2개 이상이거나 메시지 전체가 키워드일 때만
+    # 로컬에서 existing으로 정하고, 나머지는 유사도 라우팅/LLM에게 맡김
+    if it_spans and is_short:
+        hits = len({match.keyword for match in it_spans})
+        whole = "".join(_WORD_PATTERN.findall(text)) == it_spans[0].keyword
+        if hits >= 2 or whole:
+            confidence = 0.6 + 0.1 * min(hits, 3) + 0.1
+            return "existing", round(min(confidence, 1.0), 2)
+
+    return None, 0.0
+
+
+def fast_classify(user_input):
+    """명확한 문의는 LLM 없이 분류, 애매하면 None 반환
+
+    로컬/유사도/LLM 중 어느 경로로 분류됐는지는 파이프라인이 분류 통계에 기록한다.
+    """
+    label, confidence = score_input(user_input)
+    if label:
+        print(f"⚡ 로컬 분류: {label} (신뢰도 {confidence:.2f})")
+    return label
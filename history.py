@@ -0,0 +1,111 @@
+import os
+from functools import lru_cache
+
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+
+# 프롬프트에 넣을 이전 대화의 최대 토큰 수 (추정치 기준)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+# 예산을 넘더라도 항상 넣는 최근 메시지 수 (질문 + 답변 한 턴)
+HISTORY_MIN_MESSAGES = 2
+MESSAGE_OVERHEAD_TOKENS = 4  # 역할 표시 등 메시지마다 붙는 토큰
+
+# 요약되지 않은 대화가 이 턴 수만큼 쌓이면 요약 갱신
+SUMMARY_EVERY_TURNS = int(os.getenv("SUMMARY_EVERY_TURNS", "4"))
+# 요약할 때도 원문 그대로 남겨 둘 최근 턴 수
+SUMMARY_KEEP_RECENT_TURNS = 2
+
+
+def estimate_tokens(text):
+    """토크나이저 없이 추정한 토큰 수 (한글 음절 1개 ~ 1토큰, 그 외 4글자 ~ 1토큰)"""
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+@lru_cache(maxsize=4096)
+def _convert(role, content):
+    """대화 dict 한 개 -> (LangChain 메시지, 추정 토큰 수), 같은 내용이면 재사용"""
+    message_class = HumanMessage if role == "user" else AIMessage
+    tokens = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    return message_class(content=content), tokens
+
+
+def dialogue(chat_history):
+    """첫 질문 이전의 고정 인사말을 뺀 실제 대화"""
+    for i, msg in enumerate(chat_history):
+        if msg["role"] == "user":
+            return chat_history[i:]
+    return []
+
+
+def empty_summary():
+    """대화 요약 상태: 요약 내용과, 요약에 반영된 대화(인사말 제외) 메시지 수"""
+    return {"text": "", "covered": 0}
+
+
+def build_history(
+    chat_history,
+    summary=None,
+    token_budget=HISTORY_TOKEN_BUDGET,
+    min_messages=HISTORY_MIN_MESSAGES,
+):
+    """프롬프트에 넣을 이전 대화 메시지 (토큰 예산 안에서 최근 것부터)
+
+    고정 인사말은 빼고, 최근 min_messages개는 예산과 상관없이 항상 넣는다.
+    잘린 경우 질문으로 시작하도록 앞쪽의 답변 하나는 버린다.
+    요약이 있으면 요약된 앞부분 대신 요약을 맨 앞에 넣는다.
+    """
+    messages = dialogue(chat_history)
+    prefix = []
+    used = 0
+    if summary and summary["text"].strip():
+        messages = messages[summary["covered"] :]
+        summary_text = f"이전 대화 요약:\n{summary['text'].strip()}"
+        prefix = [SystemMessage(content=summary_text)]
+        used = estimate_tokens(summary_text) + MESSAGE_OVERHEAD_TOKENS
+
+    converted = [
+        _convert(msg["role"], msg["content"])
+        for msg in messages
+        if msg["role"] in ("user", "assistant")
+    ]
+
+    kept = []
+    for message, tokens in reversed(converted):
+        if len(kept) >= min_messages and used + tokens > token_budget:
+            break
+        kept.append(message)
+        used += tokens
+    kept.reverse()
+
+    if len(kept) < len(converted) and kept and isinstance(kept[0], AIMessage):
+        kept = kept[1:]
+    return prefix + kept
+
+
+def needs_summary_update(chat_history, summary, every=SUMMARY_EVERY_TURNS):
+    """요약되지 않은 대화가 every턴(+ 남겨 둘 최근 턴) 이상 쌓였는지"""
+    uncovered = len(dialogue(chat_history)) - summary["covered"]
+    return uncovered >= 2 * (every + SUMMARY_KEEP_RECENT_TURNS)
+
+
+def update_summary(summary_chain, chat_history, summary):
+    """이전 요약 + 아직 요약되지 않은 턴으로 요약 갱신 (처음부터 다시 요약하지 않음)
+
+    최근 SUMMARY_KEEP_RECENT_TURNS턴은 원문으로 남긴다. 갱신된 요약 상태 반환.
+    """
+    messages = dialogue(chat_history)
+    covered = max(summary["covered"], 0)
+    upto = len(messages) - 2 * SUMMARY_KEEP_RECENT_TURNS
+    if upto <= covered:
+        return summary
+
+    new_turns = [
+        _convert(msg["role"], msg["content"])[0]
+        for msg in messages[covered:upto]
+        if msg["role"] in ("user", "assistant")
+    ]
+    text = summary_chain.invoke(
+        {"summary": summary["text"].strip() or "(없음)", "chat_history": new_turns}
+    ).strip()
+    print(f"📝 대화 요약 갱신: 메시지 {covered} -> {upto}")
+    return {"text": text or summary["text"], "covered": upto}
@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from langchain_chroma import Chroma
+from answer_cache import bump_index_version
+from atomic_io import atomic_write_text, file_lock
+from documents import load_all_documents
+from index_sync import with_content_hash, sync_index
+from ingest import ingest_documents
+from resource_pool import (
+    get_pool,
+    active_chroma_dir,
+    set_active_chroma_dir,
+    index_publish_lock,
+    close_chroma,
+)
+
+CHROMA_BUILDS_DIR = "chroma_builds"
+# 작업 상태 파일 (API 워커 여러 개 중 어디서 물어봐도 같은 상태를 보도록)
+REBUILD_STATUS_FILE = "index_rebuild_status.json"
+
+_job_lock = threading.Lock()
+_job = {
+    "status": "idle",  # idle / running / done / failed
+    "done": 0,
+    "total": 0,
+    "message": "",
+    "build_dir": None,
+    "started_at": None,
+    "finished_at": None,
+    "pid": None,  # 작업을 돌리는 프로세스
+}
+
+
+def get_rebuild_status():
+    """재구성 작업 상태 (관리자 페이지 표시용, 다른 프로세스가 시작한 작업 포함)"""
+    try:
+        with open(REBUILD_STATUS_FILE, "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        with _job_lock:
+            return dict(_job)
+
+    # 작업하던 워커가 도중에 죽었으면 계속 running으로 남지 않도록
+    if status["status"] == "running" and not _process_alive(status.get("pid")):
+        status.update(status="failed", message="재구성하던 프로세스가 종료됨")
+    return status
+
+
+def _process_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _update(**fields):
+    with _job_lock:
+        _job.update(fields)
+        atomic_write_text(REBUILD_STATUS_FILE, json.dumps(_job, ensure_ascii=False))
+
+
+def start_rebuild(api_key):
+    """ChromaDB 재구성을 백그라운드 스레드로 시작 (이미 진행 중이면 False)"""
+    with file_lock(REBUILD_STATUS_FILE):
+        if get_rebuild_status()["status"] == "running":
+            return False
+        build_dir = os.path.join(
+            CHROMA_BUILDS_DIR, datetime.now().strftime("%Y%m%d_%H%M%S")
+        )
+        _update(
+            status="running",
+            done=0,
+            total=0,
+            message="문서 로드 중",
+            build_dir=build_dir,
+            started_at=time.time(),
+            finished_at=None,
+            pid=os.getpid(),
+        )
+
+    thread = threading.Thread(
+        target=_run_rebuild, args=(api_key, build_dir), daemon=True
+    )
+    thread.start()
+    return True
+
+
+def _run_rebuild(api_key, build_dir):
+    try:
+        rebuild_index(api_key, build_dir)
+    except Exception as e:
+        print(f"ChromaDB 재구성 실패: {e}")
+        _update(status="failed", message=str(e), finished_at=time.time())
+        # 실패한 빌드는 사용하지 않으므로 정리 (활성 인덱스는 그대로)
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def rebuild_index(api_key, build_dir):
+    """새 디렉터리에 컬렉션을 처음부터 만들고, 완성되면 활성 인덱스를 교체
+
+    빌드하는 동안 챗봇은 기존 인덱스로 계속 응답하며, 교체는 포인터 파일
+    rename 한 번이라 일부만 채워진 인덱스가 보이는 일이 없다.
+    """
+    docs = [with_content_hash(doc) for doc in load_all_documents()]
+    _update(total=len(docs), message="임베딩 중")
+
+    db = Chroma(
+        persist_directory=build_dir, embedding_function=get_pool(api_key).embeddings
+    )
+    report = ingest_documents(
+        db,
+        docs,
+        checkpoint_path=os.path.join(build_dir, "ingest_checkpoint.json"),
+        progress_callback=lambda done, total: _update(done=done),
+    )
+    if report["failed"]:
+        raise RuntimeError(f"{len(report['failed'])}개 문서 적재 실패")
+
+    # 빌드 중 승인된 FAQ 등 원본 변경분 반영
+    _update(message="변경분 반영 중")
+    sync_index(db, checkpoint_path=None)
+
+    # 위 동기화 뒤에 승인된 FAQ는 기존 인덱스에만 들어갔으므로, 승인을 막은 채로
+    # 한 번 더 동기화하고 교체 (대부분 변경 없음으로 바로 끝남)
+    with index_publish_lock():
+        sync_index(db, checkpoint_path=None)
+        count = db._collection.count()
+        previous_dir = active_chroma_dir()
+        set_active_chroma_dir(build_dir)
+    bump_index_version()
+
+    # 이 프로세스의 풀을 새 인덱스로 옮겨 오래된 클라이언트를 닫은 뒤 정리
+    get_pool(api_key).db
+    close_chroma(db)
+    _cleanup_old_builds(keep={build_dir, previous_dir})
+
+    _update(
+        status="done",
+        done=len(docs),
+        message=f"{count}개 문서로 재구성 완료 (이전: {previous_dir})",
+        finished_at=time.time(),
+    )
+    print(f"✅ ChromaDB 재구성 완료: {build_dir} ({count}개 문서)")
+
+
+def _cleanup_old_builds(keep):
+    """새 빌드와 직전 인덱스(되돌리기용)를 제외한 빌드 디렉터리 삭제"""
+    if not os.path.isdir(CHROMA_BUILDS_DIR):
+        return
+    for name in os.listdir(CHROMA_BUILDS_DIR):
+        path = os.path.join(CHROMA_BUILDS_DIR, name)
+        if path not in keep:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+
+from answer_cache import bump_index_version
+from documents import approved_faq_document, load_all_documents
+from ingest import ingest_documents
+
+
+def content_hash(doc):
+    """문서 본문 + 메타데이터 해시 (내용이 바뀌었는지 판단용)"""
+    metadata = {k: v for k, v in doc.metadata.items() if k != "content_hash"}
+    raw = json.dumps(
+        {"page_content": doc.page_content, "metadata": metadata},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def with_content_hash(doc):
+    """메타데이터에 content_hash를 채운 문서 반환"""
+    doc.metadata["content_hash"] = content_hash(doc)
+    return doc
+
+
+def upsert_documents(db, docs):
+    """문서 ID(metadata id)를 키로 추가 또는 교체"""
+    if not docs:
+        return
+    docs = [with_content_hash(doc) for doc in docs]
+    db.add_documents(docs, ids=[doc.metadata["id"] for doc in docs])
+
+
+def publish_approved_faqs(db, faqs):
+    """승인된 FAQ를 벡터 DB에 upsert하고 답변 캐시 무효화 (다른 워커도 버전으로 감지)"""
+    if not faqs:
+        return
+    # FAQ ID로 upsert (같은 FAQ를 다시 승인해도 중복되지 않음)
+    upsert_documents(db, [approved_faq_document(faq) for faq in faqs])
+    bump_index_version()
+
+
+def get_indexed_hashes(db):
+    """벡터 DB에 들어 있는 {문서 ID: content_hash} (임베딩은 읽지 않음)"""
+    indexed = db.get(include=["metadatas"])
+    return {
+        doc_id: (metadata or {}).get("content_hash")
+        for doc_id, metadata in zip(indexed["ids"], indexed["metadatas"])
+    }
+
+
+def diff_documents(docs, indexed_hashes):
+    """원본 문서와 색인 상태를 비교해 추가/변경/삭제/유지 목록 계산"""
+    desired = {}
+    for doc in docs:
+        desired[doc.metadata["id"]] = with_content_hash(doc)
+
+    added, updated, unchanged = [], [], []
+    for doc_id, doc in desired.items():
+        if doc_id not in indexed_hashes:
+            added.append(doc)
+        elif indexed_hashes[doc_id] != doc.metadata["content_hash"]:
+            updated.append(doc)
+        else:
+            unchanged.append(doc_id)
+
+    # ID 없이 들어간 예전 문서(임의 UUID)도 원본에 없으므로 삭제 대상
+    deleted = [doc_id for doc_id in indexed_hashes if doc_id not in desired]
+    return {
+        "added": added,
+        "updated": updated,
+        "deleted": deleted,
+        "unchanged": unchanged,
+    }
+
+
+def sync_index(db, docs=None, **ingest_options):
+    """매뉴얼 + 승인된 FAQ를 벡터 DB와 증분 동기화
+
+    새로 생기거나 내용이 바뀐 문서만 임베딩해서 upsert하고, 원본에서
+    사라진 문서는 삭제한다. 바뀐 게 없으면 임베딩 API를 호출하지 않는다.
+    ingest_options는 ingest_documents로 전달된다 (배치 크기, 동시 요청 수 등).
+    반환값: {"added", "updated", "deleted", "unchanged", "failed"} 개수
+    """
+    if docs is None:
+        docs = load_all_documents()
+
+    diff = diff_documents(docs, get_indexed_hashes(db))
+
+    failed = []
+    if diff["added"] or diff["updated"]:
+        ingest_report = ingest_documents(
+            db, diff["added"] + diff["updated"], **ingest_options
+        )
+        failed = ingest_report["failed"]
+    if diff["deleted"]:
+        db.delete(ids=diff["deleted"])
+
+    report = {name: len(items) for name, items in diff.items()}
+    report["failed"] = len(failed)
+    if report["added"] or report["updated"] or report["deleted"]:
+        bump_index_version()
+    print(
+        f"🔄 벡터 DB 동기화: 추가 {report['added']}, 변경 {report['updated']}, "
+        f"삭제 {report['deleted']}, 유지 {report['unchanged']}, 실패 {report['failed']}"
+    )
+    return report
@@ -0,0 +1,152 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from atomic_io import atomic_write_json
+
+INGEST_BATCH_SIZE = 32
+INGEST_MAX_WORKERS = 4
+INGEST_MAX_RETRIES = 5
+INGEST_BACKOFF_BASE = 1.0  # 초, 재시도마다 2배
+INGEST_BACKOFF_MAX = 30.0
+INGEST_CHECKPOINT_FILE = "ingest_checkpoint.json"
+
+
+def collection_key(db):
+    """체크포인트가 가리키는 컬렉션 (이름 + UUID)
+
+    디렉터리를 지우고 다시 만들거나 활성 인덱스가 바뀌면 UUID가 달라지므로
+    예전 체크포인트와 구분된다.
+    """
+    return f"{db._collection.name}:{db._collection.id}"
+
+
+def load_checkpoint(path, collection=None):
+    """완료된 {문서 ID: content_hash} (중단된 적재 재개용)
+
+    다른 컬렉션에 적재하던 체크포인트면 버린다 (없는 문서를 건너뛰지 않도록).
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except Exception as e:
+        print(f"적재 체크포인트 로드 실패, 처음부터 진행: {e}")
+        return {}
+    if checkpoint.get("collection") != collection:
+        print("다른 컬렉션의 적재 체크포인트라서 무시하고 처음부터 진행")
+        return {}
+    return checkpoint.get("done", {})
+
+
+def save_checkpoint(path, done, collection=None):
+    if not path:
+        return
+    atomic_write_json(path, {"collection": collection, "done": done})
+
+
+def with_retry(func, max_retries=INGEST_MAX_RETRIES, backoff=INGEST_BACKOFF_BASE):
+    """실패 시 지수 백오프(+지터)로 재시도"""
+    for attempt in range(max_retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = min(backoff * 2**attempt, INGEST_BACKOFF_MAX)
+            delay *= 0.5 + random.random() / 2
+            print(
+                f"임베딩 요청 실패 ({attempt + 1}/{max_retries}), "
+                f"{delay:.1f}초 후 재시도: {e}"
+            )
+            time.sleep(delay)
+
+
+def ingest_documents(
+    db,
+    docs,
+    batch_size=INGEST_BATCH_SIZE,
+    max_workers=INGEST_MAX_WORKERS,
+    max_retries=INGEST_MAX_RETRIES,
+    checkpoint_path=INGEST_CHECKPOINT_FILE,
+    progress_callback=None,
+):
+    """문서를 배치로 나눠 동시에 임베딩하고 벡터 DB에 upsert
+
+    - 배치마다 지수 백오프로 재시도하고, 실패한 배치가 있어도 나머지는 계속 적재
+    - 완료된 문서는 체크포인트에 기록해 중단 후 같은 컬렉션에 다시 실행하면 이어서 적재
+    - docs는 metadata에 id, content_hash가 채워져 있어야 함
+    - progress_callback(완료 문서 수, 전체 문서 수)
+
+    반환값: {"documents", "skipped", "failed", "seconds", "docs_per_sec"}
+    """
+    collection = collection_key(db)
+    done = load_checkpoint(checkpoint_path, collection)
+    pending = [
+        doc
+        for doc in docs
+        if done.get(doc.metadata["id"]) != doc.metadata.get("content_hash")
+    ]
+    skipped = len(docs) - len(pending)
+    if skipped:
+        print(f"체크포인트에서 {skipped}개 문서 건너뜀")
+
+    batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+    embeddings = db.embeddings
+    write_lock = threading.Lock()
+    started = time.perf_counter()
+    completed = 0
+    failed = []
+
+    def run_batch(batch):
+        texts = [doc.page_content for doc in batch]
+        vectors = with_retry(lambda: embeddings.embed_documents(texts), max_retries)
+        with write_lock:
+            db._collection.upsert(
+                ids=[doc.metadata["id"] for doc in batch],
+                embeddings=vectors,
+                documents=texts,
+                metadatas=[doc.metadata for doc in batch],
+            )
+            for doc in batch:
+                done[doc.metadata["id"]] = doc.metadata.get("content_hash")
+            save_checkpoint(checkpoint_path, done, collection)
+        return len(batch)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_batch, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                completed += future.result()
+            except Exception as e:
+                batch = futures[future]
+                failed.extend(doc.metadata["id"] for doc in batch)
+                print(f"배치 적재 실패 ({len(batch)}개 문서): {e}")
+
+            elapsed = time.perf_counter() - started
+            rate = completed / elapsed if elapsed else 0.0
+            print(f"📥 적재 진행: {completed}/{len(pending)} ({rate:.1f} docs/sec)")
+            if progress_callback is not None:
+                progress_callback(completed, len(pending))
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "documents": completed,
+        "skipped": skipped,
+        "failed": failed,
+        "seconds": elapsed,
+        "docs_per_sec": completed / elapsed if elapsed else 0.0,
+    }
+    print(
+        f"📥 적재 완료: {completed}개 문서, {elapsed:.1f}초 "
+        f"({report['docs_per_sec']:.1f} docs/sec), 실패 {len(failed)}개"
+    )
+
+    # 모두 성공했으면 체크포인트 정리 (실패가 있으면 다음 실행에서 이어서 적재)
+    if not failed and checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return report
@@ -0,0 +1,141 @@
+import json
+from collections import deque, namedtuple
+
+from keywords import (
+    GREETING_KEYWORDS,
+    CASUAL_KEYWORDS,
+    OFFTOPIC_KEYWORDS,
+    CASUAL_CHAT_KEYWORDS,
+)
+
+MANUAL_FILE = "it_helpdesk_manual.json"
+
+# 매뉴얼 키워드 중 분류 근거로 쓰지 않는 카테고리
+IGNORED_MANUAL_CATEGORIES = ["일반"]
+
+# 여러 카테고리가 동시에 매칭되면 앞에 있는 카테고리가 우선
+SKIP_PRIORITY = ["greeting", "casual", "offtopic"]
+CASUAL_CHAT_PRIORITY = [f"casual_chat:{name}" for name in CASUAL_CHAT_KEYWORDS]
+
+KeywordMatch = namedtuple("KeywordMatch", ["start", "end", "keyword", "category"])
+
+
+class KeywordMatcher:
+    """Aho-Corasick 오토마톤 기반 다중 키워드 매처
+
+    카테고리별 키워드 목록을 한 번에 컴파일해 두고, 입력 텍스트를
+    한 번만 훑어서 매칭된 모든 (위치, 키워드, 카테고리)를 찾는다.
+    """
+
+    def __init__(self, categories):
+        # 노드별 전이, 실패 링크, 출력(키워드, 카테고리 목록)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                self._add(keyword.lower(), category)
+        self._build_failure_links()
+
+    def _add(self, keyword, category):
+        if not keyword:
+            return
+        node = 0
+        for char in keyword:
+            if char not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = len(self._goto) - 1
+            node = self._goto[node][char]
+
+        for existing_keyword, categories in self._output[node]:
+            if existing_keyword == keyword:
+                if category not in categories:
+                    categories.append(category)
+                return
+        self._output[node].append((keyword, [category]))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # 실패 링크 쪽에서 끝나는 키워드도 함께 출력
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+
+    def find_all(self, text):
+        """텍스트에서 매칭된 모든 KeywordMatch 목록 (시작 위치 순)"""
+        matches = []
+        node = 0
+        for index, char in enumerate(text.lower()):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for keyword, categories in self._output[node]:
+                start = index - len(keyword) + 1
+                for category in categories:
+                    matches.append(KeywordMatch(start, index + 1, keyword, category))
+        matches.sort(key=lambda match: (match.start, -match.end))
+        return matches
+
+
+def load_manual_keywords(path=MANUAL_FILE):
+    """매뉴얼 metadata의 keywords를 분류용 키워드로 로드"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"매뉴얼 키워드 로드 실패: {e}")
+        return []
+
+    skip_set = set(GREETING_KEYWORDS + CASUAL_KEYWORDS + OFFTOPIC_KEYWORDS)
+    keywords = set()
+    for item in data:
+        if item["metadata"]["category"] in IGNORED_MANUAL_CATEGORIES:
+            continue
+        for keyword in item["metadata"]["keywords"]:
+            keyword = keyword.lower()
+            # 일상/타 업무 키워드와 겹치는 단어(회의, 보안 등)는 근거로 쓰지 않음
+            if keyword not in skip_set:
+                keywords.add(keyword)
+    return sorted(keywords)
+
+
+def build_default_matcher():
+    """keywords.py와 매뉴얼 키워드로 기본 매처 생성"""
+    categories = {
+        "greeting": GREETING_KEYWORDS,
+        "casual": CASUAL_KEYWORDS,
+        "offtopic": OFFTOPIC_KEYWORDS,
+        "it": load_manual_keywords(),
+    }
+    for name, keywords in CASUAL_CHAT_KEYWORDS.items():
+        categories[f"casual_chat:{name}"] = keywords
+    return KeywordMatcher(categories)
+
+
+# 임포트 시 한 번만 컴파일
+MATCHER = build_default_matcher()
+
+
+def match_keywords(text):
+    """기본 매처로 텍스트 전체를 한 번 훑어 매칭 결과 반환"""
+    return MATCHER.find_all(text)
+
+
+def pick_category(matches, priority):
+    """매칭 결과 중 우선순위가 가장 높은 카테고리 (없으면 None)"""
+    matched = {match.category for match in matches}
+    for category in priority:
+        if category in matched:
+            return category
+    return None
@@ -26,7 +26,8 @@ GREETING_KEYWORDS = [
     "왔습니다",
 ]
 
-# 일상 대화 키워드
+# 일상 대화 키워드 (한 글자 키워드는 "서비스", "준비" 같은 단어 안에서도 매칭되므로
+# 응답 고르기에만 쓰고 로컬 분류 근거로는 쓰지 않음)
 CASUAL_KEYWORDS = [
     "날씨",
     "비",
@@ -149,3 +150,48 @@ CASUAL_CHAT_KEYWORDS = {
     "positive": ["재밌", "좋네", "신기", "대단", "멋지"],
     "thanks": ["감사", "고마", "고맙", "thank", "thanks"],
 }
+
+# 메시지 전체가 이 단어들로만 이루어져 있으면 LLM 없이 skip (인사/감사 표현)
+SMALL_TALK_WORDS = {
+    "안녕",
+    "안녕하세요",
+    "안녕하십니까",
+    "안녕히",
+    "계세요",
+    "가세요",
+    "안뇽",
+    "하이",
+    "hi",
+    "hello",
+    "헬로",
+    "헬로우",
+    "굿모닝",
+    "반가워요",
+    "반갑습니다",
+    "처음",
+    "뵙겠습니다",
+    "수고",
+    "수고하세요",
+    "수고하셨습니다",
+    "많으세요",
+    "감사",
+    "감사합니다",
+    "감사해요",
+    "감사드립니다",
+    "고마워",
+    "고마워요",
+    "고맙습니다",
+    "땡큐",
+    "thank",
+    "thanks",
+    "you",
+    "bye",
+    "바이",
+    "정말",
+    "너무",
+    "네",
+    "넵",
+    "예",
+    "알겠습니다",
+    "좋아요",
+}
@@ -0,0 +1,88 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+# 키워드는 본문보다 중요하므로 색인 시 반복해서 가중치 부여
+KEYWORD_WEIGHT = 3
+SCENARIO_WEIGHT = 2
+
+
+def tokenize(text):
+    """검색용 토큰 (단어 + 한글 단어의 글자 바이그램)
+
+    형태소 분석기 없이도 "프린터가"와 "프린터"가 매칭되도록
+    한글 단어는 두 글자씩 끊은 조각도 함께 색인한다.
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and HANGUL_PATTERN.search(word):
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _document_keywords(doc):
+    keywords = doc.metadata.get("keywords", "")
+    return [k.strip().lower() for k in keywords.split(",") if k.strip()]
+
+
+def _index_text(doc):
+    parts = [doc.page_content]
+    parts += [" ".join(_document_keywords(doc))] * KEYWORD_WEIGHT
+    parts += [doc.metadata.get("scenario", "")] * SCENARIO_WEIGHT
+    return " ".join(parts)
+
+
+class LexicalIndex:
+    """매뉴얼 본문/키워드/시나리오에 대한 BM25 역색인 (프로세스 내)"""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+
+        self._postings = defaultdict(dict)  # 토큰 -> {문서 번호: 빈도}
+        self._lengths = []
+        self._keywords = defaultdict(set)  # 키워드 -> 문서 번호
+
+        for index, doc in enumerate(documents):
+            counts = Counter(tokenize(_index_text(doc)))
+            for token, count in counts.items():
+                self._postings[token][index] = count
+            self._lengths.append(sum(counts.values()))
+            for keyword in _document_keywords(doc):
+                self._keywords[keyword].add(index)
+
+        total = len(documents)
+        self._avg_length = sum(self._lengths) / total if total else 0.0
+        self._idf = {
+            token: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for token, posting in self._postings.items()
+        }
+
+    def search(self, query, k=10):
+        """BM25 점수 순 (문서, 점수) 목록"""
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            posting = self._postings.get(token)
+            if not posting:
+                continue
+            idf = self._idf[token]
+            for index, frequency in posting.items():
+                norm = 1 - self.b + self.b * self._lengths[index] / self._avg_length
+                scores[index] += (
+                    idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+                )
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[index], score) for index, score in ranked]
+
+    def exact_keyword_matches(self, query):
+        """질문의 단어가 매뉴얼 키워드와 정확히 일치하는 문서 목록"""
+        matched = set()
+        for word in TOKEN_PATTERN.findall(query.lower()):
+            matched |= self._keywords.get(word, set())
+        return [self.documents[index] for index in sorted(matched)]
@@ -0,0 +1,285 @@
+"""동시 세션 부하 테스트 (로컬 가짜 Upstage 서버 상대)
+
+N개 세션이 여러 턴짜리 대화 시나리오를 동시에 진행하며 챗봇 화면과 같은
+방식(스트리밍 get_response + 롤링 요약)으로 파이프라인을 직접 호출한다.
+세션 수를 늘려 가며 처리량, 지연 시간 꼬리(p95/p99), 오류율, FAQ 저장소와
+파일 잠금 경합, API 요청/429 수를 보고한다. 실제 Upstage 클라이언트가
+HTTP로 fake_upstage.py 서버를 호출하므로 연결/재시도 비용도 포함된다.
+
+    python load_test.py --sessions 1,4,16,32 --duration 20
+    python load_test.py --sessions 8,32 --rate-limit 50   # API 속도 제한 흉내
+"""
+
+__import__("pysqlite3")
+import sys
+
+sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+LOAD_TEST_API_KEY = "load-test"
+MANUAL_FILE = "it_helpdesk_manual.json"
+GREETING = {"role": "assistant", "content": "안녕하세요! IT 헬프데스크입니다."}
+
+# 대화 시나리오 ({existing}: 매뉴얼 시나리오 질문, {new}: 매뉴얼에 없는 질문)
+SCRIPTS = [
+    ["안녕하세요", "{existing}", "그래도 안돼요", "감사합니다"],
+    ["{existing}", "다음 단계는 뭔가요?", "{existing}"],
+    ["{new}", "그럼 언제쯤 가능할까요?", "감사합니다"],
+    ["{existing}", "{new}", "고마워요"],
+    ["{existing}", "이거 말고 다른 방법은요?", "그건 해봤어요", "{existing}", "네"],
+]
+NEW_QUESTIONS = [
+    "노션 사내 도입 일정이 있나요?",
+    "깃허브 코파일럿 라이선스 신청은 어떻게 하나요?",
+    "피그마 보안 정책상 써도 되나요?",
+    "줌 웨비나 계정 발급 가능한가요?",
+    "슬랙 허들 녹화 기능 써도 되나요?",
+]
+
+
+def load_scenario_questions(path=MANUAL_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        manual = json.load(f)
+    scenarios = sorted({item["metadata"]["scenario"] for item in manual})
+    return [f"{scenario} 어떻게 해결하나요?" for scenario in scenarios]
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+
+def run_session(session_id, deadline, args, questions, results, lock):
+    """시나리오를 골라 deadline까지 반복 (진행 중인 턴은 끝까지)"""
+    from history import empty_summary, needs_summary_update, update_summary
+    from pipeline import get_response
+    from resource_pool import get_pool
+
+    rng = random.Random(args.seed * 1000 + session_id)
+    pool = get_pool(LOAD_TEST_API_KEY)
+
+    while time.perf_counter() < deadline:
+        chat_history = [GREETING]
+        summary = empty_summary()
+        for template in rng.choice(SCRIPTS):
+            if time.perf_counter() >= deadline:
+                break
+            user_input = template.format(
+                existing=rng.choice(questions), new=rng.choice(NEW_QUESTIONS)
+            )
+
+            started = time.perf_counter()
+            first_chunk = None
+            record = {"ok": True}
+            try:
+                chunks = get_response(
+                    user_input,
+                    chat_history,
+                    LOAD_TEST_API_KEY,
+                    stream=True,
+                    summary=summary,
+                )
+                parts = []
+                for chunk in chunks:
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - started
+                    parts.append(chunk)
+                answer = "".join(parts)
+                chat_history = chat_history + [
+                    {"role": "user", "content": user_input},
+                    {"role": "assistant", "content": answer},
+                ]
+                if needs_summary_update(chat_history, summary):
+                    summary = update_summary(pool.summary_chain, chat_history, summary)
+            except Exception as e:
+                record = {"ok": False, "error": type(e).__name__}
+
+            record["latency"] = time.perf_counter() - started
+            record["first_chunk"] = first_chunk
+            with lock:
+                results.append(record)
+
+            # 사용자가 답변을 읽고 다음 질문을 입력하는 시간
+            time.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def run_level(sessions, args, questions, server):
+    import faq_manager
+    from atomic_io import FILE_LOCK_STATS
+
+    faq_manager.STORE_LOCK_STATS.reset()
+    FILE_LOCK_STATS.reset()
+    if server is not None:
+        server.reset_stats()
+    candidates_before = faq_manager.count_faq_candidates()
+
+    results = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    workers = [
+        threading.Thread(
+            target=run_session, args=(i, deadline, args, questions, results, lock)
+        )
+        for i in range(sessions)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    ok = [r for r in results if r["ok"]]
+    latencies = [r["latency"] * 1000 for r in ok]
+    first_chunks = [r["first_chunk"] * 1000 for r in ok if r["first_chunk"]]
+    errors = Counter(r["error"] for r in results if not r["ok"])
+    return {
+        "sessions": sessions,
+        "elapsed_s": round(elapsed, 2),
+        "turns": len(results),
+        "throughput_turns_per_s": round(len(ok) / elapsed, 2),
+        "error_rate": round(sum(errors.values()) / len(results), 4) if results else 0.0,
+        "errors": dict(errors),
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": percentile(latencies, 100),
+        },
+        "first_chunk_ms": {
+            "p50": percentile(first_chunks, 50),
+            "p95": percentile(first_chunks, 95),
+        },
+        "faq_candidates_added": faq_manager.count_faq_candidates() - candidates_before,
+        "store_lock": faq_manager.STORE_LOCK_STATS.get_stats(),
+        "file_lock": FILE_LOCK_STATS.get_stats(),
+        "api": server.get_stats() if server is not None else None,
+    }
+
+
+def print_level(level, file=None):
+    latency = {k: v or 0 for k, v in level["latency_ms"].items()}
+    store = level["store_lock"]
+    api = level["api"] or {}
+    print(
+        f"{level['sessions']:>5}{level['throughput_turns_per_s']:>9.2f}"
+        f"{latency['p50']:>9.0f}{latency['p95']:>9.0f}{latency['p99']:>9.0f}"
+        f"{level['first_chunk_ms']['p95'] or 0:>10.0f}{level['error_rate']:>8.1%}"
+        f"{store['contended_rate']:>9.1%}{store['max_wait_seconds'] * 1000:>10.1f}"
+        f"{api.get('requests', 0):>8}{api.get('rate_limited', 0):>6}",
+        file=file,
+    )
+    if level["errors"]:
+        print(f"      오류: {level['errors']}", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,4,16", help="동시 세션 수 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=20, help="단계별 시간(초)")
+    parser.add_argument("--think-time", type=float, default=0.5, help="턴 사이 평균(초)")
+    parser.add_argument("--base-url", help="이미 띄운 가짜 서버 주소 (없으면 내장 서버)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="첫 토큰(초)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="토큰당(초)")
+    parser.add_argument("--output-tokens", type=int, default=60)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=0, help="초당 API 요청 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="API 500 비율")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_results/load_test_result.json")
+    parser.add_argument("--verbose", action="store_true", help="파이프라인 로그 출력")
+    parser.add_argument("--keep", action="store_true", help="임시 디렉터리 유지")
+    args = parser.parse_args()
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+    output = os.path.abspath(args.output)
+
+    server = None
+    if args.base_url:
+        os.environ["UPSTAGE_API_BASE"] = args.base_url
+    else:
+        from fake_upstage import FakeUpstageServer
+
+        server = FakeUpstageServer(
+            first_token_latency=args.llm_latency,
+            token_latency=args.token_latency,
+            output_tokens=args.output_tokens,
+            embedding_latency=args.embedding_latency,
+            rate_limit=args.rate_limit,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        ).start()
+        os.environ["UPSTAGE_API_BASE"] = server.base_url
+
+    # 매뉴얼만 복사한 빈 작업 디렉터리에서 실행 (faq.db, chroma_db 등 새로 생성)
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp(prefix="helpdesk_load_")
+    shutil.copy(os.path.join(source_dir, MANUAL_FILE), workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    stdout = sys.stdout
+    quiet = contextlib.ExitStack()
+    try:
+        if not args.verbose:
+            devnull = quiet.enter_context(open(os.devnull, "w", encoding="utf-8"))
+            quiet.enter_context(contextlib.redirect_stdout(devnull))
+
+        from pipeline import load_manual
+        from resource_pool import get_pool
+
+        # 벡터 DB 구축은 측정에서 제외
+        load_manual(get_pool(LOAD_TEST_API_KEY).db)
+        questions = load_scenario_questions()
+
+        report = {
+            "meta": {
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "duration_s": args.duration,
+                "think_time_s": args.think_time,
+                "fake_latency": {
+                    "llm_first_token_s": args.llm_latency,
+                    "llm_token_s": args.token_latency,
+                    "output_tokens": args.output_tokens,
+                    "embedding_s": args.embedding_latency,
+                },
+                "rate_limit": args.rate_limit,
+                "error_rate": args.error_rate,
+            },
+            "levels": [],
+        }
+        print(
+            f"{'세션':>5}{'턴/초':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'첫청크95':>10}"
+            f"{'오류':>8}{'잠금경합':>9}{'최대대기':>10}{'API':>8}{'429':>6}",
+            file=stdout,
+        )
+        for sessions in levels:
+            level = run_level(sessions, args, questions, server)
+            report["levels"].append(level)
+            print_level(level, file=stdout)
+    finally:
+        quiet.close()
+        os.chdir(cwd)
+        if server is not None:
+            server.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print("(지연 시간 ms, 잠금경합: FAQ 저장소 쓰기 잠금을 1ms 이상 기다린 비율)")
+    print(f"결과 저장: {output}" + (f" (작업 디렉터리 {workdir})" if args.keep else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,608 @@
+# 분류 -> 검색 -> 답변 생성 -> FAQ 후보 등록 파이프라인 (Streamlit 비의존)
+# Chroma가 최신 sqlite3를 요구하므로 실행 진입점에서 pysqlite3로 바꾼 뒤 가져올 것
+
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import HumanMessage, SystemMessage
+from faq_manager import (
+    add_faq_candidate,
+    save_or_merge_faq_candidate,
+    record_candidate_occurrence,
+    record_classification,
+    count_faq_candidates,
+    get_connection,
+)
+from fast_classifier import fast_classify
+from retrieval import search_with_relevance, VECTOR_SEARCH_TIMEOUT
+from resource_pool import get_pool, RETRIEVAL_CANDIDATES
+from index_sync import sync_index
+from query_rewrite import needs_rewrite, rewrite_query
+from history import build_history
+from tracing import span, current_span, traced_iter, llm_config
+from keyword_matcher import (
+    match_keywords,
+    pick_category,
+    SKIP_PRIORITY,
+    CASUAL_CHAT_PRIORITY,
+)
+
+# 분류 방식: "similarity"면 벡터 유사도로 먼저 라우팅하고 유사도가 낮을 때만
+# solar-mini 호출 (비용 우선), "llm"이면 solar-mini 분류를 검색과 동시에 (지연 우선)
+ROUTING_MODE = os.getenv("ROUTING_MODE", "similarity")
+
+# 이 관련도 이상이면 기존 매뉴얼/FAQ로 해결 가능한 질문으로 보고 바로 existing 처리
+SIMILARITY_EXISTING_THRESHOLD = float(
+    os.getenv("SIMILARITY_EXISTING_THRESHOLD", "0.8")
+)
+
+
+def classify(user_input, api_key, timings=None):
+    """문의 분류 (동기, 벤치마크용) -> (분류, 질문 임베딩)
+
+    aget_response와 같은 route_question을 실행하므로 라우팅 모드와 벡터 검색
+    시간 제한이 그대로 적용된다. 임베딩은 벡터 검색을 거친 경우에만 있다.
+    """
+    timings = {} if timings is None else timings
+    return asyncio.run(_classify(user_input, api_key, timings))
+
+
+async def _classify(user_input, api_key, timings):
+    retriever = await _run_stage(timings, "retriever", _get_retriever, api_key)
+    classification, _, query_embedding, _, _ = await route_question(
+        user_input, api_key, retriever, timings
+    )
+    return classification, query_embedding
+
+
+def retrieve_raw_query(user_input, api_key, k=RETRIEVAL_CANDIDATES):
+    """원본 질문을 한 번 임베딩해서 검색, (임베딩, [(문서, 관련도)]) 반환"""
+    pool = get_pool(api_key)
+    query_embedding = pool.embeddings.embed_query(user_input)
+    results = search_with_relevance(pool.db, query_embedding, k=k)
+    return query_embedding, results
+
+
+def is_similar_to_known_topic(results):
+    """검색 결과의 최고 관련도가 기준 이상인지 (유사도 라우팅)"""
+    if results and results[0][1] >= SIMILARITY_EXISTING_THRESHOLD:
+        doc, score = results[0]
+        print(f"🔎 유사도 분류: existing ({doc.metadata.get('id')}, {score:.2f})")
+        return True
+    return False
+
+
+def classify_with_llm(user_input, api_key):
+    """solar-mini로 문의 분류"""
+    chat = get_pool(api_key).chat_mini
+
+    prompt = f"""당신은 IT 헬프데스크 상담사입니다.
+        다음 문의를 분석하여 적절한 분류를 결정하세요.
+
+        **분류 기준:**
+
+        1. **existing** - 일반적인 IT 문제 (기존 FAQ/매뉴얼 있음)
+        - 네트워크, 계정, 이메일, 하드웨어, 소프트웨어 등 흔한 문제
+        - 예: "와이파이 안됨", "비밀번호 잊음", "프린터 오류"
+
+        2. **new** - 새롭지만 가치 있는 IT 질문
+        - 다른 직원들도 궁금해할 만한 새로운 기술/정책/도구 관련
+        - 예: "새로운 협업도구 사용법", "최신 보안 정책", "신규 시스템"
+
+        3. **skip** - FAQ 가치 없는 질문
+        - 인사, 감사, 일반 대화, IT 무관한 질문
+        - 예: "안녕하세요", "감사합니다", "점심 메뉴", "회의실 예약"
+
+        **중요**: 다른 직원들도 궁금해할 만한 IT 질문인지 판단하세요.
+
+        문의: {user_input}
+
+        분류: """
+
+    with span("classification", method="llm", model="solar-mini") as trace:
+        result = chat.invoke(
+            [
+                SystemMessage(
+                    content="당신은 IT 헬프데스크의 베테랑 상담사입니다. 정확한 문제 분류와 친절한 고객 응대를 동시에 수행합니다."
+                ),
+                HumanMessage(content=prompt),
+            ],
+            config=llm_config(trace),
+        )
+
+        classification = result.content.strip()
+
+        # 분류 결과 정리
+        if "existing" in classification:
+            label = "existing"
+        elif "new" in classification:
+            label = "new"
+        else:
+            label = "skip"
+        trace.set(label=label)
+        return label
+
+
+def load_manual(db):
+    """매뉴얼 + 승인된 FAQ를 벡터 DB와 동기화 (바뀐 문서만 다시 임베딩)"""
+    return sync_index(db)
+
+
+# 분류/검색/답변 생성을 돌리는 작업 스레드 (asyncio.run 종료 시 기다리지 않도록 별도 풀)
+PIPELINE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="helpdesk")
+
+
+async def _run_stage(timings, name, func, *args, **kwargs):
+    """작업 스레드에서 실행하고 걸린 시간을 timings[name]에 기록
+
+    현재 컨텍스트(추적 구간)를 복사해서 실행하므로 작업 스레드의 구간도
+    같은 턴 아래에 기록된다.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    started = time.perf_counter()
+    try:
+        return await loop.run_in_executor(
+            PIPELINE_EXECUTOR, lambda: context.run(func, *args, **kwargs)
+        )
+    finally:
+        timings[name] = time.perf_counter() - started
+
+
+def _get_retriever(api_key):
+    return get_pool(api_key).retriever
+
+
+def _ignore_result(future):
+    # 버려진 추측 작업의 예외가 경고로 남지 않도록 결과만 소비
+    if not future.cancelled():
+        future.exception()
+
+
+async def _bounded_retrieval(retrieval, timeout=VECTOR_SEARCH_TIMEOUT):
+    """원본 질문 검색을 timeout(초)까지만 기다림, 늦거나 실패하면 (None, None)
+
+    늦은 검색은 작업 스레드에서 끝까지 돌고 (임베딩은 캐시에 남음) 결과만 버린다.
+    """
+    try:
+        return await asyncio.wait_for(asyncio.shield(retrieval), timeout)
+    except asyncio.TimeoutError:
+        print(f"벡터 검색 지연 ({timeout}초 초과), 키워드 검색 결과만 사용")
+        retrieval.add_done_callback(_ignore_result)
+    except Exception as e:
+        print(f"원본 질문 검색 실패, 키워드 검색 결과만 사용: {e}")
+    return None, None
+
+
+async def route_question(user_input, api_key, retriever, timings):
+    """문의 분류 + 원본 질문 검색 (답변 파이프라인과 벤치마크가 같이 쓰는 라우팅)
+
+    인사/감사나 키워드가 분명한 질문은 로컬에서 분류하고("VPN" 같은 짧은
+    키워드 질문은 임베딩 없이 키워드 색인으로 검색), 나머지는 ROUTING_MODE에
+    따라 유사도 라우팅 또는 LLM 분류와 검색을 동시에 진행한다. 벡터 검색은
+    VECTOR_SEARCH_TIMEOUT까지만 기다린다.
+    반환값: (분류, 분류 경로, 질문 임베딩, [(문서, 관련도)], 키워드 검색 문서).
+    벡터 검색을 하지 않았거나 늦었으면 임베딩/검색 결과는 None이다.
+    """
+    started = time.perf_counter()
+
+    # 인사/감사처럼 명확한 문의는 LLM 호출 없이 로컬에서 분류
+    classification = fast_classify(user_input)
+    timings["fast_classify"] = time.perf_counter() - started
+    classification_method = "local" if classification else "llm"
+
+    query_embedding = None
+    results = None
+    docs = None
+
+    # "VPN", "프린터" 같은 짧은 키워드 질문은 임베딩 없이 키워드 색인으로 바로 검색
+    if classification == "existing":
+        docs = await _run_stage(
+            timings, "keyword_shortcut", retriever.keyword_shortcut, user_input
+        )
+        current_span().set(keyword_shortcut=docs is not None)
+
+    if classification is None:
+        parallel_started = time.perf_counter()
+        retrieval = asyncio.create_task(
+            _run_stage(timings, "retrieval", retrieve_raw_query, user_input, api_key)
+        )
+
+        def start_llm_classification():
+            return asyncio.create_task(
+                _run_stage(
+                    timings, "classify_llm", classify_with_llm, user_input, api_key
+                )
+            )
+
+        if ROUTING_MODE == "similarity":
+            # 비용 우선: 유사도가 기준 미만일 때만 solar-mini 호출 (검색 후 순차 실행)
+            query_embedding, results = await _bounded_retrieval(retrieval)
+            if is_similar_to_known_topic(results):
+                classification = "existing"
+                classification_method = "similarity"
+            else:
+                classification = await start_llm_classification()
+        else:
+            # 지연 우선: LLM 분류와 추측 검색을 동시에 (분류 호출은 항상 발생)
+            llm_classification = start_llm_classification()
+            query_embedding, results = await _bounded_retrieval(retrieval)
+            classification = await llm_classification
+
+        parallel = time.perf_counter() - parallel_started
+        timings["parallel"] = parallel
+        timings["overlap_saved"] = max(
+            timings.get("retrieval", 0.0) + timings.get("classify_llm", 0.0) - parallel,
+            0.0,
+        )
+    elif classification == "existing" and docs is None:
+        retrieval = asyncio.ensure_future(
+            _run_stage(timings, "retrieval", retrieve_raw_query, user_input, api_key)
+        )
+        query_embedding, results = await _bounded_retrieval(retrieval)
+
+    return classification, classification_method, query_embedding, results, docs
+
+
+async def aget_response(
+    user_input, chat_history, api_key, stream=False, timings=None, summary=None
+):
+    """답변 생성 (asyncio)
+
+    원본 질문을 먼저 검색해 유사도가 높으면 LLM 분류 없이 existing으로 보고
+    (ROUTING_MODE="similarity"), "llm" 모드면 LLM 분류와 검색을 동시에 시작한다.
+    existing으로 분류되면 이미 검색한 문서를 그대로 답변 생성에 사용한다.
+    timings에는 단계별 소요 시간(초)이 기록된다. summary(대화 요약)가 있으면
+    요약된 앞부분 대화 대신 요약을 프롬프트에 넣는다.
+    추적이 켜져 있으면 한 턴 전체가 "turn" 구간으로 기록된다 (스트리밍이면
+    답변을 다 내보낸 시점에 종료).
+    """
+    turn = span("turn", stream=stream, history_messages=len(chat_history))
+    try:
+        with turn.activate():
+            return await _answer_turn(
+                turn, user_input, chat_history, api_key, stream, timings, summary
+            )
+    except BaseException as e:
+        turn.end(e)
+        raise
+
+
+async def _answer_turn(
+    turn, user_input, chat_history, api_key, stream, timings, summary
+):
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+
+    # 검색기 준비는 색인 버전이 바뀌면 키워드 색인/Chroma 연결을 다시 만들므로
+    # 이벤트 루프를 막지 않도록 작업 스레드에서
+    retriever = await _run_stage(timings, "retriever", _get_retriever, api_key)
+    (
+        classification,
+        classification_method,
+        query_embedding,
+        results,
+        docs,
+    ) = await route_question(user_input, api_key, retriever, timings)
+
+    # 질문 재구성이 필요 없으면 원본 질문 검색 결과를 그대로 사용
+    # (벡터 검색이 늦거나 실패했으면 키워드 검색 결과만으로)
+    if classification == "existing" and docs is None:
+        top_relevance = results[0][1] if results else None
+        if not needs_rewrite(user_input, chat_history, top_relevance):
+            vector_docs = [doc for doc, _ in results] if results is not None else []
+            docs = await _run_stage(
+                timings, "fuse", retriever.fuse, user_input, vector_docs
+            )
+
+    # 관리자 통계용 분류 비율/경로 집계 (실패해도 답변에는 영향 없음)
+    try:
+        await _run_stage(
+            timings,
+            "record_stats",
+            record_classification,
+            classification,
+            classification_method,
+        )
+    except Exception as e:
+        print(f"분류 통계 기록 실패: {e}")
+
+    generation_started = time.perf_counter()
+
+    def finish():
+        timings["generation"] = time.perf_counter() - generation_started
+        timings["total"] = time.perf_counter() - started
+        print(
+            f"⏱️ {classification} 단계별 시간: "
+            + ", ".join(f"{name}={value:.3f}s" for name, value in timings.items())
+        )
+        turn.set(
+            classification=classification,
+            classification_method=classification_method,
+            timings_ms={k: round(v * 1000, 3) for k, v in timings.items()},
+        )
+
+    if classification == "existing":
+        response = await _run_stage(
+            timings,
+            "handler",
+            handle_existing,
+            user_input,
+            chat_history,
+            api_key,
+            query_embedding,
+            stream=stream,
+            docs=docs,
+            summary=summary,
+        )
+    elif classification == "new":
+        # 답변 생성과 FAQ 후보 저장이 이벤트 루프를 막지 않도록 작업 스레드에서
+        response = await _run_stage(
+            timings,
+            "handler",
+            handle_new,
+            user_input,
+            chat_history,
+            api_key,
+            query_embedding,
+            stream=stream,
+            summary=summary,
+        )
+    else:  # skip
+        response = handle_skip(user_input, api_key)
+        response = iter([response]) if stream else response
+
+    if stream:
+        return traced_iter(stream_text(response, lambda _: finish()), turn)
+    finish()
+    turn.end()
+    return response
+
+
+def get_response(
+    user_input, chat_history, api_key, stream=False, timings=None, summary=None
+):
+    """답변 생성 (stream=True면 토큰 단위로 내보내는 제너레이터 반환)"""
+    return asyncio.run(
+        aget_response(user_input, chat_history, api_key, stream, timings, summary)
+    )
+
+
+def stream_text(chunks, on_complete=None):
+    """청크를 그대로 내보내고, 끝나면 전체 텍스트로 on_complete 호출"""
+    parts = []
+    for chunk in chunks:
+        if chunk:
+            parts.append(chunk)
+            yield chunk
+
+    if on_complete is not None:
+        on_complete("".join(parts))
+
+
+def handle_existing(
+    user_input,
+    chat_history,
+    api_key,
+    query_embedding=None,
+    stream=False,
+    docs=None,
+    summary=None,
+):
+    """기존 매뉴얼 기반 답변
+
+    docs가 주어지면 (원본 질문으로 미리 검색한 문서) 질문 재구성과 검색을
+    건너뛰고 바로 답변을 생성한다. 아니면 지시어나 생략이 있는 질문만
+    이전 대화를 참고해 재구성한 뒤 검색한다.
+    """
+    pool = get_pool(api_key)
+
+    # 대화 기록 없는 첫 질문은 유사한 질문의 캐시 답변을 그대로 사용
+    # (키워드 검색만으로 문서를 찾은 경우는 임베딩하지 않도록 캐시도 건너뜀)
+    first_turn = not any(msg["role"] == "user" for msg in chat_history)
+    first_turn = first_turn and (query_embedding is not None or docs is None)
+    if first_turn:
+        if query_embedding is None:
+            query_embedding = pool.embeddings.embed_query(user_input)
+        cached_answer = pool.answer_cache.lookup(query_embedding)
+        current_span().set(answer_cache_hit=cached_answer is not None)
+        if cached_answer is not None:
+            return iter([cached_answer]) if stream else cached_answer
+
+    # 분류 단계에서 계산한 임베딩이 있으면 원본 질문 검색에 재사용
+    if query_embedding is not None:
+        pool.retriever.remember(user_input, query_embedding)
+
+    # 히스토리 변환 (인사말 제외, 요약 + 토큰 예산 안의 최근 대화만)
+    history = build_history(chat_history, summary)
+
+    def on_complete(answer):
+        if first_turn:
+            pool.answer_cache.store(user_input, query_embedding, answer)
+
+    if docs is None:
+        # 질문 재구성 (자기완결적인 질문이면 LLM 호출 생략)
+        search_query = user_input
+        if needs_rewrite(user_input, chat_history):
+            search_query = rewrite_query(
+                pool.rewrite_chain,
+                pool.rewrite_cache,
+                user_input,
+                chat_history,
+                history,
+            )
+        docs = pool.retriever.invoke(search_query)
+
+    # 답변 생성
+    inputs = {"input": user_input, "chat_history": history, "context": docs}
+    generation = span("generation", model="solar-pro", kind="existing")
+    config = llm_config(generation)
+
+    if stream:
+        chunks = pool.qa_chain.stream(inputs, config=config)
+        return stream_text(traced_iter(chunks, generation), on_complete)
+
+    with generation:
+        answer = pool.qa_chain.invoke(inputs, config=config)
+    on_complete(answer)
+    return answer
+
+
+def handle_new(
+    user_input, chat_history, api_key, query_embedding=None, stream=False, summary=None
+):
+    pool = get_pool(api_key)
+
+    # 히스토리 변환 (인사말 제외, 요약 + 토큰 예산 안의 최근 대화만)
+    history = build_history(chat_history, summary)
+
+    inputs = {"input": user_input, "chat_history": history}
+    generation = span("generation", model="solar-pro", kind="new")
+    config = llm_config(generation)
+
+    # 답변 생성 (스트리밍이면 답변이 끝난 뒤 FAQ 후보 등록)
+    if stream:
+        chunks = (
+            chunk.content
+            for chunk in pool.new_question_chain.stream(inputs, config=config)
+        )
+        # 스트림은 나중에 다른 곳에서 소비되므로 지금 컨텍스트(추적 구간)에서 등록
+        context = contextvars.copy_context()
+        return stream_text(
+            traced_iter(chunks, generation),
+            lambda answer: context.run(
+                record_faq_candidate, user_input, answer, api_key, query_embedding
+            ),
+        )
+
+    with generation:
+        result = pool.new_question_chain.invoke(inputs, config=config)
+    record_faq_candidate(user_input, result.content, api_key, query_embedding)
+    return result.content
+
+
+def record_faq_candidate(user_input, answer, api_key, query_embedding=None):
+    """새로운 유형의 질문과 답변을 FAQ 후보로 등록
+
+    이미 있는 후보와 같은 질문이면 새로 저장하지 않고 그 후보의 질문 횟수에
+    합치고, 승인된 FAQ와 같은 질문이면 등록하지 않는다. 저장/중복 확인이
+    실패해도 이미 생성된 답변과 대화 저장에는 영향이 없도록 기록만 남긴다.
+    """
+    try:
+        with span("faq_persistence") as trace:
+            return _record_faq_candidate(
+                trace, user_input, answer, api_key, query_embedding
+            )
+    except Exception as e:
+        print(f"FAQ 후보 등록 실패: {e}")
+        return None
+
+
+def _record_faq_candidate(trace, user_input, answer, api_key, query_embedding):
+    duplicate = get_pool(api_key).faq_deduplicator.find_duplicate(
+        user_input, query_embedding
+    )
+    if duplicate is not None:
+        kind, record_id, similarity = duplicate
+        if kind == "approved":
+            print(f"승인된 FAQ({record_id})와 중복, 후보 등록 생략 ({similarity:.3f})")
+            trace.set(outcome="skipped_approved", similarity=similarity)
+            return None
+
+        merged = record_candidate_occurrence(record_id)
+        if merged is not None:
+            trace.set(outcome="merged", similarity=similarity)
+            print(
+                f"FAQ 후보 #{record_id}와 중복, 질문 횟수 합침 "
+                f"({merged['occurrence_count']}회, {similarity:.3f})"
+            )
+            return merged
+
+    # FAQ 후보 생성
+    faq_candidate = add_faq_candidate(user_input, answer)
+
+    # 저장소에 한 건만 추가 (전체 목록을 다시 쓰지 않음). 위 확인 뒤에 같은 질문이
+    # 먼저 저장됐으면 저장 트랜잭션 안에서 그 후보에 합침
+    faq_candidate, merged = save_or_merge_faq_candidate(faq_candidate)
+    if merged:
+        trace.set(outcome="merged", same_question=True)
+        print(
+            f"FAQ 후보 #{faq_candidate['id']}와 같은 질문, 질문 횟수 합침 "
+            f"({faq_candidate['occurrence_count']}회)"
+        )
+        return faq_candidate
+    trace.set(outcome="saved")
+
+    print(
+        f"""
+FAQ 후보 등록 완료! (총 {count_faq_candidates()}개)
+1. 질문: {faq_candidate['question']}
+2. 시간: {faq_candidate['timestamp']}
+3. 답변: {faq_candidate['generated_answer'][:100]}...
+        """
+    )
+
+    return faq_candidate
+
+
+def handle_skip(user_input, api_key):
+    # 한 번의 매칭으로 모든 카테고리를 찾고, 인사 > 일상 > 다른 업무 순으로 우선
+    matches = match_keywords(user_input)
+    category = pick_category(matches, SKIP_PRIORITY)
+
+    # 인사
+    if category == "greeting":
+        return "안녕하세요! 😊 IT 헬프데스크입니다. 어떤 IT 문제로 도움이 필요하신가요?"
+
+    # 일상
+    elif category == "casual":
+        return handle_casual_chat(user_input, matches)
+
+    # 다른 업무
+    elif category == "offtopic":
+        return """죄송하지만 IT 관련 문의만 도와드릴 수 있어요. 😅
+        
+                해당 업무는 담당 부서에 문의해주세요!
+                IT 관련 문제가 있으시면 언제든 말씀해주세요 💻"""
+
+    # 매칭 실패
+    else:
+        return """IT 헬프데스크입니다! 😊 
+        
+                구체적인 IT 문제를 말씀해주시면 더 정확한 도움을 드릴 수 있습니다.
+                🌐 네트워크, 🔐 계정, 📧 이메일, 🖨️ 하드웨어, 💿 소프트웨어"""
+
+
+def handle_casual_chat(user_input, matches=None):
+    """일상 대화에 위트 있게 응답"""
+    if matches is None:
+        matches = match_keywords(user_input)
+
+    # 날씨 > 음식 > 피곤 > 긍정 > 감사 순으로 우선
+    category = pick_category(matches, CASUAL_CHAT_PRIORITY)
+
+    if category == "casual_chat:weather":
+        return "창밖 확인 못했어요 😅 대신 네트워크 연결 상태는 확인 가능해요!"
+
+    elif category == "casual_chat:food":
+        return "저는 전기만 먹고 살아요 🔌 식사 드시고 IT 문의 있으시면 언제든지!"
+
+    elif category == "casual_chat:tired":
+        return "힘드시겠어요! 간단한 IT 업무는 제가 도와드릴게요 💪"
+
+    elif category == "casual_chat:positive":
+        return "IT 문제 해결도 재밌어요! 😄 무엇을 도와드릴까요?"
+
+    elif category == "casual_chat:thanks":
+        return "천만에요! 😊 추가 IT 문의 있으시면 언제든지 말씀해주세요!"
+
+    else:
+        return "흥미로운 이야기네요! 😊 그런데 IT 관련 문제는 없으신가요?"
+
+
+def init_faq_system():
+    # 저장소 연결 (최초 실행 시 예전 JSON 파일 가져오기)
+    get_connection()
+    return True
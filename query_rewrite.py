@@ -0,0 +1,109 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from keyword_matcher import match_keywords
+from tracing import span, llm_config
+
+# 원본 질문 검색 관련도가 이 값 이상이면 재구성 없이 그대로 검색
+REWRITE_SKIP_RELEVANCE = 0.85
+
+# 재구성 캐시 키에 포함할 최근 대화 수
+REWRITE_CACHE_HISTORY = 4
+REWRITE_CACHE_SIZE = 512
+
+# 이 길이 이하이고 IT 키워드가 없으면 생략된 질문("안돼요", "다음은?")으로 봄
+ELLIPSIS_MAX_LENGTH = 6
+
+# 이전 대화를 가리키는 지시어/접속어
+# 영어 대명사는 대소문자를 구분해 소문자/첫 글자 대문자만 (대문자 "IT"는 분야 이름)
+REFERENCE_PATTERN = re.compile(
+    r"(그거|이거|저거|그것|이것|저것|그게|이게|저게|그건|이건|저건|그걸|이걸|"
+    r"거기|여기|그때|아까|방금|위에서|위의|말씀하신|말한|알려주신|"
+    r"그럼|그러면|그런데|그래도|그리고|그다음|다음 단계|"
+    r"\b([Ii]t|[Tt]hat|[Tt]his|[Tt]hey|[Tt]hem)\b)"
+)
+
+
+def needs_rewrite(user_input, chat_history, top_relevance=None):
+    """이전 대화를 참고한 질문 재구성(LLM 호출)이 필요한지 판단"""
+    # 첫 인사 말고는 대화가 없으면 재구성할 맥락이 없음
+    if not any(msg["role"] == "user" for msg in chat_history):
+        return False
+
+    # 원본 질문만으로도 확실한 검색 결과가 나오면 재구성 불필요
+    if top_relevance is not None and top_relevance >= REWRITE_SKIP_RELEVANCE:
+        return False
+
+    text = user_input.strip().lower()
+
+    # 지시어/접속어가 있으면 이전 대화를 가리킬 가능성이 높음
+    # (소문자로 바꾸기 전 원문에서 찾아야 "IT 보안"의 IT를 대명사로 보지 않음)
+    if REFERENCE_PATTERN.search(user_input):
+        return True
+
+    # 말줄임이나 너무 짧은 질문은 맥락 없이는 검색이 어려움
+    if text.endswith("...") or text.endswith("…"):
+        return True
+    has_it_keyword = any(match.category == "it" for match in match_keywords(text))
+    if len(text.replace(" ", "")) <= ELLIPSIS_MAX_LENGTH and not has_it_keyword:
+        return True
+
+    return False
+
+
+class RewriteCache:
+    """(최근 대화 + 질문) -> 재구성된 질문 LRU 캐시"""
+
+    def __init__(self, size=REWRITE_CACHE_SIZE, history_size=REWRITE_CACHE_HISTORY):
+        self.size = size
+        self.history_size = history_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def make_key(self, user_input, chat_history):
+        recent = chat_history[-self.history_size :]
+        raw = "\n".join(f"{msg['role']}:{msg['content']}" for msg in recent)
+        raw += f"\nquestion:{user_input.strip()}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._items.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._items)
+        return stats
+
+
+def rewrite_query(rewrite_chain, cache, user_input, chat_history, history_messages):
+    """이전 대화를 참고해 검색용 질문으로 재구성 (같은 맥락이면 캐시 사용)"""
+    with span("query_rewrite") as trace:
+        key = cache.make_key(user_input, chat_history)
+        rewritten = cache.get(key)
+        trace.set(cache_hit=rewritten is not None)
+        if rewritten is None:
+            rewritten = rewrite_chain.invoke(
+                {"input": user_input, "chat_history": history_messages},
+                config=llm_config(trace),
+            ).strip()
+            cache.put(key, rewritten or user_input)
+    print(f"✏️ 질문 재구성: {user_input} -> {rewritten}")
+    return rewritten or user_input
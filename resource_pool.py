@@ -0,0 +1,241 @@
+import os
+import threading
+
+from langchain_upstage import ChatUpstage, UpstageEmbeddings
+from langchain_chroma import Chroma
+from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.output_parsers import StrOutputParser
+from prompts import (
+    CONTEXTUALIZE_PROMPT,
+    QA_PROMPT,
+    NEW_QUESTION_PROMPT,
+    SUMMARY_PROMPT,
+)
+from retrieval import QueryEmbeddingRetriever, HybridRetriever
+from lexical_index import LexicalIndex
+from documents import load_all_documents
+from embedding_cache import CachedEmbeddings
+from atomic_io import atomic_write_text, file_lock
+from answer_cache import SemanticAnswerCache, current_index_version
+from query_rewrite import RewriteCache
+from faq_dedupe import FaqDeduplicator
+
+CHROMA_DIR = "chroma_db"
+# 현재 챗봇이 읽는 Chroma 디렉터리 경로를 담은 파일 (재구성 후 교체됨)
+CHROMA_POINTER_FILE = "chroma_current.txt"
+EMBEDDING_MODEL = "solar-embedding-1-large"
+RETRIEVER_K = 3
+# RRF로 합치기 전 각 검색 방식에서 가져올 후보 수
+RETRIEVAL_CANDIDATES = 10
+
+
+def upstage_client_options():
+    """UPSTAGE_API_BASE가 있으면 그 주소로 요청 (로컬 가짜 서버로 부하 테스트할 때)"""
+    base_url = os.getenv("UPSTAGE_API_BASE")
+    return {"base_url": base_url} if base_url else {}
+
+
+def active_chroma_dir(pointer_path=CHROMA_POINTER_FILE):
+    """현재 사용 중인 Chroma 디렉터리 (재구성한 적 없으면 chroma_db)"""
+    try:
+        with open(pointer_path, "r", encoding="utf-8") as f:
+            path = f.read().strip()
+        return path or CHROMA_DIR
+    except FileNotFoundError:
+        return CHROMA_DIR
+
+
+def set_active_chroma_dir(path, pointer_path=CHROMA_POINTER_FILE):
+    """사용할 Chroma 디렉터리를 원자적으로 교체 (rename이라 중간 상태 없음)"""
+    atomic_write_text(pointer_path, path)
+
+
+def index_publish_lock(pointer_path=CHROMA_POINTER_FILE):
+    """승인 FAQ 반영과 활성 인덱스 교체를 워커 간에 직렬화하는 잠금
+
+    승인 요청은 이 잠금 안에서 저장소 승인 + 활성 인덱스 반영을 끝내고, 재구성은
+    이 잠금 안에서 마지막 동기화 후 포인터를 바꾼다. 그래서 승인된 FAQ는
+    새 빌드의 동기화에 포함되거나, 교체된 뒤의 활성 인덱스에 바로 반영된다.
+    """
+    return file_lock(pointer_path)
+
+
+def close_chroma(db):
+    """Chroma 핸들의 클라이언트 닫기 (close가 없는 chromadb 버전이면 그냥 버림)"""
+    close = getattr(getattr(db, "_client", None), "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        print(f"Chroma 클라이언트 닫기 실패: {e}")
+
+
+class ResourcePool:
+    """API 키별로 프로세스 전체에서 공유하는 클라이언트와 체인 묶음
+
+    LLM/임베딩 클라이언트, Chroma 핸들, 조립된 체인을 처음 사용할 때
+    한 번만 만들고 이후 턴에서는 그대로 재사용한다.
+    """
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self._lock = threading.RLock()
+        self._resources = {}
+
+    def _get(self, name, factory):
+        resource = self._resources.get(name)
+        if resource is None:
+            with self._lock:
+                resource = self._resources.get(name)
+                if resource is None:
+                    resource = factory()
+                    self._resources[name] = resource
+        return resource
+
+    @property
+    def chat_mini(self):
+        return self._get(
+            "chat_mini",
+            lambda: ChatUpstage(
+                api_key=self.api_key, model="solar-mini", **upstage_client_options()
+            ),
+        )
+
+    @property
+    def chat_pro(self):
+        return self._get(
+            "chat_pro",
+            lambda: ChatUpstage(
+                api_key=self.api_key, model="solar-pro", **upstage_client_options()
+            ),
+        )
+
+    @property
+    def embeddings(self):
+        # 반복되는 질문은 임베딩 API 대신 캐시에서 응답
+        return self._get(
+            "embeddings",
+            lambda: CachedEmbeddings(
+                UpstageEmbeddings(
+                    api_key=self.api_key,
+                    model=EMBEDDING_MODEL,
+                    **upstage_client_options(),
+                ),
+                model_name=EMBEDDING_MODEL,
+            ),
+        )
+
+    @property
+    def db(self):
+        """현재 활성 디렉터리의 Chroma 핸들 (재구성으로 교체되면 새로 연결)
+
+        직전 핸들은 진행 중인 검색이 끝나도록 한 세대 더 열어 두고, 그보다 오래된
+        핸들은 닫는다 (재구성이 지우는 오래된 빌드 디렉터리를 붙잡지 않도록).
+        """
+        path = active_chroma_dir()
+        with self._lock:
+            if self._resources.get("db_path") != path:
+                stale = self._resources.get("previous_db")
+                if stale is not None:
+                    close_chroma(stale)
+                self._resources["previous_db"] = self._resources.get("db")
+                self._resources["db"] = Chroma(
+                    persist_directory=path, embedding_function=self.embeddings
+                )
+                self._resources["db_path"] = path
+            return self._resources["db"]
+
+    @property
+    def lexical_index(self):
+        """매뉴얼/승인 FAQ 키워드 색인 (벡터 DB 내용이 바뀌면 다시 생성)"""
+        version = current_index_version()
+        with self._lock:
+            if self._resources.get("lexical_index_version") != version:
+                self._resources["lexical_index"] = LexicalIndex(load_all_documents())
+                self._resources["lexical_index_version"] = version
+            return self._resources["lexical_index"]
+
+    @property
+    def vector_retriever(self):
+        retriever = self._get(
+            "vector_retriever",
+            lambda: QueryEmbeddingRetriever(vectorstore=self.db, k=RETRIEVER_K),
+        )
+        retriever.vectorstore = self.db
+        return retriever
+
+    @property
+    def retriever(self):
+        """키워드 + 벡터 하이브리드 검색기"""
+        retriever = self._get(
+            "retriever",
+            lambda: HybridRetriever(
+                vector_retriever=self.vector_retriever,
+                lexical_index=self.lexical_index,
+                k=RETRIEVER_K,
+                candidates=RETRIEVAL_CANDIDATES,
+            ),
+        )
+        retriever.vector_retriever = self.vector_retriever
+        retriever.lexical_index = self.lexical_index
+        return retriever
+
+    @property
+    def answer_cache(self):
+        return self._get("answer_cache", SemanticAnswerCache)
+
+    @property
+    def qa_chain(self):
+        """검색된 문서(context)로 답변 생성하는 체인"""
+        return self._get(
+            "qa_chain", lambda: create_stuff_documents_chain(self.chat_pro, QA_PROMPT)
+        )
+
+    @property
+    def rewrite_chain(self):
+        """이전 대화를 참고해 검색용 질문을 재구성하는 체인"""
+        return self._get(
+            "rewrite_chain",
+            lambda: CONTEXTUALIZE_PROMPT | self.chat_pro | StrOutputParser(),
+        )
+
+    @property
+    def summary_chain(self):
+        """이전 요약 + 새 대화로 대화 요약을 갱신하는 체인 (solar-mini)"""
+        return self._get(
+            "summary_chain",
+            lambda: SUMMARY_PROMPT | self.chat_mini | StrOutputParser(),
+        )
+
+    @property
+    def rewrite_cache(self):
+        return self._get("rewrite_cache", RewriteCache)
+
+    @property
+    def faq_deduplicator(self):
+        """FAQ 후보 중복 확인기 (질문 임베딩은 캐시된 임베딩 재사용)"""
+        return self._get("faq_deduplicator", lambda: FaqDeduplicator(self.embeddings))
+
+    @property
+    def new_question_chain(self):
+        """새로운 유형의 질문 답변 체인"""
+        return self._get(
+            "new_question_chain", lambda: NEW_QUESTION_PROMPT | self.chat_pro
+        )
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(api_key):
+    """API 키에 해당하는 공유 풀 반환 (없으면 생성)"""
+    pool = _pools.get(api_key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(api_key)
+            if pool is None:
+                pool = ResourcePool(api_key)
+                _pools[api_key] = pool
+    return pool
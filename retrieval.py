@@ -0,0 +1,147 @@
+import contextvars
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+from pydantic import PrivateAttr
+from tracing import span
+
+
+def search_with_relevance(db, query_embedding, k=1):
+    """질문 임베딩으로 검색해 (문서, 관련도 0~1) 목록 반환
+
+    similarity_search_with_relevance_scores와 같은 점수를 내지만,
+    이미 계산한 임베딩을 사용하므로 임베딩 API를 다시 호출하지 않는다.
+    """
+    with span("vector_search", k=k) as trace:
+        results = db.similarity_search_by_vector_with_relevance_scores(
+            query_embedding, k=k
+        )
+        relevance_fn = db._select_relevance_score_fn()
+        results = [(doc, relevance_fn(distance)) for doc, distance in results]
+        trace.set(
+            results=len(results), top_relevance=results[0][1] if results else None
+        )
+        return results
+
+
+class QueryEmbeddingRetriever(BaseRetriever):
+    """미리 계산한 질문 임베딩이 있으면 재사용하는 벡터 검색기"""
+
+    vectorstore: VectorStore
+    k: int = 3
+    # 기억해 둘 (질문 텍스트 -> 임베딩) 최대 개수
+    max_remembered: int = 256
+
+    _remembered: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def remember(self, query, query_embedding):
+        """분류 단계에서 계산한 임베딩을 검색 단계에서 쓰도록 기억"""
+        with self._lock:
+            self._remembered[query] = query_embedding
+            self._remembered.move_to_end(query)
+            while len(self._remembered) > self.max_remembered:
+                self._remembered.popitem(last=False)
+
+    def search(self, query, k):
+        with self._lock:
+            query_embedding = self._remembered.get(query)
+        reused = query_embedding is not None
+        with span("vector_search", k=k, reused_embedding=reused):
+            if query_embedding is None:
+                # 재구성된 질문처럼 처음 보는 텍스트는 새로 임베딩
+                return self.vectorstore.similarity_search(query, k=k)
+            return self.vectorstore.similarity_search_by_vector(query_embedding, k=k)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self.search(query, self.k)
+
+
+# 짧은 질문이 매뉴얼 키워드와 정확히 일치하면 벡터 검색 없이 바로 응답
+EXACT_MATCH_MAX_LENGTH = 10
+
+# 벡터 검색(임베딩 API 포함)이 이 시간(초) 안에 끝나지 않으면 키워드 검색만 사용
+VECTOR_SEARCH_TIMEOUT = 3.0
+
+# Reciprocal Rank Fusion 상수
+RRF_K = 60
+
+_vector_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vector")
+
+
+def reciprocal_rank_fusion(ranked_lists, k, rrf_k=RRF_K):
+    """여러 검색 결과 순위를 RRF로 합쳐 상위 k개 문서 반환"""
+    scores = {}
+    documents = {}
+    for ranked in ranked_lists:
+        for rank, doc in enumerate(ranked):
+            key = doc.metadata.get("id") or doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            documents.setdefault(key, doc)
+
+    ranked_keys = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [documents[key] for key in ranked_keys[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """키워드(BM25) 검색과 벡터 검색을 RRF로 합치는 검색기"""
+
+    vector_retriever: QueryEmbeddingRetriever
+    lexical_index: Any
+    k: int = 3
+    candidates: int = 10
+    vector_timeout: float = VECTOR_SEARCH_TIMEOUT
+
+    def remember(self, query, query_embedding):
+        self.vector_retriever.remember(query, query_embedding)
+
+    def lexical_search(self, query):
+        return [doc for doc, _ in self.lexical_index.search(query, k=self.candidates)]
+
+    def fuse(self, query, vector_docs):
+        """이미 가져온 벡터 검색 결과에 키워드 검색 결과를 합침"""
+        exact = self.lexical_index.exact_keyword_matches(query)
+        lexical = self.lexical_search(query)
+        return reciprocal_rank_fusion([exact, lexical, vector_docs], k=self.k)
+
+    def keyword_shortcut(self, query):
+        """짧은 질문이 매뉴얼 키워드와 정확히 일치하면 임베딩 없이 찾은 문서, 아니면 None"""
+        exact = self.lexical_index.exact_keyword_matches(query)
+        if exact and len(query.replace(" ", "")) <= EXACT_MATCH_MAX_LENGTH:
+            return reciprocal_rank_fusion([exact, self.lexical_search(query)], k=self.k)
+        return None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        # "VPN", "프린터" 같은 짧은 키워드 질문은 임베딩 API를 기다리지 않음
+        shortcut = self.keyword_shortcut(query)
+        if shortcut is not None:
+            return shortcut
+
+        exact = self.lexical_index.exact_keyword_matches(query)
+        lexical = self.lexical_search(query)
+
+        # 추적 구간이 이어지도록 현재 컨텍스트에서 실행
+        future = _vector_executor.submit(
+            contextvars.copy_context().run,
+            self.vector_retriever.search,
+            query,
+            self.candidates,
+        )
+        try:
+            vector = future.result(timeout=self.vector_timeout)
+        except Exception as e:
+            # 임베딩 API가 느리거나 실패하면 키워드 검색 결과만 사용
+            print(f"벡터 검색 지연/실패, 키워드 검색 결과만 사용: {e!r}")
+            vector = []
+
+        return reciprocal_rank_fusion([exact, lexical, vector], k=self.k)
@@ -0,0 +1,141 @@
+"""FAQ 저장소 동시 쓰기 스트레스 테스트
+
+여러 프로세스 x 스레드(챗봇 세션 역할)가 동시에 FAQ 후보를 등록하고, 그동안
+관리자 프로세스 여러 개가 같은 후보를 두고 승인/거절을 경쟁한다. 끝나면
+후보가 하나도 빠지지 않았는지, 한 후보가 두 번 처리되지 않았는지 확인한다.
+
+    python stress_faq_store.py --processes 4 --threads 8 --per-thread 50
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import faq_manager
+
+
+def chat_worker(workdir, worker_id, threads, per_thread):
+    os.chdir(workdir)
+
+    def session(thread_id):
+        for i in range(per_thread):
+            candidate = faq_manager.add_faq_candidate(
+                f"질문 {worker_id}-{thread_id}-{i}", f"답변 {worker_id}-{thread_id}-{i}"
+            )
+            faq_manager.save_faq_candidate(candidate)
+
+    workers = [threading.Thread(target=session, args=(t,)) for t in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def admin_worker(workdir, seed, stop):
+    os.chdir(workdir)
+    rng = random.Random(seed)
+    approved = rejected = conflicts = 0
+    while not stop.is_set():
+        pending = faq_manager.list_faq_candidates(status="pending_review", limit=20)
+        for candidate in pending:
+            if rng.random() < 0.5:
+                ok = faq_manager.approve_faq_candidate(
+                    candidate["id"], candidate["question"], candidate["generated_answer"]
+                )
+                approved += ok is not None
+                conflicts += ok is None
+            else:
+                ok = faq_manager.reject_faq_candidate(candidate["id"], "stress")
+                rejected += ok
+                conflicts += not ok
+        time.sleep(0.01)
+    print(f"관리자 {seed}: 승인 {approved}, 거절 {rejected}, 충돌 {conflicts}")
+
+
+def verify(workdir, expected_questions):
+    os.chdir(workdir)
+    candidates = faq_manager.load_faq_candidates()
+    approved_faqs = faq_manager.load_approved_faqs()
+    errors = []
+
+    questions = [c["question"] for c in candidates]
+    missing = expected_questions - set(questions)
+    if missing:
+        errors.append(f"누락된 후보 {len(missing)}개 (예: {sorted(missing)[:3]})")
+    if len(questions) != len(set(questions)):
+        errors.append(f"중복 저장된 후보 {len(questions) - len(set(questions))}개")
+
+    approved_ids = [faq["candidate_id"] for faq in approved_faqs]
+    if len(approved_ids) != len(set(approved_ids)):
+        errors.append("같은 후보가 두 번 이상 승인됨")
+    approved_candidates = {c["id"] for c in candidates if c["status"] == "approved"}
+    # 묶음 승인은 후보 여러 개가 FAQ 하나로 합쳐지므로 포함 관계로 확인
+    if not set(approved_ids) <= approved_candidates:
+        errors.append("후보 승인 상태와 승인된 FAQ 목록이 일치하지 않음")
+    if len({faq["id"] for faq in approved_faqs}) != len(approved_faqs):
+        errors.append("승인된 FAQ ID 중복")
+
+    statuses = {}
+    for candidate in candidates:
+        statuses[candidate["status"]] = statuses.get(candidate["status"], 0) + 1
+    print(f"후보 {len(candidates)}개 {statuses}, 승인된 FAQ {len(approved_faqs)}개")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--per-thread", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=2)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="faq_stress_")
+    expected = {
+        f"질문 {p}-{t}-{i}"
+        for p in range(args.processes)
+        for t in range(args.threads)
+        for i in range(args.per_thread)
+    }
+
+    started = time.perf_counter()
+    stop = multiprocessing.Event()
+    admins = [
+        multiprocessing.Process(target=admin_worker, args=(workdir, seed, stop))
+        for seed in range(args.admins)
+    ]
+    chats = [
+        multiprocessing.Process(
+            target=chat_worker, args=(workdir, p, args.threads, args.per_thread)
+        )
+        for p in range(args.processes)
+    ]
+    for process in admins + chats:
+        process.start()
+    for process in chats:
+        process.join()
+    stop.set()
+    for process in admins:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    failed = [p for p in admins + chats if p.exitcode != 0]
+    errors = verify(workdir, expected)
+    if failed:
+        errors.append(f"비정상 종료한 프로세스 {len(failed)}개")
+
+    print(f"{len(expected)}건 쓰기, {elapsed:.1f}초 ({workdir})")
+    if errors:
+        for error in errors:
+            print(f"❌ {error}")
+        sys.exit(1)
+    print("✅ 누락/중복 처리 없음")
+
+
+if __name__ == "__main__":
+    main()
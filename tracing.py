@@ -0,0 +1,329 @@
+import contextvars
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from logging.handlers import RotatingFileHandler
+
+from langchain_core.callbacks import BaseCallbackHandler
+from history import estimate_tokens
+
+# HELPDESK_TRACE=1이면 단계별 구간(span)을 JSONL 파일에 기록
+TRACE_ENABLED = os.getenv("HELPDESK_TRACE", "").lower() in ("1", "true", "yes", "on")
+TRACE_FILE = os.getenv("HELPDESK_TRACE_FILE", "traces.jsonl")
+TRACE_MAX_BYTES = 5 * 1024 * 1024  # 파일 하나 최대 크기, 넘으면 .1, .2 ...로 밀려남
+TRACE_BACKUP_COUNT = 3
+# 종료된 워커의 추적 파일을 지우기 전까지 남겨 둘 시간 (초)
+TRACE_STALE_SECONDS = 24 * 3600
+
+_current = contextvars.ContextVar("helpdesk_span", default=None)
+_logger = logging.getLogger("helpdesk.trace")
+_logger.propagate = False
+_logger_lock = threading.Lock()
+_logger_pid = None
+
+
+def set_tracing(enabled):
+    """실행 중에 추적 켜기/끄기 (벤치마크/부하 테스트용)"""
+    global TRACE_ENABLED
+    TRACE_ENABLED = bool(enabled)
+
+
+def worker_trace_file(path=TRACE_FILE, pid=None):
+    """프로세스별 추적 파일 경로 (traces.jsonl -> traces.<pid>.jsonl)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+
+def trace_files(path=TRACE_FILE):
+    """모든 워커의 추적 파일 (교체된 .1, .2 ... 와 예전 단일 파일 포함)"""
+    root, ext = os.path.splitext(path)
+    pattern = f"{glob.escape(root)}.*{ext}"
+    files = glob.glob(pattern) + glob.glob(f"{pattern}.*") + glob.glob(f"{path}*")
+    return sorted(set(files))
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass
+    return True
+
+
+def _remove_stale_files(path=TRACE_FILE):
+    """종료된 워커가 남긴 지 오래된 추적 파일 정리 (재시작마다 pid가 바뀌므로)"""
+    root, ext = os.path.splitext(path)
+    prefix = f"{root}."
+    now = time.time()
+    for file_path in trace_files(path):
+        pid = file_path[len(prefix) :].split(".", 1)[0]
+        if not pid.isdigit() or _process_alive(int(pid)):
+            continue
+        try:
+            if now - os.path.getmtime(file_path) > TRACE_STALE_SECONDS:
+                os.remove(file_path)
+        except OSError:
+            continue
+
+
+def _write(record):
+    global _logger_pid
+    if _logger_pid != os.getpid():
+        with _logger_lock:
+            if _logger_pid != os.getpid():
+                directory = os.path.dirname(TRACE_FILE)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # 파일 교체(rename)는 쓰는 프로세스가 하나일 때만 안전하므로 워커마다
+                # 자기 파일에 쓰고 교체한다 (읽을 때 시작 시각 순으로 합침).
+                # fork된 자식은 부모의 핸들러를 버리고 자기 파일을 새로 연다.
+                for handler in list(_logger.handlers):
+                    _logger.removeHandler(handler)
+                _remove_stale_files()
+                handler = RotatingFileHandler(
+                    worker_trace_file(),
+                    maxBytes=TRACE_MAX_BYTES,
+                    backupCount=TRACE_BACKUP_COUNT,
+                    encoding="utf-8",
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                _logger.addHandler(handler)
+                _logger.setLevel(logging.INFO)
+                _logger_pid = os.getpid()
+    _logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+class Span:
+    """한 단계의 소요 시간과 속성 (with 블록이 끝나거나 end()를 부르면 기록)"""
+
+    def __init__(self, name, parent=None, **attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._ended = False
+        self._token = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def add(self, **counts):
+        """숫자 속성 누적 (토큰 수 등)"""
+        for key, value in counts.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+        return self
+
+    def end(self, error=None):
+        if self._ended:
+            return
+        self._ended = True
+        record = {
+            "ts": time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)
+            ),
+            "started_at": round(self.started_at, 6),
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 3),
+            "status": "ok" if error is None else "error",
+            "attributes": self.attributes,
+        }
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        try:
+            _write(record)
+        except Exception as e:
+            print(f"추적 기록 실패: {e}")
+
+    def activate(self):
+        """이 구간을 현재 구간으로 설정만 하고 끝내지는 않는 컨텍스트"""
+        return _Activation(self)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self.end(exc)
+        return False
+
+
+class _Activation:
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        return False
+
+
+class _NoopSpan:
+    """추적이 꺼져 있을 때 쓰는 빈 구간 (아무것도 기록하지 않음)"""
+
+    def set(self, **attributes):
+        return self
+
+    def add(self, **counts):
+        return self
+
+    def end(self, error=None):
+        pass
+
+    def activate(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name, parent=None, **attributes):
+    """구간 시작 (parent가 없으면 현재 구간의 자식), 추적이 꺼져 있으면 빈 구간"""
+    if not TRACE_ENABLED:
+        return NOOP_SPAN
+    if not isinstance(parent, Span):
+        parent = _current.get()
+    return Span(name, parent, **attributes)
+
+
+def current_span():
+    """현재 구간 (없거나 추적이 꺼져 있으면 빈 구간)"""
+    if not TRACE_ENABLED:
+        return NOOP_SPAN
+    return _current.get() or NOOP_SPAN
+
+
+def traced_iter(chunks, span):
+    """스트리밍 청크를 그대로 내보내며 첫 청크 시각을 기록하고, 다 쓰면 구간 종료"""
+    if span is NOOP_SPAN:
+        return chunks
+    return _traced_iter(chunks, span)
+
+
+def _traced_iter(chunks, span):
+    first = True
+    try:
+        for chunk in chunks:
+            if first:
+                elapsed = time.perf_counter() - span._started
+                span.set(first_chunk_ms=round(elapsed * 1000, 3))
+                first = False
+            yield chunk
+    except BaseException as e:
+        # 사용자가 도중에 스트림을 버린 경우(GeneratorExit)도 오류로 남김
+        span.end(e)
+        raise
+    span.end()
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """LLM 호출이 끝날 때 토큰 사용량을 구간에 누적
+
+    응답에 사용량이 없으면(스트리밍 등) 출력 텍스트로 추정하고 tokens_estimated 표시
+    """
+
+    def __init__(self, span):
+        self.span = span
+
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens = usage.get("prompt_tokens")
+        output_tokens = usage.get("completion_tokens")
+
+        texts = []
+        for generations in response.generations:
+            for generation in generations:
+                texts.append(generation.text)
+                message = getattr(generation, "message", None)
+                metadata = getattr(message, "usage_metadata", None)
+                if metadata and output_tokens is None:
+                    input_tokens = metadata.get("input_tokens")
+                    output_tokens = metadata.get("output_tokens")
+
+        if output_tokens is None:
+            output_tokens = sum(estimate_tokens(text) for text in texts)
+            self.span.set(tokens_estimated=True)
+        self.span.add(input_tokens=input_tokens or 0, output_tokens=output_tokens or 0)
+        self.span.add(llm_calls=1)
+
+
+def llm_config(span):
+    """체인 invoke/stream에 넘길 config (추적이 꺼져 있으면 None)"""
+    if span is NOOP_SPAN:
+        return None
+    return {"callbacks": [TokenUsageCallback(span)]}
+
+
+def read_spans(path=TRACE_FILE, limit=None):
+    """모든 워커의 구간을 시작 시각 순으로 합친 목록 (limit이면 최근 것만)"""
+    spans = []
+    for file_path in trace_files(path):
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        spans.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # 쓰는 중이던 마지막 줄 등
+        except FileNotFoundError:
+            continue
+    spans.sort(key=lambda record: (record.get("ts", ""), record.get("started_at", 0)))
+    return spans[-limit:] if limit else spans
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = int(round(q / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def summarize_spans(spans):
+    """구간 이름별 통계
+
+    {count, errors, p50_ms, p95_ms, mean_ms, max_ms, input_tokens, output_tokens,
+    cache_hit_rate(cache_hit 속성이 있는 구간만, 없으면 None)}
+    """
+    groups = {}
+    for record in spans:
+        groups.setdefault(record["name"], []).append(record)
+
+    summary = {}
+    for name, records in groups.items():
+        durations = sorted(r["duration_ms"] for r in records)
+        attributes = [r.get("attributes") or {} for r in records]
+        cache = [a["cache_hit"] for a in attributes if "cache_hit" in a]
+        summary[name] = {
+            "count": len(records),
+            "errors": sum(r.get("status") == "error" for r in records),
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+            "mean_ms": sum(durations) / len(durations),
+            "max_ms": durations[-1],
+            "input_tokens": sum(a.get("input_tokens", 0) for a in attributes),
+            "output_tokens": sum(a.get("output_tokens", 0) for a in attributes),
+            "cache_hit_rate": sum(cache) / len(cache) if cache else None,
+        }
+    return summary